@@ -0,0 +1 @@
+# Este archivo permite ejecutar los benchmarks con python -m benchmarks.<nombre>
@@ -0,0 +1,46 @@
+"""
+Mide cuánto tarda exportar los servicios procesados a cada formato disponible
+(CSV, XLSX y, si pyarrow está instalado, Parquet).
+
+Uso:
+    python -m benchmarks.bench_exportar [filas]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from src.core.exporters import exportar_servicios, formatos_disponibles
+
+def generar_servicios(filas, semilla=0):
+    """Genera servicios con la repetición de fechas e importes de los libros reales."""
+    rng = np.random.default_rng(semilla)
+    dias = pd.date_range('2024-01-01', '2024-12-31')
+    return pd.DataFrame({
+        'FECHA': dias[rng.integers(0, len(dias), size=filas)],
+        'DIRECCION_PARA_INFORME': [f"Calle {n} # {n % 90}-{n % 70}" for n in rng.integers(1, 200, size=filas)],
+        'SERVICIO_PARA_INFORME': rng.choice(['Mantenimiento', 'Revisión', 'Instalación', 'Reparación'], size=filas),
+        'MATERIALES': rng.choice(['', '', 'Válvula', 'Tubo'], size=filas),
+        'VALOR MATERIALES': rng.integers(0, 50, size=filas) * 1000.0,
+        'VALOR_ORIGINAL': rng.integers(1, 2000, size=filas) * 1000.0,
+        'IVA': np.zeros(filas),
+    })
+
+def main():
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    df = generar_servicios(filas)
+    carpeta = tempfile.mkdtemp()
+    try:
+        print(f"Filas: {filas:,}")
+        for formato in formatos_disponibles():
+            inicio = time.perf_counter()
+            exito, mensaje = exportar_servicios(df, os.path.join(carpeta, f"servicios.{formato}"))
+            assert exito, mensaje
+            print(f"{formato:8s} {(time.perf_counter() - inicio) * 1000:8.1f} ms")
+    finally:
+        shutil.rmtree(carpeta, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
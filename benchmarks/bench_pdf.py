@@ -0,0 +1,76 @@
+"""
+Mide el tiempo de generación del PDF (generar_pdf) y el tamaño del archivo con
+un informe sintético parecido a los reales: direcciones y servicios que se
+repiten entre meses. Compara la salida normal con la compacta (encabezados
+como plantillas, ver PDF_CONFIG["COMPACT_OUTPUT"]) y con el dibujo de las
+páginas repartido en varios procesos (PDF_CONFIG["PARALLEL_RENDER"]).
+
+Uso:
+    python -m benchmarks.bench_pdf [filas]
+"""
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from src.core.pdf_generator import generar_pdf
+
+def generar_servicios(filas, semilla=0):
+    """Genera un DataFrame con las columnas que produce extraer_servicios."""
+    rng = np.random.default_rng(semilla)
+    direcciones = [f"Calle {n} # {n % 90 + 10}-{n % 70 + 5} Apto {n % 12 + 101}" for n in range(1, 400)]
+    servicios = [
+        "Mantenimiento preventivo de calentador a gas",
+        "Cambio de válvula y revisión general de la instalación hidráulica del baño principal",
+        "Reparación de fuga",
+        "Instalación de grifería de cocina y lavamanos con sifón nuevo",
+        "Destape de cañería",
+        "Revisión",
+    ]
+    materiales = ["", "", "Tubo PVC 1/2", "Válvula, teflón y cinta", "Sifón"]
+
+    valores = rng.integers(30, 600, size=filas) * 1000.0
+    valores_materiales = np.where(rng.random(filas) < 0.3, rng.integers(5, 80, size=filas) * 1000.0, 0.0)
+    iva = np.where(rng.random(filas) < 0.2, valores * 0.19, 0.0)
+    subtotal = valores * 0.5
+    return pd.DataFrame({
+        'FECHA': pd.Timestamp('2024-01-01') + pd.to_timedelta(np.sort(rng.integers(0, 365, size=filas)), unit='D'),
+        'DIRECCION_PARA_INFORME': rng.choice(direcciones, size=filas),
+        'SERVICIO_PARA_INFORME': rng.choice(servicios, size=filas),
+        'MATERIALES': rng.choice(materiales, size=filas),
+        'VALOR MATERIALES': valores_materiales,
+        'VALOR_ORIGINAL': valores,
+        'VALOR_COMBINADO': valores,
+        'SUBTOTAL': subtotal,
+        'IVA': iva,
+        'TOTAL EMPRESA': subtotal + iva,
+    })
+
+def medir(funcion, repeticiones=3):
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor, resultado
+
+def main():
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    df = generar_servicios(filas)
+
+    print(f"Filas: {filas:,}")
+    with tempfile.TemporaryDirectory() as carpeta:
+        modos = (("normal", False, False), ("compacto", True, False), ("paralelo", True, True))
+        for etiqueta, compacto, paralelo in modos:
+            ruta = os.path.join(carpeta, f"informe_{etiqueta}.pdf")
+            segundos, (exito, mensaje) = medir(
+                lambda: generar_pdf(df, ruta, "Notas de prueba", compacto=compacto, paralelo=paralelo))
+            assert exito, mensaje
+            tamano = os.path.getsize(ruta)
+            print(f"generar_pdf ({etiqueta:8}): {segundos * 1000:8.1f} ms ({segundos * 1e6 / filas:.1f} µs por fila), "
+                  f"{tamano / 1024:,.0f} KB")
+    print(f"CPUs: {os.cpu_count()} (el modo paralelo usa un proceso por CPU, ver PDF_CONFIG['RENDER_WORKERS'])")
+
+if __name__ == "__main__":
+    main()
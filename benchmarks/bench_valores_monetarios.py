@@ -0,0 +1,53 @@
+"""
+Compara la limpieza de valores monetarios fila por fila (Series.apply con
+limpiar_valor_monetario) contra la versión vectorizada limpiar_valores_monetarios.
+
+Uso:
+    python -m benchmarks.bench_valores_monetarios [filas]
+"""
+import sys
+import time
+import numpy as np
+import pandas as pd
+from src.utils.validation_utils import limpiar_valor_monetario, limpiar_valores_monetarios
+
+def generar_valores(filas, semilla=0):
+    """Genera una columna con la mezcla de formatos que aparece en los libros reales."""
+    rng = np.random.default_rng(semilla)
+    montos = rng.integers(1, 2000, size=filas) * 1000
+    formatos = [
+        lambda m: m,
+        lambda m: float(m),
+        lambda m: f"$ {m:,}",
+        lambda m: f"{m:,}".replace(',', '.'),
+        lambda m: f"${m}",
+        lambda m: '',
+        lambda m: None,
+    ]
+    eleccion = rng.integers(0, len(formatos), size=filas)
+    return pd.Series([formatos[e](int(m)) for e, m in zip(eleccion, montos)], dtype=object)
+
+def medir(funcion, repeticiones=3):
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor, resultado
+
+def main():
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    valores = generar_valores(filas)
+
+    t_fila, por_fila = medir(lambda: valores.apply(limpiar_valor_monetario).astype(float))
+    t_vector, vectorizado = medir(lambda: limpiar_valores_monetarios(valores))
+
+    assert np.allclose(por_fila.to_numpy(), vectorizado.to_numpy()), "Los resultados no coinciden"
+
+    print(f"Filas: {filas:,}")
+    print(f"Series.apply(limpiar_valor_monetario): {t_fila * 1000:8.1f} ms")
+    print(f"limpiar_valores_monetarios:           {t_vector * 1000:8.1f} ms")
+    print(f"Aceleración: x{t_fila / t_vector:.1f}")
+
+if __name__ == "__main__":
+    main()
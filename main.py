@@ -1,3 +1,4 @@
+import multiprocessing
 import customtkinter as ctk
 from src.ui import ModernInformesApp
 
@@ -8,4 +9,6 @@ def main():
     app.run()
 
 if __name__ == "__main__":
+    # Necesario para que el pool de procesos funcione en el ejecutable de PyInstaller
+    multiprocessing.freeze_support()
     main() 
\ No newline at end of file
@@ -0,0 +1,144 @@
+# src/cli.py
+"""
+Modo de línea de comandos: genera los informes sin abrir la interfaz gráfica.
+Con varios períodos el archivo se lee una sola vez y los PDF se generan en
+paralelo (ver src/core/batch.py).
+
+Pensado para programar la generación de informes (por ejemplo cada noche en un
+servidor). No importa customtkinter ni PIL: solo usa la lógica de src/core.
+
+Ejemplos:
+    python -m src.cli servicios.xlsx --periodo 01/01/2024 31/01/2024
+    python -m src.cli servicios.xlsx --periodo 01/01/2024 31/01/2024 \\
+        --periodo 01/02/2024 29/02/2024 --salida informes --db
+    python -m src.cli --desde-almacen --periodo 01/01/2024 31/12/2024
+
+Códigos de salida: 0 si todos los informes se generaron (los períodos sin
+servicios solo se avisan), 1 si falló la lectura del archivo, el guardado en
+el almacén (--db) o algún informe,
+2 si los argumentos no son válidos.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+from datetime import datetime
+from src.config import settings
+from src.core.batch import generar_informes
+
+_NIVELES_SIEMPRE_VISIBLES = {'warning', 'error'}
+
+def _leer_fecha(texto):
+    """Convierte una fecha de la línea de comandos (dd/mm/aaaa) en datetime."""
+    try:
+        return datetime.strptime(texto, settings.APP_MESSAGES["DEFAULT_DATE_FORMAT"])
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"fecha no válida: '{texto}' (formato dd/mm/aaaa)")
+
+def _parsear_argumentos(argv):
+    parser = argparse.ArgumentParser(
+        prog="python -m src.cli",
+        description="Genera la relación de servicios en efectivo en PDF sin abrir la interfaz gráfica."
+    )
+    parser.add_argument("archivo", nargs="?",
+                        help="Archivo Excel con los servicios (con --desde-almacen, opcional: "
+                             "solo los servicios guardados de ese archivo)")
+    parser.add_argument("--periodo", nargs=2, action="append", required=True, type=_leer_fecha,
+                        metavar=("INICIO", "FIN"),
+                        help="Período del informe en formato dd/mm/aaaa (se puede repetir)")
+    parser.add_argument("--salida", help="Carpeta donde guardar los PDF (por defecto la carpeta de la aplicación)")
+    parser.add_argument("--nombre", help="Nombre del PDF; solo con un único período")
+    parser.add_argument("--notas", default="", help="Notas que se añaden al informe")
+    parser.add_argument("--db", nargs="?", const=True, default=None, metavar="RUTA",
+                        help="Guardar los servicios en el almacén SQLite (opcionalmente en RUTA)")
+    parser.add_argument("--desde-almacen", nargs="?", const=True, default=None, metavar="RUTA",
+                        help="Generar los informes con los servicios del almacén SQLite (opcionalmente "
+                             "en RUTA) sin leer el Excel")
+    parser.add_argument("--sin-cache", action="store_true", help="No usar la caché de hojas ya leídas")
+    parser.add_argument("--paralelo", action="store_true", help="Leer las hojas en varios procesos")
+    parser.add_argument("--streaming", action="store_true", help="Leer las hojas fila a fila con poca memoria")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Mostrar todo el detalle del procesamiento")
+
+    args = parser.parse_args(argv)
+    if args.archivo is None and not args.desde_almacen:
+        parser.error("indica el archivo Excel o usa --desde-almacen")
+    if args.db and args.desde_almacen:
+        parser.error("--db y --desde-almacen no se pueden usar juntos")
+    if args.nombre and len(args.periodo) > 1:
+        parser.error("--nombre solo se puede usar con un único --periodo")
+    for inicio, fin in args.periodo:
+        if inicio > fin:
+            parser.error(f"período no válido: {inicio:%d/%m/%Y} es posterior a {fin:%d/%m/%Y}")
+    return args
+
+def _crear_log(verbose):
+    """Devuelve un log_callback que escribe en la salida de errores."""
+    def log(mensaje, nivel="info"):
+        if verbose or nivel in _NIVELES_SIEMPRE_VISIBLES:
+            print(str(mensaje).strip("\n"), file=sys.stderr)
+    return log
+
+def _carpeta_salida(args):
+    if args.salida:
+        return args.salida
+    return os.path.dirname(settings.get_pdf_output_path(settings.PDF_CONFIG["DEFAULT_NAME"]))
+
+def main(argv=None):
+    """
+    Punto de entrada de la línea de comandos.
+
+    Returns:
+        int: Código de salida
+    """
+    args = _parsear_argumentos(argv)
+    log = _crear_log(args.verbose)
+
+    if args.archivo is not None and not args.desde_almacen and not os.path.exists(args.archivo):
+        print(f"No se encontró el archivo: {args.archivo}", file=sys.stderr)
+        return 1
+
+    try:
+        exito, resumen = generar_informes(
+            args.archivo,
+            [tuple(periodo) for periodo in args.periodo],
+            _carpeta_salida(args),
+            args.notas,
+            log,
+            nombres=[args.nombre] if args.nombre else None,
+            ruta_db=next((ruta for ruta in (args.db, args.desde_almacen) if ruta not in (None, True)), None),
+            importar=bool(args.db),
+            desde_almacen=bool(args.desde_almacen),
+            usar_cache=not args.sin_cache,
+            paralelo=args.paralelo,
+            max_workers=settings.EXCEL_READ_CONFIG["MAX_WORKERS"],
+            podar_columnas=settings.EXCEL_READ_CONFIG["ONLY_REPORT_COLUMNS"],
+            streaming=args.streaming,
+            filas_por_bloque=settings.EXCEL_READ_CONFIG["STREAMING_CHUNK_ROWS"]
+        )
+    except Exception as e:
+        print(f"Error al procesar el archivo: {e}", file=sys.stderr)
+        return 1
+
+    if resumen["error_lectura"]:
+        print(f"lectura: {resumen['error_lectura']}", file=sys.stderr)
+        return 1
+    print(f"lectura: {resumen['lectura_s']:.2f} s ({resumen['servicios']} servicios)")
+    if resumen["error_almacen"]:
+        print(f"almacén: {resumen['error_almacen']}", file=sys.stderr)
+    elif args.db:
+        print(f"almacén: {resumen['almacen_s']:.2f} s")
+    for informe in resumen["informes"]:
+        periodo = f"{informe['inicio']:%d/%m/%Y} - {informe['fin']:%d/%m/%Y}"
+        if not informe["servicios"]:
+            print(f"{periodo}: sin servicios")
+        elif informe["exito"]:
+            print(f"{periodo}: pdf {informe['segundos']:.2f} s ({informe['servicios']} servicios) -> {informe['ruta']}")
+        else:
+            print(f"{periodo}: {informe['mensaje']}", file=sys.stderr)
+    print(f"total: {resumen['total_s']:.2f} s; {resumen['generados']} PDF generados, "
+          f"{resumen['sin_datos']} sin datos, {resumen['fallidos']} con errores")
+    return 0 if exito else 1
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -34,7 +34,111 @@ PDF_CONFIG = {
     "DEFAULT_NAME": "Informe_Servicios.pdf",
     # Ruta base para guardar los PDFs (por ejemplo, en el escritorio del usuario)
     # Adapta esta ruta si tu OneDrive/Escritorio tiene otro nombre o ubicación.
-    "OUTPUT_BASE_FOLDER_NAME": "pdf-relacion-servicios-en-efectivo"
+    "OUTPUT_BASE_FOLDER_NAME": "pdf-relacion-servicios-en-efectivo",
+    # Imprimir subtotal de la página y totales "Van" / "Vienen" en cada salto de página
+    "CARRIED_TOTALS": True,
+    # Comprimir el contenido y escribir los encabezados repetidos una sola vez (PDF más pequeño)
+    "COMPACT_OUTPUT": True,
+    # Dibujar las páginas de los informes grandes por tramos en varios procesos
+    "PARALLEL_RENDER": False,
+    # Filas a partir de las cuales se dibuja en paralelo (con menos no compensa crear los procesos)
+    "PARALLEL_MIN_ROWS": 5000,
+    # Número máximo de procesos para dibujar; None usa el número de CPUs
+    "RENDER_WORKERS": None,
+}
+
+# --- Lectura de archivos Excel ---
+EXCEL_READ_CONFIG = {
+    # Leer las hojas repartidas en varios procesos (útil con muchas hojas, una por técnico)
+    "PARALLEL_SHEETS": False,
+    # Número máximo de procesos; None usa el número de CPUs
+    "MAX_WORKERS": None,
+    # Leer de cada hoja solo las columnas que usa el informe
+    "ONLY_REPORT_COLUMNS": True,
+    # Recorrer las hojas fila a fila filtrando al vuelo (memoria acotada en libros muy grandes).
+    # Es el único modo que deja de leer una hoja ordenada por fecha al pasar del período;
+    # la lectura normal analiza siempre las hojas completas
+    "STREAMING": False,
+    # Filas que cumplen los filtros que se acumulan antes de formar cada bloque en modo streaming
+    "STREAMING_CHUNK_ROWS": 5000,
+}
+
+# --- Configuración de la caché en disco ---
+CACHE_CONFIG = {
+    # Carpeta base (dentro de LOCALAPPDATA o ~/.cache) para las cachés de la aplicación
+    "BASE_FOLDER_NAME": "app-relacion-servicios",
+    # Subcarpeta para las hojas de Excel ya leídas
+    "EXCEL_FOLDER_NAME": "excel",
+    # Tamaño máximo de la caché de hojas antes de eliminar las entradas más antiguas
+    "EXCEL_MAX_BYTES": 500 * 1024 * 1024,
+    # Subcarpeta y tamaño máximo de la caché de informes PDF ya generados
+    "PDF_FOLDER_NAME": "pdf",
+    "PDF_MAX_BYTES": 200 * 1024 * 1024,
+}
+
+# --- Generación de informes por lotes (src/core/batch.py) ---
+BATCH_CONFIG = {
+    # Procesos para generar los PDF en paralelo; None usa el número de CPUs y 1 los genera en secuencia
+    "PDF_WORKERS": None,
+}
+
+# --- Tareas en segundo plano de la interfaz (src/utils/job_runner.py) ---
+JOB_CONFIG = {
+    # Hilos para las tareas largas (procesar el Excel y generar el PDF pueden coincidir)
+    "MAX_WORKERS": 2,
+    # Cada cuántos milisegundos se revisa si terminó alguna tarea
+    "POLL_INTERVAL_MS": 100,
+}
+
+# --- Progreso de las tareas largas (src/utils/progress.py) ---
+PROGRESS_CONFIG = {
+    # Segundos mínimos entre dos avisos de progreso de la misma etapa
+    "MIN_INTERVAL_S": 0.25,
+}
+
+# --- Terminal de log de la interfaz ---
+LOG_CONFIG = {
+    # Cada cuántos milisegundos se escriben en la terminal los mensajes pendientes
+    "FLUSH_INTERVAL_MS": 100,
+    # Máximo de mensajes que se escriben en cada lote, para no bloquear la interfaz
+    "MAX_BATCH": 500,
+    # Mensajes que se conservan; al llenarse se descartan los más antiguos
+    "CAPACITY": 20000,
+    # Mensajes que se cargan en la terminal a la vez y cuántos se avanza al llegar a un borde
+    "VIEW_LINES": 500,
+    "VIEW_MARGIN": 200,
+}
+
+# --- Exportación de los servicios procesados (CSV, Excel y Parquet) ---
+EXPORT_CONFIG = {
+    # Filas que se preparan y escriben de una vez (la memoria no crece con el tamaño del archivo)
+    "CHUNK_ROWS": 50000,
+    # Separador y decimales que Excel en español abre directamente
+    "CSV_SEPARATOR": ";",
+    "CSV_DECIMAL": ",",
+    # utf-8 con BOM para que Excel muestre bien las tildes
+    "CSV_ENCODING": "utf-8-sig",
+    "XLSX_SHEET_NAME": "Servicios",
+}
+
+# --- Vista previa de los servicios procesados (src/core/report_preview.py) ---
+PREVIEW_CONFIG = {
+    # Filas que se dibujan a la vez en la tabla (el resto se muestra al desplazarse)
+    "VISIBLE_ROWS": 12,
+    # Filas que se preparan de una vez y cuántos de esos bloques se guardan
+    "BLOCK_ROWS": 200,
+    "CACHED_BLOCKS": 20,
+    # Filas que avanza cada paso de la rueda del ratón
+    "WHEEL_ROWS": 3,
+}
+
+# --- Almacén local de servicios (SQLite) ---
+STORE_CONFIG = {
+    # Subcarpeta (dentro de la carpeta base de la aplicación) y nombre de la base
+    "FOLDER_NAME": "datos",
+    "DB_FILE_NAME": "servicios.sqlite3",
+    # Guardar en el almacén los servicios de cada procesamiento
+    "IMPORT_AFTER_PROCESS": True,
 }
 
 # --- Rutas de Recursos (Icons, Logos) ---
@@ -73,6 +177,16 @@ APP_MESSAGES = {
     "RECORDS_FOUND": "Se encontraron {} registros",
     "PROCESS_ERROR": "❌ Error durante el procesamiento:",
     "PROCESS_COMPLETE": "✅ Procesamiento completado",
+    "PROCESS_CANCELLING": "⏹️ Cancelando el procesamiento (se detiene al terminar la hoja actual)...",
+    "PROCESS_CANCELLED": "⏹️ Procesamiento cancelado",
+    "PDF_CANCELLING": "⏹️ Cancelando la generación del PDF...",
+    "PDF_CANCELLED": "⏹️ Generación del PDF cancelada",
+    "TASK_RUNNING": "Espera a que termine la tarea en curso o cancélala",
+    "PROGRESS_READING": "Leyendo hoja {} de {}",
+    "PROGRESS_ANALYZING": "Analizando hoja {} de {}",
+    "PROGRESS_PDF": "Dibujando PDF: página {} ({} de {} filas)",
+    "PROGRESS_ROWS": "{} filas",
+    "PROGRESS_ETA": "faltan ~{}",
     "PDF_NOT_EXIST": "❌ El archivo PDF no existe o la ruta es incorrecta",
     "ERROR_TITLE": "Error",
     "TERMINAL_TITLE": "Conosola de Procesamiento", # <--- NUEVA
@@ -105,6 +219,14 @@ APP_MESSAGES = {
     "SYSTEMS_OPERATIONAL": "🔧 Todos los sistemas operativos",
     "WAITING_INSTRUCTIONS": "📋 Esperando instrucciones...",
     "LOG_CLEARED": "🧹 Log limpiado",
+    "BUTTON_EXPORT_LOG_TEXT": "Guardar log",
+    "LOG_EXPORT_TITLE": "Guardar log de procesamiento",
+    "LOG_EXPORT_FILE_TYPES": [("Texto", "*.txt")],
+    "LOG_EXPORT_DEFAULT_NAME": "log_procesamiento.txt",
+    "LOG_EXPORTED": "💾 Log guardado en {}",
+    "LOG_FILTER_ALL": "Todos",
+    "LOG_FILTER_WARNINGS": "Avisos y errores",
+    "LOG_FILTER_ERRORS": "Solo errores",
     "THEME_UPDATED": "🎨 Tema actualizado",
     "THEME_CHANGED": "🎨 Tema cambiado a:",
     "WARNING_ICON_NOT_FOUND": "Advertencia: No se pudo cargar el icono de {}: {}",
@@ -142,6 +264,8 @@ APP_MESSAGES = {
     "PDF_NAME_PLACEHOLDER": "Escribe el nombre del archivo PDF...",
     "BUTTON_PROCESS_TEXT": " Procesar Datos",
     "BUTTON_PROCESSING_TEXT": "⏳ Procesando...", # Para el estado de "procesando"
+    "BUTTON_CANCEL_PROCESS_TEXT": "⏹ Cancelar procesamiento", # El botón Procesar cancela mientras se procesa
+    "BUTTON_CANCEL_PDF_TEXT": "⏹ Cancelar", # El botón Generar PDF cancela mientras se genera
     "BUTTON_GENERATE_PDF_TEXT": " Generar PDF",
     "BUTTON_OPEN_PDF_TEXT": " Abrir PDF",
     "ACTION_CARD_ICON_NAME": "acciones", # Nombre para el warning del icono "🎯"
@@ -161,6 +285,20 @@ APP_MESSAGES = {
     "THEME_VALUES_OSCURO": "Oscuro",
     "THEME_VALUES_SISTEMA": "Sistema",
     "MENU_CLOSE_BUTTON": "Cerrar",
+    "MENU_CLEAR_CACHE_BUTTON": "Limpiar caché",
+    "CACHE_CLEARED": "🧹 Caché de archivos Excel e informes limpiada ({} entradas eliminadas)",
+    "CACHE_CLEAR_ERROR": "❌ Error al limpiar la caché: {}",
+    "STORE_IMPORTED": "🗄️ {} servicios guardados en el almacén local",
+    "STORE_IMPORT_ERROR": "⚠️ No se pudieron guardar los servicios en el almacén local: {}",
+    "MENU_EXPORT_BUTTON": "Exportar datos",
+    "EXPORT_TITLE": "Exportar servicios procesados",
+    "EXPORT_FILE_TYPES": [("Excel", "*.xlsx"), ("CSV", "*.csv"), ("Parquet", "*.parquet")],
+    "EXPORT_NO_DATA": "No hay servicios procesados para exportar",
+    "EXPORT_PARQUET_UNAVAILABLE": "La exportación a Parquet no está disponible: instala pyarrow (pip install pyarrow)",
+    "EXPORT_DONE": "📤 {}",
+    "PREVIEW_TITLE": "Vista previa de servicios",
+    "PREVIEW_COUNT": "{} servicios",
+    "PREVIEW_EMPTY": "Procesa un archivo para ver aquí los servicios",
     "NOTES_CARD_TITLE": "Notas del Informe", # Título del card de notas
     "NOTES_ICON_WARNING_NAME": "notas", # Nombre para el warning del icono de notas
     "NOTES_ENTRY_PLACEHOLDER": "Escribe tus notas aquí...",
@@ -176,6 +314,21 @@ def get_pdf_output_path(pdf_name):
     os.makedirs(base_folder_path, exist_ok=True) # Asegura que la carpeta exista
     return os.path.join(base_folder_path, pdf_name)
 
+def get_cache_dir(nombre_carpeta):
+    """
+    Construye la ruta de una carpeta de caché de la aplicación y se asegura de que exista.
+    """
+    base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~/.cache")
+    carpeta = os.path.join(base, CACHE_CONFIG["BASE_FOLDER_NAME"], nombre_carpeta)
+    os.makedirs(carpeta, exist_ok=True)
+    return carpeta
+
+def get_store_path():
+    """
+    Construye la ruta de la base SQLite del almacén local de servicios.
+    """
+    return os.path.join(get_cache_dir(STORE_CONFIG["FOLDER_NAME"]), STORE_CONFIG["DB_FILE_NAME"])
+
 def hex_to_rgb(hex_color):
     """Convierte un color HEX a una tupla RGB (R, G, B)."""
     hex_color = hex_color.lstrip('#')
@@ -1,9 +1,16 @@
-from .excel_processor import extraer_servicios
-from .pdf_generator import generar_pdf, generar_pdf_modular, _abrir_pdf
+from .excel_processor import extraer_servicios, ErrorLecturaExcel
+from .pdf_generator import generar_pdf, generar_pdf_bytes, generar_pdf_modular, _abrir_pdf
+from .exporters import exportar_servicios
+from .service_store import importar_servicios, consultar_servicios
 
 __all__ = [
     'extraer_servicios',
+    'ErrorLecturaExcel',
     'generar_pdf',
+    'generar_pdf_bytes',
     'generar_pdf_modular',
-    '_abrir_pdf'
+    '_abrir_pdf',
+    'exportar_servicios',
+    'importar_servicios',
+    'consultar_servicios'
 ]
@@ -0,0 +1,153 @@
+# src/core/batch.py
+"""
+Generación de informes por lotes: varios períodos a partir de una sola lectura
+del archivo Excel.
+
+El libro se procesa una vez para el rango que cubre todos los períodos (o, con
+desde_almacen, los servicios se consultan en el almacén local sin abrir ningún
+Excel), el resultado se reparte por período y los PDF se generan en paralelo en
+un pool de procesos con generar_pdf.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from src.config import settings
+from src.core.excel_processor import extraer_servicios, ErrorLecturaExcel
+from src.core.pdf_generator import generar_pdf
+from src.core.service_store import importar_servicios, consultar_servicios
+
+def nombre_informe(fecha_inicio, fecha_fin):
+    """Nombre por defecto del PDF de un período: Informe_Servicios_AAAAMMDD_AAAAMMDD.pdf"""
+    base, extension = os.path.splitext(settings.PDF_CONFIG["DEFAULT_NAME"])
+    return f"{base}_{fecha_inicio:%Y%m%d}_{fecha_fin:%Y%m%d}{extension}"
+
+def generar_informes(excel_path, periodos, carpeta_salida, notas="", log_callback=None, nombres=None,
+                     procesos=None, ruta_db=None, importar=False, desde_almacen=False, **opciones_lectura):
+    """
+    Genera un PDF por cada período leyendo el archivo Excel una sola vez.
+
+    Args:
+        excel_path (str): Archivo Excel con los servicios; con desde_almacen,
+                          solo se usan los servicios guardados de este archivo
+                          (None para todos los del almacén)
+        periodos (list): Tuplas (fecha_inicio, fecha_fin)
+        carpeta_salida (str): Carpeta donde se guardan los PDF
+        notas (str): Notas que se añaden a cada informe
+        log_callback (function): Función para mostrar mensajes (opcional)
+        nombres (list): Nombre del PDF de cada período (por defecto nombre_informe)
+        procesos (int): Procesos para generar los PDF (None usa la configuración)
+        ruta_db (str): Base SQLite del almacén local (opcional)
+        importar (bool): Guardar también los servicios en el almacén local
+        desde_almacen (bool): Consultar los servicios en el almacén local en
+                              lugar de leer el archivo Excel
+        **opciones_lectura: Opciones de extraer_servicios (usar_cache, paralelo, ...)
+
+    Returns:
+        tuple: (exito, resumen) donde resumen es un dict con 'servicios',
+               'lectura_s', 'almacen_s', 'total_s', 'generados', 'sin_datos',
+               'fallidos', 'error_lectura' (el mensaje si no se pudo leer el
+               archivo; entonces no se genera ningún informe y exito es False),
+               'error_almacen' (el mensaje si no se pudieron guardar los
+               servicios en el almacén; los informes se generan igual, pero
+               exito es False) e 'informes' (un dict por período, en el orden pedido, con
+               'inicio', 'fin', 'ruta', 'servicios', 'exito', 'mensaje' y
+               'segundos' de generación del PDF)
+    """
+    if log_callback is None:
+        log_callback = print
+    if procesos is None:
+        procesos = settings.BATCH_CONFIG["PDF_WORKERS"]
+
+    inicio_total = time.perf_counter()
+    resumen = {"servicios": 0, "lectura_s": 0.0, "almacen_s": 0.0, "total_s": 0.0,
+               "generados": 0, "sin_datos": 0, "fallidos": 0, "error_lectura": None, "error_almacen": None,
+               "informes": []}
+    if not periodos:
+        return False, resumen
+
+    # Una sola lectura para el rango que cubre todos los períodos
+    desde = min(inicio for inicio, _ in periodos)
+    hasta = max(fin for _, fin in periodos)
+    t = time.perf_counter()
+    if desde_almacen:
+        df = consultar_servicios(desde, hasta, archivo=excel_path, ruta_db=ruta_db)
+        log_callback(f"{len(df)} servicios consultados en el almacén local")
+    else:
+        try:
+            df = extraer_servicios(excel_path, desde, hasta, log_callback, incluir_hoja=importar,
+                                   **opciones_lectura)
+        except ErrorLecturaExcel as e:
+            # Sin datos de origen los períodos no están vacíos: no se sabe qué contienen
+            resumen["error_lectura"] = str(e)
+            resumen["lectura_s"] = resumen["total_s"] = time.perf_counter() - t
+            return False, resumen
+    resumen["lectura_s"] = time.perf_counter() - t
+    resumen["servicios"] = len(df)
+
+    if importar and not desde_almacen:
+        t = time.perf_counter()
+        try:
+            importar_servicios(df, excel_path, desde, hasta, ruta_db=ruta_db)
+        except Exception as e:
+            log_callback(f"No se pudieron guardar los servicios en el almacén: {str(e)}", 'error')
+            resumen["error_almacen"] = str(e)
+        resumen["almacen_s"] = time.perf_counter() - t
+
+    os.makedirs(carpeta_salida, exist_ok=True)
+    trabajos = []
+    for i, (fecha_inicio, fecha_fin) in enumerate(periodos):
+        nombre = nombres[i] if nombres else nombre_informe(fecha_inicio, fecha_fin)
+        informe = {"inicio": fecha_inicio, "fin": fecha_fin, "ruta": os.path.join(carpeta_salida, nombre),
+                   "servicios": 0, "exito": True, "mensaje": "", "segundos": 0.0}
+        resumen["informes"].append(informe)
+
+        parte = df[df['FECHA'].between(fecha_inicio, fecha_fin)] if not df.empty else df
+        informe["servicios"] = len(parte)
+        if parte.empty:
+            informe["mensaje"] = settings.APP_MESSAGES["NO_RECORDS_FOUND"]
+            resumen["sin_datos"] += 1
+            log_callback(f"Período {fecha_inicio:%d/%m/%Y} - {fecha_fin:%d/%m/%Y}: sin servicios, no se genera PDF",
+                         'warning')
+            continue
+        trabajos.append((informe, (parte, informe["ruta"], notas, fecha_inicio, fecha_fin)))
+
+    for informe, (exito, mensaje, segundos) in _generar_pdfs(trabajos, procesos, log_callback):
+        informe.update(exito=exito, mensaje=mensaje, segundos=segundos)
+        if exito:
+            resumen["generados"] += 1
+            log_callback(f"PDF generado en {segundos:.2f} s: {informe['ruta']}", 'success')
+        else:
+            resumen["fallidos"] += 1
+            log_callback(f"{mensaje} ({informe['inicio']:%d/%m/%Y} - {informe['fin']:%d/%m/%Y})", 'error')
+
+    resumen["total_s"] = time.perf_counter() - inicio_total
+    return resumen["fallidos"] == 0 and resumen["error_almacen"] is None, resumen
+
+def _generar_pdfs(trabajos, procesos, log_callback):
+    """
+    Genera los PDF en un pool de procesos y devuelve (informe, resultado) a
+    medida que terminan. Con un solo PDF, o si el pool deja de funcionar, los
+    pendientes se generan en este mismo proceso.
+    """
+    pendientes = dict(enumerate(trabajos))
+    if len(pendientes) > 1 and procesos != 1:
+        try:
+            with ProcessPoolExecutor(max_workers=procesos) as pool:
+                futuros = {pool.submit(_generar_pdf_cronometrado, *argumentos): i
+                           for i, (_, argumentos) in pendientes.items()}
+                for futuro in as_completed(futuros):
+                    resultado = futuro.result()
+                    informe, _ = pendientes.pop(futuros[futuro])
+                    yield informe, resultado
+        except Exception as e:
+            log_callback(f"No se pudieron generar los PDF en paralelo, se continúa en modo secuencial: {str(e)}",
+                         'warning')
+
+    for informe, argumentos in pendientes.values():
+        yield informe, _generar_pdf_cronometrado(*argumentos)
+
+def _generar_pdf_cronometrado(df, ruta_pdf, notas, fecha_inicio, fecha_fin):
+    """Llama a generar_pdf y devuelve (exito, mensaje, segundos)."""
+    t = time.perf_counter()
+    exito, mensaje = generar_pdf(df, ruta_pdf, notas, fecha_inicio, fecha_fin)
+    return exito, mensaje, time.perf_counter() - t
@@ -0,0 +1,218 @@
+# src/core/excel_cache.py
+"""
+Caché en disco de las hojas ya leídas de un archivo Excel.
+
+Cada versión de un archivo se identifica por su huella (ruta, tamaño, fecha de
+modificación y hash del contenido). Las hojas leídas se guardan en binario con
+pickle, que conserva los bloques columnares de cada DataFrame tal cual, de modo
+que cambiar solo el período vuelve a filtrar sin tener que abrir el Excel.
+
+Junto a las hojas se guarda una marca por hoja (su número de filas) que
+permite, cuando el archivo crece sin cambiar lo ya leído, convertir solo las
+filas nuevas y añadirlas a las hojas de la versión anterior.
+"""
+import json
+import os
+import pickle
+from src.config import settings
+from src.utils.cache_utils import hash_archivo, marcar_uso, expulsar_lru
+
+_NOMBRE_INDICE = "indice.json"
+_EXTENSION = ".pkl"
+_SUFIJO_FECHAS = "-fechas.json"
+_SUFIJO_MARCAS = "-marcas.json"
+
+def _directorio(directorio=None):
+    """Devuelve la carpeta de la caché, usando la de la configuración por defecto."""
+    return directorio or settings.get_cache_dir(settings.CACHE_CONFIG["EXCEL_FOLDER_NAME"])
+
+def _leer_indice(directorio):
+    """Lee el índice ruta -> huella registrada. Si no existe o está dañado devuelve {}."""
+    try:
+        with open(os.path.join(directorio, _NOMBRE_INDICE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _registrar_huella(directorio, huella):
+    """Guarda en el índice la huella conocida para la ruta del archivo."""
+    indice = _leer_indice(directorio)
+    indice[huella["ruta"]] = {
+        "tamano": huella["tamano"],
+        "mtime": huella["mtime"],
+        "hash": huella["hash"],
+    }
+    _escribir_indice(directorio, indice)
+
+def _escribir_indice(directorio, indice):
+    ruta_indice = os.path.join(directorio, _NOMBRE_INDICE)
+    with open(ruta_indice + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(indice, f)
+    os.replace(ruta_indice + ".tmp", ruta_indice)
+
+def _ruta_entrada(directorio, huella, variante):
+    return os.path.join(directorio, f"{huella['hash']}-{variante}{_EXTENSION}")
+
+def _ruta_marcas(directorio, huella, variante):
+    return os.path.join(directorio, f"{huella['hash']}-{variante}{_SUFIJO_MARCAS}")
+
+def huella_archivo(excel_path, directorio=None):
+    """
+    Calcula la huella de un archivo: ruta absoluta, tamaño, fecha de modificación
+    y hash del contenido. El hash solo se recalcula si el tamaño o la fecha
+    cambiaron respecto a lo registrado en el índice de la caché.
+
+    Returns:
+        dict: Claves 'ruta', 'tamano', 'mtime', 'hash' y 'anterior' (hash de la
+              versión registrada antes para la misma ruta si el contenido cambió,
+              o None)
+    """
+    directorio = _directorio(directorio)
+    ruta = os.path.abspath(excel_path)
+    st = os.stat(ruta)
+
+    previa = _leer_indice(directorio).get(ruta)
+    if previa and previa["tamano"] == st.st_size and previa["mtime"] == st.st_mtime_ns:
+        contenido = previa["hash"]
+    else:
+        contenido = hash_archivo(ruta)
+
+    anterior = previa["hash"] if previa and previa["hash"] != contenido else None
+    return {"ruta": ruta, "tamano": st.st_size, "mtime": st.st_mtime_ns, "hash": contenido,
+            "anterior": anterior}
+
+def cargar_hojas(excel_path, variante="completo", directorio=None):
+    """
+    Busca en la caché las hojas leídas de la versión actual del archivo.
+
+    Args:
+        excel_path (str): Ruta del archivo Excel
+        variante (str): Identifica cómo se leyeron las hojas
+        directorio (str): Carpeta de la caché (opcional)
+
+    Returns:
+        tuple: (huella, hojas) donde hojas es la lista de tuplas (nombre, DataFrame)
+               o None si no hay una entrada para esta versión del archivo
+    """
+    directorio = _directorio(directorio)
+    huella = huella_archivo(excel_path, directorio)
+    ruta = _ruta_entrada(directorio, huella, variante)
+    if not os.path.exists(ruta):
+        return huella, None
+
+    with open(ruta, 'rb') as f:
+        hojas = pickle.load(f)
+    marcar_uso(ruta)
+    _registrar_huella(directorio, huella)
+    return huella, hojas
+
+def cargar_marcas(huella, variante="completo", directorio=None):
+    """Devuelve las marcas guardadas para la versión del archivo, o {} si no hay."""
+    try:
+        with open(_ruta_marcas(_directorio(directorio), huella, variante), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def cargar_version_anterior(huella, variante="completo", directorio=None):
+    """
+    Busca las hojas y las marcas guardadas de la versión anterior del archivo
+    (la que estaba registrada para la misma ruta antes de que cambiara).
+
+    Returns:
+        tuple: (hojas, marcas) o (None, {}) si no hay versión anterior en la caché
+    """
+    if not huella.get("anterior"):
+        return None, {}
+    directorio = _directorio(directorio)
+    anterior = {"hash": huella["anterior"]}
+    ruta = _ruta_entrada(directorio, anterior, variante)
+    try:
+        with open(ruta, 'rb') as f:
+            hojas = pickle.load(f)
+        with open(_ruta_marcas(directorio, anterior, variante), 'r', encoding='utf-8') as f:
+            marcas = json.load(f)
+    except (OSError, ValueError, pickle.UnpicklingError):
+        return None, {}
+    return hojas, marcas
+
+def guardar_hojas(huella, hojas, variante="completo", directorio=None, max_bytes=None, marcas=None):
+    """
+    Guarda las hojas leídas de un archivo (y sus marcas de filas, si se dan) y
+    expulsa las entradas más antiguas si la caché supera el tamaño máximo configurado.
+    """
+    directorio = _directorio(directorio)
+    if max_bytes is None:
+        max_bytes = settings.CACHE_CONFIG["EXCEL_MAX_BYTES"]
+
+    ruta = _ruta_entrada(directorio, huella, variante)
+    with open(ruta + ".tmp", 'wb') as f:
+        pickle.dump(hojas, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(ruta + ".tmp", ruta)
+
+    if marcas is not None:
+        ruta_marcas = _ruta_marcas(directorio, huella, variante)
+        with open(ruta_marcas + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(marcas, f)
+        os.replace(ruta_marcas + ".tmp", ruta_marcas)
+
+    _registrar_huella(directorio, huella)
+    for expulsada in expulsar_lru(directorio, max_bytes, _EXTENSION):
+        # Con las hojas se van también las marcas, el índice de fechas y la huella de esa versión
+        eliminar_version(os.path.basename(expulsada).split("-", 1)[0], directorio)
+
+def eliminar_version(hash_contenido, directorio=None):
+    """
+    Elimina todas las entradas (hojas, marcas e índice de fechas) de una versión
+    de un archivo y la quita del índice de huellas.
+    """
+    directorio = _directorio(directorio)
+    for nombre in os.listdir(directorio):
+        if nombre.startswith(hash_contenido + "-"):
+            try:
+                os.remove(os.path.join(directorio, nombre))
+            except OSError:
+                pass
+
+    indice = _leer_indice(directorio)
+    restantes = {ruta: datos for ruta, datos in indice.items() if datos.get("hash") != hash_contenido}
+    if len(restantes) != len(indice):
+        _escribir_indice(directorio, restantes)
+
+def cargar_indice_fechas(huella, directorio=None):
+    """
+    Devuelve el índice de fechas guardado para la versión del archivo:
+    {'hojas': [nombres en orden], 'fechas': {hoja: {'min', 'max', 'ordenada', 'filas'}}},
+    o {} si todavía no existe.
+    """
+    ruta = os.path.join(_directorio(directorio), huella["hash"] + _SUFIJO_FECHAS)
+    try:
+        with open(ruta, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def guardar_indice_fechas(huella, indice, directorio=None):
+    """Guarda el índice de fechas por hoja de la versión del archivo."""
+    ruta = os.path.join(_directorio(directorio), huella["hash"] + _SUFIJO_FECHAS)
+    with open(ruta + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(indice, f)
+    os.replace(ruta + ".tmp", ruta)
+
+def limpiar_cache(directorio=None):
+    """
+    Elimina todas las entradas de la caché de hojas, sus marcas, índices de fechas y el índice de huellas.
+
+    Returns:
+        int: Número de entradas eliminadas
+    """
+    directorio = _directorio(directorio)
+    eliminadas = 0
+    for nombre in os.listdir(directorio):
+        ruta = os.path.join(directorio, nombre)
+        if nombre.endswith(_EXTENSION):
+            os.remove(ruta)
+            eliminadas += 1
+        elif nombre == _NOMBRE_INDICE or nombre.endswith((_SUFIJO_FECHAS, _SUFIJO_MARCAS)):
+            os.remove(ruta)
+    return eliminadas
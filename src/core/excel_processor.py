@@ -1,215 +1,868 @@
+import numbers
+from datetime import datetime
+import numpy as np
+import openpyxl
 import pandas as pd
-from src.utils.validation_utils import limpiar_valor_monetario
-
-def extraer_servicios(excel_path, fecha_inicio, fecha_fin, log_callback=None):
+from concurrent.futures import ProcessPoolExecutor
+from src.core import excel_cache
+from src.utils.validation_utils import limpiar_valores_monetarios
+from src.utils.job_runner import TareaCancelada, comprobar_cancelacion
+from src.utils.progress import avisar_progreso
+
+class ErrorLecturaExcel(Exception):
+    """Se lanza cuando el archivo Excel no se puede abrir (no existe, está dañado o no es un Excel)."""
+
+def extraer_servicios(excel_path, fecha_inicio, fecha_fin, log_callback=None, usar_cache=False,
+                      paralelo=False, max_workers=None, podar_columnas=False, streaming=False,
+                      filas_por_bloque=5000, cancelacion=None, progreso=None, incluir_hoja=False):
     """
     Extrae los servicios del archivo Excel que cumplan con los criterios:
     1. FORMA DE PAGO = "EFECTIVO"
     2. ESTADO DEL SERVICIO = VACÍO
     3. En el rango de fechas especificado
+
+    Si usar_cache es True, las hojas leídas se guardan en la caché en disco
+    (ver src/core/excel_cache.py) y las siguientes ejecuciones sobre el mismo
+    archivo sin cambios solo vuelven a filtrar, sin releer el Excel.
+
+    Si paralelo es True, las hojas se leen repartidas en un pool de procesos
+    (max_workers procesos como máximo); el resultado y el orden de los mensajes
+    del log son los mismos que en la lectura secuencial.
+
+    Si podar_columnas es True, de cada hoja se lee primero solo el encabezado y
+    después únicamente las columnas que usa el informe (fecha, pago, estado,
+    dirección, servicio, valores, IVA y materiales).
+
+    Si streaming es True, cada hoja se recorre fila a fila con openpyxl en modo
+    de solo lectura aplicando ahí mismo los filtros de fecha, EFECTIVO y estado
+    vacío; solo las filas que cumplen se guardan, en bloques de filas_por_bloque,
+    así que la memoria no depende del tamaño de la hoja. Este modo es secuencial
+    y no guarda las hojas en la caché, porque lo leído ya depende del período;
+    con usar_cache sí usa el índice de fechas por hoja para saltar hojas y dejar
+    de leer una hoja ordenada en cuanto sus fechas pasan de fecha_fin. Solo en
+    este modo se ahorra leer el final de una hoja ordenada: la lectura normal
+    analiza cada hoja completa (es lo que se guarda en la caché) y en las hojas
+    ordenadas solo se ahorra el filtrado, con _recortar_hoja_ordenada.
+
+    Con cancelacion (un TokenCancelacion de src/utils/job_runner.py), entre
+    hoja y hoja se comprueba si se pidió cancelar; en ese caso se lanza
+    TareaCancelada y no se guarda nada en la caché.
+
+    Con progreso (por ejemplo un Progreso de src/utils/progress.py) se avisa
+    del avance: progreso("hojas", i, N, filas=...) al leer cada hoja y
+    progreso("analisis", i, N) al filtrar cada una.
+
+    Si el archivo no se puede abrir se lanza ErrorLecturaExcel, para no
+    confundirlo con un período sin servicios.
+
+    Con incluir_hoja se añade la columna HOJA con la hoja de origen de cada
+    servicio, que solo necesita el almacén local (importar_servicios).
     """
     if log_callback is None:
         log_callback = print
 
     log_callback("Procesando datos del archivo Excel...")
 
+    hojas = None
+    if streaming:
+        hojas = _leer_hojas_streaming(excel_path, fecha_inicio, fecha_fin, log_callback, filas_por_bloque,
+                                      usar_cache, cancelacion, progreso)
+    if hojas is None:
+        hojas = _leer_hojas(excel_path, log_callback, usar_cache, paralelo, max_workers, podar_columnas,
+                            fecha_inicio, fecha_fin, cancelacion, progreso)
+
+    frames = []
+
+    for i, (hoja, df) in enumerate(hojas, start=1):
+        comprobar_cancelacion(cancelacion)
+        try:
+            log_callback(f"\nAnalizando hoja: {hoja}")
+            df = _procesar_hoja(df, hoja, fecha_inicio, fecha_fin, log_callback, incluir_hoja)
+            if df is not None:
+                frames.append(df)
+        except Exception as e:
+            log_callback(f"Error al procesar hoja {hoja}: {str(e)}", 'error')
+        finally:
+            avisar_progreso(progreso, "analisis", i, len(hojas))
+
+    result = pd.concat(frames) if frames else pd.DataFrame()
+    log_callback(f"\nSe encontraron {len(result)} servicios en total.", 'success')
+    return result
+
+def _leer_hojas(excel_path, log_callback, usar_cache=False, paralelo=False, max_workers=None,
+                podar_columnas=False, fecha_inicio=None, fecha_fin=None, cancelacion=None, progreso=None):
+    """
+    Lee las hojas del archivo Excel y devuelve una lista de tuplas
+    (nombre_hoja, DataFrame) en el orden del libro. Lanza ErrorLecturaExcel si
+    el archivo no se pudo abrir.
+
+    Con usar_cache, las hojas se guardan en la caché junto con un índice de
+    fechas por hoja (mínima, máxima y si están ordenadas). En las siguientes
+    ejecuciones sobre el mismo archivo, las hojas cuyo rango de fechas no se
+    cruza con fecha_inicio..fecha_fin no se leen ni se procesan.
+
+    Si el archivo cambió pero la caché tiene su versión anterior, de cada hoja
+    cuyas filas ya leídas siguen iguales (comparadas con las de la caché) solo
+    se preparan y anexan las filas añadidas al final; las hojas editadas, con filas
+    borradas o con columnas nuevas se leen completas.
+
+    Las hojas se devuelven (y se guardan en la caché) ya preparadas con
+    _preparar_hoja, de modo que esa limpieza se hace una sola vez por fila.
+    """
+    huella = None
+    variante = "columnas" if podar_columnas else "completo"
+    en_cache = {}
+    indice = {}
+    marcas = {}
+    if usar_cache:
+        try:
+            huella, hojas_cache = excel_cache.cargar_hojas(excel_path, variante)
+            indice = excel_cache.cargar_indice_fechas(huella)
+            en_cache = dict(hojas_cache or [])
+            marcas = excel_cache.cargar_marcas(huella, variante) if en_cache else {}
+        except Exception as e:
+            log_callback(f"No se pudo leer la caché: {str(e)}", 'warning')
+
+    nombres_hojas = indice.get("hojas")
+    if nombres_hojas is not None:
+        nombres_hojas = _omitir_hojas_fuera_de_rango(nombres_hojas, indice, fecha_inicio, fecha_fin, log_callback)
+        if all(hoja in en_cache for hoja in nombres_hojas):
+            log_callback(f"📦 Usando datos en caché ({len(nombres_hojas)} hojas), el archivo no ha cambiado")
+            return [(hoja, en_cache[hoja]) for hoja in nombres_hojas]
+
     try:
         xls = pd.ExcelFile(excel_path)
     except Exception as e:
-        log_callback(f"Error al abrir el archivo Excel: {str(e)}", 'error')
-        return pd.DataFrame()
+        raise ErrorLecturaExcel(f"No se pudo abrir el archivo Excel: {str(e)}") from e
 
-    frames = []
+    if nombres_hojas is None:
+        nombres_hojas = xls.sheet_names
+    por_leer = [hoja for hoja in nombres_hojas if hoja not in en_cache]
+    todas_las_hojas = xls.sheet_names
 
-    for hoja in xls.sheet_names:
+    try:
+        incrementales = {}
+        if usar_cache and huella is not None and huella.get("anterior") and por_leer:
+            incrementales = _leer_hojas_incremental(xls, huella, variante, por_leer, log_callback, podar_columnas)
+            por_leer = [hoja for hoja in por_leer if hoja not in incrementales]
+
+        leidas = None
+        if paralelo and len(por_leer) > 1:
+            try:
+                leidas = _leer_hojas_paralelo(excel_path, por_leer, log_callback, max_workers, podar_columnas,
+                                              cancelacion, progreso)
+            except TareaCancelada:
+                raise
+            except Exception as e:
+                log_callback(f"No se pudo leer en paralelo, se continúa en modo secuencial: {str(e)}", 'warning')
+
+        if leidas is None:
+            leidas = []
+            filas = 0
+            for i, hoja in enumerate(por_leer, start=1):
+                comprobar_cancelacion(cancelacion)
+                try:
+                    leidas.append((hoja, _parsear_hoja(xls, hoja, podar_columnas)))
+                    filas += len(leidas[-1][1])
+                except Exception as e:
+                    log_callback(f"Error al procesar hoja {hoja}: {str(e)}", 'error')
+                avisar_progreso(progreso, "hojas", i, len(por_leer), filas=filas)
+    finally:
+        # Cerrar el archivo para no dejarlo bloqueado (por ejemplo si el usuario lo tiene abierto en Excel)
+        xls.close()
+
+    leidas = dict(leidas)
+    if usar_cache:
+        marcas.update({hoja: _marca_hoja(df) for hoja, df in leidas.items()})
+    leidas = {hoja: _preparar_hoja(df) for hoja, df in leidas.items()}
+    for hoja, (df, marca) in incrementales.items():
+        leidas[hoja] = df
+        marcas[hoja] = marca
+    if usar_cache and huella is not None and leidas:
         try:
-            log_callback(f"\nAnalizando hoja: {hoja}")
-            df = xls.parse(hoja)
+            guardadas = [(hoja, leidas.get(hoja, en_cache.get(hoja))) for hoja in todas_las_hojas
+                         if hoja in leidas or hoja in en_cache]
+            excel_cache.guardar_hojas(
+                huella, guardadas, variante,
+                marcas={hoja: marcas[hoja] for hoja, _ in guardadas if hoja in marcas}
+            )
+            fechas = indice.get("fechas", {})
+            for hoja, df in leidas.items():
+                fechas.setdefault(hoja, _resumen_fechas(df))
+            excel_cache.guardar_indice_fechas(huella, {"hojas": todas_las_hojas, "fechas": fechas})
+            if huella.get("anterior"):
+                # La versión anterior del archivo ya no se va a volver a usar
+                excel_cache.eliminar_version(huella["anterior"])
+        except Exception as e:
+            log_callback(f"No se pudo guardar la caché: {str(e)}", 'warning')
 
-            # Limpiar nombres de columnas (eliminar espacios al final)
-            df.columns = df.columns.str.strip()
+    return [(hoja, leidas.get(hoja, en_cache.get(hoja))) for hoja in nombres_hojas
+            if hoja in leidas or hoja in en_cache]
 
-            # Mostrar todas las columnas que existen en la hoja
-            log_callback(f"Columnas en la hoja {hoja}:")
-            for col in df.columns:
-                log_callback(f"  - '{col}'")
+# Textos que pandas lee como celda vacía (sus na_values por defecto) y errores de
+# fórmula de Excel, que pandas también convierte en NaN
+_TEXTOS_NULOS = frozenset({
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+    '#DIV/0!', '#VALUE!', '#REF!', '#NAME?', '#NUM!', '#NULL!',
+})
 
-            if 'FECHA' not in df.columns:
-                log_callback(f"Hoja {hoja} no tiene columna FECHA. Saltando...")
-                continue
+def _leer_hojas_incremental(xls, huella, variante, nombres_hojas, log_callback, podar_columnas=False):
+    """
+    Completa las hojas de la versión anterior del archivo con las filas añadidas
+    desde entonces. Devuelve un dict hoja -> (DataFrame, marca) solo con las
+    hojas que se pudieron actualizar así; las demás quedan para la lectura completa.
+    """
+    try:
+        anteriores, marcas = excel_cache.cargar_version_anterior(huella, variante)
+    except Exception as e:
+        log_callback(f"No se pudo leer la versión anterior en caché: {str(e)}", 'warning')
+        return {}
+    if not anteriores:
+        return {}
+
+    anteriores = dict(anteriores)
+    actualizadas = {}
+    for hoja in nombres_hojas:
+        if hoja not in anteriores or hoja not in marcas:
+            continue
+        try:
+            resultado = _anexar_filas_nuevas(xls, hoja, anteriores[hoja], marcas[hoja], podar_columnas)
+        except Exception as e:
+            log_callback(f"No se pudieron leer solo las filas nuevas de la hoja {hoja}: {str(e)}", 'warning')
+            continue
+        if resultado is None:
+            log_callback(f"Hoja {hoja} modificada antes de la última fila leída, se vuelve a leer completa")
+            continue
+        nuevas = resultado[1]["filas"] - marcas[hoja]["filas"]
+        log_callback(f"Hoja {hoja}: {nuevas} filas nuevas desde la última lectura")
+        actualizadas[hoja] = resultado
+    return actualizadas
 
-            # Filtrar filas con fecha no nula
-            df = df[df['FECHA'].notnull()]
-            df['FECHA'] = pd.to_datetime(df['FECHA'], errors='coerce', dayfirst=True)
-            df = df[df['FECHA'].between(fecha_inicio, fecha_fin)]
-            log_callback(f"Registros después de filtrar por fecha: {len(df)}")
-
-            # Buscar exactamente la columna FORMA DE PAGO (ignorando espacios al final)
-            columna_pago = None
-            for col in df.columns:
-                if col.strip() == 'FORMA DE PAGO':
-                    columna_pago = col
-                    break
-
-            if not columna_pago:
-                log_callback(f"No se encontró columna exacta 'FORMA DE PAGO' en hoja {hoja}. Saltando...")
-                continue
+def _anexar_filas_nuevas(xls, hoja, df_anterior, marca, podar_columnas=False):
+    """
+    Recorre la hoja una sola vez con openpyxl. Las filas ya leídas (todas, no
+    solo las últimas) se comparan con las de la versión en caché por su hash
+    (_hash_filas, vectorizado); solo las filas añadidas después se preparan y
+    se anexan.
+
+    Las filas vacías se cuentan igual que al leer con pandas: las intermedias
+    son filas (vacías) y las del final no.
+
+    Returns:
+        tuple: (df_anterior con las filas nuevas al final, marca de la hoja
+               completa), o None si la hoja cambió en filas ya leídas, tiene
+               menos filas, cambiaron sus columnas o no es un .xlsx
+    """
+    if getattr(xls, "engine", None) != "openpyxl" or "filas" not in marca:
+        return None
+    hoja_libro = xls.book[hoja]
+    # Igual que pandas: las dimensiones guardadas en el archivo pueden no ser exactas
+    hoja_libro.reset_dimensions()
+    filas = hoja_libro.iter_rows(values_only=True)
+    encabezado = [nombre.strip() if isinstance(nombre, str) else nombre
+                  for nombre in _nombres_encabezado(next(filas, None) or ())]
+
+    columnas = list(df_anterior.columns)
+    if not set(columnas) <= set(encabezado):
+        return None
+    if podar_columnas:
+        necesarias = {col for col in _resolver_columnas(encabezado).values() if col is not None}
+        if necesarias != set(columnas):
+            return None
+    elif any(not str(nombre).startswith("Unnamed: ") and nombre not in columnas for nombre in encabezado):
+        return None
+    posiciones = [encabezado.index(col) for col in columnas]
+
+    conocidas = marca["filas"]
+    if conocidas != len(df_anterior):
+        return None
+    valores = []
+    vacias = 0
+    for fila in filas:
+        if all(valor is None or valor == "" for valor in fila):
+            vacias += 1
+            continue
+        # Las filas vacías seguidas de una con datos también son filas para pandas
+        valores.extend([[np.nan] * len(posiciones)] * vacias)
+        vacias = 0
+        valores.append([_valor_celda(fila[i]) if i < len(fila) else np.nan for i in posiciones])
+    if len(valores) < conocidas:
+        return None
+
+    leidas = pd.DataFrame(valores[:conocidas], columns=columnas).infer_objects()
+    if not np.array_equal(_hash_filas(_preparar_hoja(leidas)), _hash_filas(df_anterior)):
+        return None
+
+    marca_nueva = {"filas": len(valores)}
+    if len(valores) == conocidas:
+        return df_anterior, marca_nueva
+    df_nuevas = pd.DataFrame(valores[conocidas:], columns=columnas).infer_objects()
+    return pd.concat([df_anterior, _preparar_hoja(df_nuevas)], ignore_index=True), marca_nueva
+
+def _valor_celda(valor):
+    """Convierte un valor de openpyxl como lo hace pandas al leer la hoja (vacíos a NaN, 5.0 a 5)."""
+    if valor is None or (isinstance(valor, str) and valor in _TEXTOS_NULOS):
+        return np.nan
+    if isinstance(valor, float) and valor.is_integer():
+        return int(valor)
+    return valor
+
+def _preparar_hoja(df):
+    """
+    Limpieza de una hoja que no depende del período: quita los espacios de los
+    nombres de columna y convierte FECHA a fecha. Se hace una vez al leer la
+    hoja (o solo sobre las filas nuevas), antes de guardarla en la caché.
+    """
+    df.columns = [col.strip() if isinstance(col, str) else col for col in df.columns]
+    if 'FECHA' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['FECHA']):
+        df['FECHA'] = pd.to_datetime(df['FECHA'], errors='coerce', dayfirst=True)
+    return df
 
-            # Buscar exactamente la columna ESTADO DEL SERVICIO (ignorando espacios al final)
-            columna_estado = None
-            for col in df.columns:
-                if col.strip() == 'ESTADO DEL SERVICIO':
-                    columna_estado = col
-                    break
+def _marca_hoja(df):
+    """
+    Marca de una hoja leída: su número de filas. Las filas en sí se comparan
+    con las de la caché solo cuando el archivo cambia (_anexar_filas_nuevas).
+    """
+    return {"filas": len(df)}
 
-            if not columna_estado:
-                log_callback(f"No se encontró columna exacta 'ESTADO DEL SERVICIO' en hoja {hoja}. Saltando...")
-                continue
+def _hash_filas(df):
+    """
+    Hash (uint64) de cada fila de una hoja ya preparada, con los valores
+    normalizados para que no dependa del tipo que pandas u openpyxl den a cada
+    columna (5 y 5.0 valen lo mismo, una columna de fechas y otra de objetos
+    con las mismas fechas también).
+    """
+    normalizadas = pd.DataFrame({i: _normalizar_columna(df[col]) for i, col in enumerate(df.columns)})
+    return pd.util.hash_pandas_object(normalizadas, index=False).to_numpy()
 
-            # Mostrar valores únicos en ambas columnas antes de filtrar
-            log_callback(f"Valores únicos en {columna_pago}: {df[columna_pago].astype(str).str.upper().unique()}")
-            log_callback(f"Valores únicos en {columna_estado}: {df[columna_estado].astype(str).str.upper().unique()}")
-
-            # Filtrar por forma de pago = EFECTIVO
-            df['FORMA_PAGO_CLEAN'] = df[columna_pago].astype(str).str.upper().str.strip()
-            df = df[df['FORMA_PAGO_CLEAN'] == 'EFECTIVO']
-            log_callback(f"Registros después de filtrar por forma de pago: {len(df)}")
-
-            # Filtrar por estado del servicio vacío
-            mascara_estado = df[columna_estado].isna() | (df[columna_estado].astype(str).str.strip() == '')
-            df = df[mascara_estado]
-            
-            # Mostrar los registros que fueron excluidos (usando loc para evitar la advertencia)
-            registros_excluidos = df.loc[~mascara_estado]
-            if not registros_excluidos.empty:
-                log_callback(f"Registros excluidos por tener estado: {len(registros_excluidos)}")
-                for idx, row in registros_excluidos.iterrows():
-                    log_callback(f"  - Registro {idx}: {row[columna_estado]}")
-            
-            log_callback(f"Registros después de filtrar por estado: {len(df)}")
-
-            # Buscar columnas de dirección, servicio realizado, valor servicio y domicilio
-            columna_direccion = None
-            columna_servicio = None
-            columna_valor = None
-            columna_domicilio = None
-
-            for col in df.columns:
-                if 'DIRECCION' in col.upper():
-                    columna_direccion = col
-                if 'SERVICIO' in col.upper() and 'REALIZADO' in col.upper():
-                    columna_servicio = col
-                if 'VALOR' in col.upper() and 'SERVICIO' in col.upper():
-                    columna_valor = col
-                if 'DOMICILIO' in col.upper():
-                    columna_domicilio = col
-
-            # Si no hay columna de dirección, intentar alternativas
-            if not columna_direccion:
-                for posible_col in ['DIRECCION', 'DIRECCIÓN', 'UBICACION', 'UBICACIÓN']:
-                    if posible_col in df.columns:
-                        columna_direccion = posible_col
-                        break
-
-            # Si no hay columna de servicio realizado, intentar alternativas
-            if not columna_servicio:
-                for posible_col in ['SERVICIO', 'DESCRIPCION', 'DESCRIPCIÓN', 'TRABAJO']:
-                    if posible_col in df.columns:
-                        columna_servicio = posible_col
-                        break
-
-            # Si no hay valor de servicio ni columna de domicilio, no podemos calcular
-            if not columna_valor and not columna_domicilio:
-                log_callback(f"No se encontraron columnas de valor en hoja {hoja}. Saltando...")
+def _normalizar_columna(serie):
+    """
+    Valores de una columna como float (si solo tiene números o vacíos) o como
+    objetos None, float o texto (las fechas en formato ISO).
+    """
+    if pd.api.types.is_bool_dtype(serie) or pd.api.types.is_numeric_dtype(serie):
+        return serie.astype(float).to_numpy()
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        # Las fechas se repiten mucho: cada fecha distinta se convierte una sola vez
+        codigos, unicas = pd.factorize(serie)
+        textos = np.array([fecha.isoformat() for fecha in unicas] + [None], dtype=object)
+        return textos[codigos]
+    valores = serie.map(_normalizar_valor)
+    if pd.api.types.infer_dtype(valores, skipna=True) in ('floating', 'empty'):
+        # Como la columna numérica que pandas lee cuando no hay textos
+        return valores.astype(float).to_numpy()
+    return valores.to_numpy()
+
+def _normalizar_valor(valor):
+    """Convierte un valor de celda a una forma comparable entre lecturas (vacíos, números y fechas)."""
+    # Casos más frecuentes primero: se llama una vez por celda de las columnas de texto
+    tipo = type(valor)
+    if tipo is str:
+        return None if valor in _TEXTOS_NULOS else valor
+    if tipo is float:
+        return None if valor != valor else valor
+    if tipo is int:
+        return float(valor)
+    if valor is None or pd.isna(valor):
+        return None
+    if isinstance(valor, (bool, np.bool_)):
+        return float(valor)
+    if isinstance(valor, numbers.Number):
+        return float(valor)
+    if isinstance(valor, datetime):
+        return pd.Timestamp(valor).isoformat()
+    return str(valor)
+
+def _omitir_hojas_fuera_de_rango(nombres_hojas, indice, fecha_inicio, fecha_fin, log_callback):
+    """Quita de la lista las hojas cuyo rango de fechas (según el índice) no se cruza con el período."""
+    if fecha_inicio is None or fecha_fin is None:
+        return list(nombres_hojas)
+    fechas = indice.get("fechas", {})
+    seleccion = []
+    for hoja in nombres_hojas:
+        if _fuera_de_rango(fechas.get(hoja), fecha_inicio, fecha_fin):
+            log_callback(f"Hoja {hoja} sin fechas en el período seleccionado (índice de fechas). Saltando...")
+        else:
+            seleccion.append(hoja)
+    return seleccion
+
+def _resumen_fechas(df):
+    """
+    Resume la columna FECHA de una hoja recién leída: fecha mínima, máxima,
+    si las fechas válidas están en orden creciente y número de filas.
+    Devuelve None si la hoja no tiene columna FECHA.
+    """
+    columna = _resolver_columnas(df.columns)['fecha']
+    if columna is None:
+        return None
+    fechas = pd.to_datetime(df[columna], errors='coerce', dayfirst=True).dropna()
+    if fechas.empty:
+        return {"min": None, "max": None, "ordenada": True, "filas": len(df)}
+    return {
+        "min": fechas.min().isoformat(),
+        "max": fechas.max().isoformat(),
+        "ordenada": bool(fechas.is_monotonic_increasing),
+        "filas": len(df),
+    }
+
+def _fuera_de_rango(resumen, fecha_inicio, fecha_fin):
+    """Indica si el resumen de fechas de una hoja garantiza que ninguna fila cae en el período."""
+    if resumen is None:
+        # Sin índice (o sin columna FECHA) no se puede descartar la hoja
+        return False
+    if resumen["min"] is None:
+        return True
+    return (pd.Timestamp(resumen["max"]) < pd.Timestamp(fecha_inicio)
+            or pd.Timestamp(resumen["min"]) > pd.Timestamp(fecha_fin))
+
+def _leer_hojas_paralelo(excel_path, nombres_hojas, log_callback, max_workers=None, podar_columnas=False,
+                         cancelacion=None, progreso=None):
+    """
+    Lee las hojas en un pool de procesos. Los resultados se recogen en el orden
+    del libro, de modo que los mensajes de cada hoja llegan al log en orden
+    a medida que van terminando. Si se cancela, las hojas que aún no empezaron
+    ya no se leen.
+    """
+    hojas = []
+    filas = 0
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futuros = [
+            pool.submit(_parsear_hoja_en_proceso, excel_path, hoja, podar_columnas)
+            for hoja in nombres_hojas
+        ]
+        for i, (hoja, futuro) in enumerate(zip(nombres_hojas, futuros), start=1):
+            if cancelacion is not None and cancelacion.cancelado:
+                for pendiente in futuros:
+                    pendiente.cancel()
+                cancelacion.comprobar()
+            try:
+                df = futuro.result()
+            except Exception as e:
+                log_callback(f"Error al procesar hoja {hoja}: {str(e)}", 'error')
+                avisar_progreso(progreso, "hojas", i, len(futuros), filas=filas)
                 continue
+            log_callback(f"Hoja leída: {hoja} ({len(df)} filas)")
+            hojas.append((hoja, df))
+            filas += len(df)
+            avisar_progreso(progreso, "hojas", i, len(futuros), filas=filas)
+    return hojas
+
+# Libros ya abiertos en cada proceso del pool, para no reabrir el archivo por cada hoja
+_libros_en_proceso = {}
+
+def _parsear_hoja_en_proceso(excel_path, hoja, podar_columnas=False):
+    """Lee una hoja dentro de un proceso del pool, reutilizando el libro ya abierto."""
+    xls = _libros_en_proceso.get(excel_path)
+    if xls is None:
+        xls = _libros_en_proceso[excel_path] = pd.ExcelFile(excel_path)
+    return _parsear_hoja(xls, hoja, podar_columnas)
+
+def _parsear_hoja(xls, hoja, podar_columnas=False):
+    """
+    Lee una hoja del libro. Con podar_columnas se lee primero solo la fila de
+    encabezados, se identifican las columnas del informe con _resolver_columnas
+    y después se leen únicamente esas columnas con usecols.
+    """
+    if not podar_columnas:
+        return xls.parse(hoja)
 
-            # Crear columnas para el informe
-            df['DIRECCION_PARA_INFORME'] = ''
-            if columna_direccion:
-                df['DIRECCION_PARA_INFORME'] = df[columna_direccion].fillna('').astype(str)
-            df['SERVICIO_PARA_INFORME'] = ''
-            if columna_servicio:
-                df['SERVICIO_PARA_INFORME'] = df[columna_servicio].fillna('').astype(str)
-
-            # Crear columna combinada de valor
-            df['VALOR_COMBINADO'] = 0
-            df['VALOR_ORIGINAL'] = 0
-
-            # Si existe columna de valor servicio, usarla cuando no es nula o cero
-            if columna_valor:
-                df[columna_valor] = df[columna_valor].apply(limpiar_valor_monetario)
-                df.loc[df[columna_valor] > 0, 'VALOR_COMBINADO'] = df[columna_valor]
-                df.loc[df[columna_valor] > 0, 'VALOR_ORIGINAL'] = df[columna_valor]
-
-            # Si existe columna de domicilio, usarla cuando valor servicio es nulo o cero
-            if columna_domicilio:
-                df[columna_domicilio] = df[columna_domicilio].apply(limpiar_valor_monetario)
-                mascara_usar_domicilio = df['VALOR_COMBINADO'] == 0
-                df.loc[mascara_usar_domicilio & (df[columna_domicilio] > 0), 'VALOR_COMBINADO'] = df[columna_domicilio]
-                df.loc[mascara_usar_domicilio & (df[columna_domicilio] > 0), 'VALOR_ORIGINAL'] = df[columna_domicilio]
-
-            log_callback(f"Registros con valor combinado > 0: {len(df[df['VALOR_COMBINADO'] > 0])}")
-
-            # Buscar columna de IVA
-            columna_iva = None
-            for col in df.columns:
-                if 'IVA' in col.upper():
-                    columna_iva = col
-                    break
-
-            # Columna de materiales
-            columna_materiales = None
-            for col in df.columns:
-                if 'MATERIAL' in col.upper():
-                    if not 'VALOR' in col.upper():  # Excluir columnas de valor de materiales
-                        columna_materiales = col
-                        break
-
-            # Columna de valor de materiales
-            columna_valor_materiales = None
-            for col in df.columns:
-                if 'VALOR' in col.upper() and 'MATERIAL' in col.upper():
-                    columna_valor_materiales = col
-                    break
-
-            # Agregar columnas de materiales si existen
-            if columna_materiales:
-                df['MATERIALES'] = df[columna_materiales].fillna('').astype(str)
-            else:
-                df['MATERIALES'] = ''
-
-            if columna_valor_materiales:
-                try:
-                    df['VALOR MATERIALES'] = df[columna_valor_materiales].fillna(0).astype(str).apply(limpiar_valor_monetario)
-                except:
-                    df['VALOR MATERIALES'] = 0
-            else:
-                df['VALOR MATERIALES'] = 0
-
-            # Calcular valores financieros
-            df['SUBTOTAL'] = df['VALOR_COMBINADO'] * 0.5
-            if columna_iva:
-                df['IVA'] = df[columna_iva].fillna(0).apply(limpiar_valor_monetario)
-            else:
-                df['IVA'] = pd.Series([0.0] * len(df), index=df.index)
-            df['TOTAL EMPRESA'] = df['SUBTOTAL'] + df['IVA']
-
-            # Filtrar registros con valor combinado mayor que cero (para evitar filas sin valor)
-            df = df[df['VALOR_COMBINADO'] > 0]
-            log_callback(f"Registros finales después de todos los filtros: {len(df)}")
-
-            # Eliminar columnas que se hayan quedado completamente vacías (NaN) después del filtrado
-            df.dropna(axis=1, how='all', inplace=True)
-            df = df.reset_index(drop=True)
-
-            # Registrar el número de servicios encontrados para esta hoja
-            log_callback(f"Servicios encontrados en '{hoja}': {len(df)}", 'info')
-            
-            frames.append(df)
+    encabezado = xls.parse(hoja, nrows=0)
+    columnas = _resolver_columnas(encabezado.columns)
+    if columnas['fecha'] is None:
+        # Sin FECHA la hoja se salta; basta con el encabezado para informarlo
+        return encabezado
+
+    necesarias = {col for col in columnas.values() if col is not None}
+    posiciones = [i for i, col in enumerate(encabezado.columns) if col in necesarias]
+    return xls.parse(hoja, usecols=posiciones)
+
+def _leer_hojas_streaming(excel_path, fecha_inicio, fecha_fin, log_callback, filas_por_bloque=5000,
+                          usar_cache=False, cancelacion=None, progreso=None):
+    """
+    Recorre las hojas con openpyxl en modo de solo lectura y devuelve, por hoja,
+    solo las filas y columnas que pasan los filtros del informe. Devuelve None
+    si el archivo no se puede abrir así (por ejemplo un .xls antiguo), para que
+    se use la lectura normal.
+    """
+    huella = None
+    indice = {}
+    if usar_cache:
+        try:
+            huella = excel_cache.huella_archivo(excel_path)
+            indice = excel_cache.cargar_indice_fechas(huella)
         except Exception as e:
-            log_callback(f"Error al procesar hoja {hoja}: {str(e)}", 'error')
+            log_callback(f"No se pudo leer el índice de fechas: {str(e)}", 'warning')
+
+    try:
+        libro = openpyxl.load_workbook(excel_path, read_only=True, data_only=True)
+    except Exception as e:
+        log_callback(f"No se pudo abrir el archivo en modo streaming, se usa la lectura normal: {str(e)}", 'warning')
+        return None
+
+    fechas = indice.get("fechas", {})
+    nuevos = {}
+    hojas = []
+    filas = 0
+    try:
+        nombres_hojas = _omitir_hojas_fuera_de_rango(libro.sheetnames, indice, fecha_inicio, fecha_fin, log_callback)
+        for i, hoja in enumerate(nombres_hojas, start=1):
+            comprobar_cancelacion(cancelacion)
+            resumen = fechas.get(hoja)
+            try:
+                df, nuevo_resumen = _leer_hoja_streaming(
+                    libro[hoja], fecha_inicio, fecha_fin, filas_por_bloque,
+                    ordenada=bool(resumen and resumen["ordenada"])
+                )
+            except Exception as e:
+                log_callback(f"Error al procesar hoja {hoja}: {str(e)}", 'error')
+                avisar_progreso(progreso, "hojas", i, len(nombres_hojas), filas=filas)
+                continue
+            log_callback(f"Hoja recorrida: {hoja} ({len(df)} filas cumplen los filtros)")
+            hojas.append((hoja, df))
+            filas += len(df)
+            avisar_progreso(progreso, "hojas", i, len(nombres_hojas), filas=filas)
+            if resumen is None and nuevo_resumen is not None:
+                nuevos[hoja] = nuevo_resumen
+    finally:
+        libro.close()
+
+    if huella is not None and nuevos:
+        try:
+            fechas.update(nuevos)
+            excel_cache.guardar_indice_fechas(huella, {"hojas": libro.sheetnames, "fechas": fechas})
+        except Exception as e:
+            log_callback(f"No se pudo guardar el índice de fechas: {str(e)}", 'warning')
+    return hojas
+
+def _leer_hoja_streaming(hoja, fecha_inicio, fecha_fin, filas_por_bloque=5000, ordenada=False):
+    """
+    Recorre una hoja de openpyxl fila a fila y acumula, en bloques pequeños,
+    las filas con FECHA en el rango, FORMA DE PAGO = EFECTIVO y ESTADO DEL
+    SERVICIO vacío, conservando solo las columnas que usa el informe.
+
+    Si ordenada es True (según el índice de fechas) la lectura se detiene en la
+    primera fecha posterior a fecha_fin.
+
+    Returns:
+        tuple: (DataFrame, resumen de fechas de la hoja para el índice, o None
+               si la hoja no se recorrió completa o no tiene columna FECHA)
+    """
+    filas = hoja.iter_rows(values_only=True)
+    encabezado = _nombres_encabezado(next(filas, None) or ())
+    columnas = _resolver_columnas(encabezado)
+    if columnas['fecha'] is None or columnas['pago'] is None or columnas['estado'] is None:
+        # La hoja se saltará en _procesar_hoja; basta con el encabezado para informarlo
+        return pd.DataFrame(columns=encabezado), None
+
+    necesarias = {col for col in columnas.values() if col is not None}
+    nombres = [col for col in encabezado if col in necesarias]
+    posiciones = [encabezado.index(col) for col in nombres]
+    i_fecha = encabezado.index(columnas['fecha'])
+    i_pago = encabezado.index(columnas['pago'])
+    i_estado = encabezado.index(columnas['estado'])
+    inicio, fin = pd.Timestamp(fecha_inicio), pd.Timestamp(fecha_fin)
+    fechas_texto = {}
+    minima = maxima = anterior = None
+    en_orden = True
+    n_filas = 0
+    completa = True
+
+    bloques = []
+    bloque = []
+    for fila in filas:
+        n_filas += 1
+        if len(fila) <= max(i_fecha, i_pago, i_estado):
+            fila = tuple(fila) + (None,) * (len(encabezado) - len(fila))
+
+        fecha = _fecha_de_celda(fila[i_fecha], fechas_texto)
+        if fecha is None:
+            continue
+        # Resumen de fechas para el índice
+        if anterior is not None and fecha < anterior:
+            en_orden = False
+        anterior = fecha
+        minima = fecha if minima is None or fecha < minima else minima
+        maxima = fecha if maxima is None or fecha > maxima else maxima
+
+        if fecha > fin and ordenada:
+            completa = False
+            break
+        if fecha < inicio or fecha > fin:
+            continue
+        if fila[i_pago] is None or str(fila[i_pago]).upper().strip() != 'EFECTIVO':
+            continue
+        estado = fila[i_estado]
+        if estado is not None and str(estado).strip() != '':
             continue
 
-    result = pd.concat(frames) if frames else pd.DataFrame()
-    log_callback(f"\nSe encontraron {len(result)} servicios en total.", 'success')
-    return result 
\ No newline at end of file
+        bloque.append(tuple(fila[i] if i < len(fila) else None for i in posiciones))
+        if len(bloque) >= filas_por_bloque:
+            bloques.append(pd.DataFrame(bloque, columns=nombres))
+            bloque = []
+
+    if bloque or not bloques:
+        bloques.append(pd.DataFrame(bloque, columns=nombres))
+    df = pd.concat(bloques, ignore_index=True) if len(bloques) > 1 else bloques[0]
+
+    resumen = None
+    if completa:
+        resumen = {
+            "min": minima.isoformat() if minima is not None else None,
+            "max": maxima.isoformat() if maxima is not None else None,
+            "ordenada": en_orden,
+            "filas": n_filas,
+        }
+    return df, resumen
+
+def _nombres_encabezado(fila):
+    """Nombra las columnas como lo hace pandas: 'Unnamed: i' si están vacías y sufijos .1, .2 si se repiten."""
+    nombres = []
+    vistos = {}
+    for i, valor in enumerate(fila):
+        nombre = f"Unnamed: {i}" if valor is None else valor
+        if nombre in vistos:
+            vistos[nombre] += 1
+            nombre = f"{nombre}.{vistos[nombre]}"
+        else:
+            vistos[nombre] = 0
+        nombres.append(nombre)
+    return nombres
+
+def _fecha_de_celda(valor, cache_texto):
+    """Convierte el valor de una celda FECHA en Timestamp (o None), memorizando las fechas escritas como texto."""
+    if valor is None:
+        return None
+    if isinstance(valor, str):
+        if valor not in cache_texto:
+            fecha = pd.to_datetime(valor, errors='coerce', dayfirst=True)
+            cache_texto[valor] = None if pd.isna(fecha) else fecha
+        return cache_texto[valor]
+    try:
+        fecha = pd.Timestamp(valor)
+    except (TypeError, ValueError):
+        return None
+    return None if pd.isna(fecha) else fecha
+
+def _recortar_hoja_ordenada(df, fecha_inicio, fecha_fin):
+    """
+    Si la columna FECHA ya es de tipo fecha y está en orden creciente, devuelve
+    solo el tramo de filas dentro del período (búsqueda binaria); si no, devuelve
+    el DataFrame sin cambios para que se filtre de la forma normal.
+
+    La hoja ya está leída completa, así que esto solo evita convertir y filtrar
+    las filas fuera del período; no ahorra nada de la lectura del Excel. Para
+    dejar de leer una hoja ordenada después de fecha_fin hay que usar el modo
+    streaming (ver _leer_hoja_streaming).
+    """
+    fechas = df['FECHA']
+    if not pd.api.types.is_datetime64_any_dtype(fechas) or not fechas.is_monotonic_increasing:
+        return df
+    izquierda = fechas.searchsorted(pd.Timestamp(fecha_inicio), side='left')
+    derecha = fechas.searchsorted(pd.Timestamp(fecha_fin), side='right')
+    return df.iloc[izquierda:derecha]
+
+def _procesar_hoja(df, hoja, fecha_inicio, fecha_fin, log_callback, incluir_hoja=False):
+    """
+    Aplica los filtros y cálculos del informe a una hoja ya leída.
+    Devuelve el DataFrame resultante o None si la hoja debe saltarse.
+    """
+    # Limpiar nombres de columnas (eliminar espacios al final)
+    df.columns = df.columns.str.strip()
+
+    # Mostrar todas las columnas que existen en la hoja
+    log_callback(f"Columnas en la hoja {hoja}:")
+    for col in df.columns:
+        log_callback(f"  - '{col}'")
+
+    if 'FECHA' not in df.columns:
+        log_callback(f"Hoja {hoja} no tiene columna FECHA. Saltando...")
+        return None
+
+    # Filtrar filas con fecha no nula
+    df = df[df['FECHA'].notnull()]
+    # Si las fechas ya son fechas reales en orden creciente, recortar por búsqueda binaria
+    df = _recortar_hoja_ordenada(df, fecha_inicio, fecha_fin)
+    df['FECHA'] = pd.to_datetime(df['FECHA'], errors='coerce', dayfirst=True)
+    df = df[df['FECHA'].between(fecha_inicio, fecha_fin)]
+    log_callback(f"Registros después de filtrar por fecha: {len(df)}")
+
+    # Identificar las columnas del informe (FORMA DE PAGO y ESTADO DEL SERVICIO deben coincidir exactamente)
+    columnas = _resolver_columnas(df.columns)
+    columna_pago = columnas['pago']
+
+    if not columna_pago:
+        log_callback(f"No se encontró columna exacta 'FORMA DE PAGO' en hoja {hoja}. Saltando...")
+        return None
+
+    columna_estado = columnas['estado']
+
+    if not columna_estado:
+        log_callback(f"No se encontró columna exacta 'ESTADO DEL SERVICIO' en hoja {hoja}. Saltando...")
+        return None
+
+    # Mostrar valores únicos en ambas columnas antes de filtrar
+    log_callback(f"Valores únicos en {columna_pago}: {df[columna_pago].astype(str).str.upper().unique()}")
+    log_callback(f"Valores únicos en {columna_estado}: {df[columna_estado].astype(str).str.upper().unique()}")
+
+    # Filtrar por forma de pago = EFECTIVO
+    df['FORMA_PAGO_CLEAN'] = df[columna_pago].astype(str).str.upper().str.strip()
+    df = df[df['FORMA_PAGO_CLEAN'] == 'EFECTIVO']
+    log_callback(f"Registros después de filtrar por forma de pago: {len(df)}")
+
+    # Filtrar por estado del servicio vacío
+    mascara_estado = df[columna_estado].isna() | (df[columna_estado].astype(str).str.strip() == '')
+    df = df[mascara_estado]
+    
+    # Mostrar los registros que fueron excluidos (usando loc para evitar la advertencia)
+    registros_excluidos = df.loc[~mascara_estado]
+    if not registros_excluidos.empty:
+        log_callback(f"Registros excluidos por tener estado: {len(registros_excluidos)}")
+        for idx, row in registros_excluidos.iterrows():
+            log_callback(f"  - Registro {idx}: {row[columna_estado]}")
+    
+    log_callback(f"Registros después de filtrar por estado: {len(df)}")
+
+    # Columnas de dirección, servicio realizado, valor servicio y domicilio
+    columna_direccion = columnas['direccion']
+    columna_servicio = columnas['servicio']
+    columna_valor = columnas['valor']
+    columna_domicilio = columnas['domicilio']
+
+    # Si no hay valor de servicio ni columna de domicilio, no podemos calcular
+    if not columna_valor and not columna_domicilio:
+        log_callback(f"No se encontraron columnas de valor en hoja {hoja}. Saltando...")
+        return None
+
+    # Crear columnas para el informe
+    df['DIRECCION_PARA_INFORME'] = ''
+    if columna_direccion:
+        df['DIRECCION_PARA_INFORME'] = df[columna_direccion].fillna('').astype(str)
+    df['SERVICIO_PARA_INFORME'] = ''
+    if columna_servicio:
+        df['SERVICIO_PARA_INFORME'] = df[columna_servicio].fillna('').astype(str)
+
+    # Crear columna combinada de valor
+    df['VALOR_COMBINADO'] = 0
+    df['VALOR_ORIGINAL'] = 0
+
+    # Si existe columna de valor servicio, usarla cuando no es nula o cero
+    if columna_valor:
+        df[columna_valor] = limpiar_valores_monetarios(df[columna_valor])
+        df.loc[df[columna_valor] > 0, 'VALOR_COMBINADO'] = df[columna_valor]
+        df.loc[df[columna_valor] > 0, 'VALOR_ORIGINAL'] = df[columna_valor]
+
+    # Si existe columna de domicilio, usarla cuando valor servicio es nulo o cero
+    if columna_domicilio:
+        df[columna_domicilio] = limpiar_valores_monetarios(df[columna_domicilio])
+        mascara_usar_domicilio = df['VALOR_COMBINADO'] == 0
+        df.loc[mascara_usar_domicilio & (df[columna_domicilio] > 0), 'VALOR_COMBINADO'] = df[columna_domicilio]
+        df.loc[mascara_usar_domicilio & (df[columna_domicilio] > 0), 'VALOR_ORIGINAL'] = df[columna_domicilio]
+
+    log_callback(f"Registros con valor combinado > 0: {len(df[df['VALOR_COMBINADO'] > 0])}")
+
+    # Columnas de IVA, materiales y valor de materiales
+    columna_iva = columnas['iva']
+    columna_materiales = columnas['materiales']
+    columna_valor_materiales = columnas['valor_materiales']
+
+    # Agregar columnas de materiales si existen
+    if columna_materiales:
+        df['MATERIALES'] = df[columna_materiales].fillna('').astype(str)
+    else:
+        df['MATERIALES'] = ''
+
+    if columna_valor_materiales:
+        try:
+            df['VALOR MATERIALES'] = limpiar_valores_monetarios(df[columna_valor_materiales])
+        except:
+            df['VALOR MATERIALES'] = 0
+    else:
+        df['VALOR MATERIALES'] = 0
+
+    # Calcular valores financieros
+    df['SUBTOTAL'] = df['VALOR_COMBINADO'] * 0.5
+    if columna_iva:
+        df['IVA'] = limpiar_valores_monetarios(df[columna_iva])
+    else:
+        df['IVA'] = pd.Series([0.0] * len(df), index=df.index)
+    df['TOTAL EMPRESA'] = df['SUBTOTAL'] + df['IVA']
+
+    # Filtrar registros con valor combinado mayor que cero (para evitar filas sin valor)
+    df = df[df['VALOR_COMBINADO'] > 0]
+    log_callback(f"Registros finales después de todos los filtros: {len(df)}")
+
+    if incluir_hoja:
+        # Hoja de origen de cada servicio, para guardarlos en el almacén local
+        df['HOJA'] = hoja
+
+    # Eliminar columnas que se hayan quedado completamente vacías (NaN) después del filtrado
+    df.dropna(axis=1, how='all', inplace=True)
+    df = df.reset_index(drop=True)
+
+    # Registrar el número de servicios encontrados para esta hoja
+    log_callback(f"Servicios encontrados en '{hoja}': {len(df)}", 'info')
+    
+    return df
+
+def _resolver_columnas(nombres_columnas):
+    """
+    Identifica las columnas que usa el informe a partir de los nombres de columna
+    de una hoja (ya sin espacios al final).
+
+    Returns:
+        dict: Rol ('fecha', 'pago', 'estado', 'direccion', 'servicio', 'valor',
+              'domicilio', 'iva', 'materiales', 'valor_materiales') -> nombre de
+              la columna, o None si la hoja no la tiene
+    """
+    columnas = dict.fromkeys([
+        'fecha', 'pago', 'estado', 'direccion', 'servicio', 'valor',
+        'domicilio', 'iva', 'materiales', 'valor_materiales'
+    ])
+    # Nombre sin espacios -> columna original (la primera si hay repetidas)
+    por_nombre = {}
+    for col in nombres_columnas:
+        por_nombre.setdefault(str(col).strip(), col)
+
+    for col in nombres_columnas:
+        nombre = str(col).strip()
+        upper = nombre.upper()
+        if nombre == 'FECHA' and columnas['fecha'] is None:
+            columnas['fecha'] = col
+        # FORMA DE PAGO y ESTADO DEL SERVICIO deben coincidir exactamente
+        if nombre == 'FORMA DE PAGO' and columnas['pago'] is None:
+            columnas['pago'] = col
+        if nombre == 'ESTADO DEL SERVICIO' and columnas['estado'] is None:
+            columnas['estado'] = col
+        # Para dirección, servicio, valor y domicilio se queda la última coincidencia
+        if 'DIRECCION' in upper:
+            columnas['direccion'] = col
+        if 'SERVICIO' in upper and 'REALIZADO' in upper:
+            columnas['servicio'] = col
+        if 'VALOR' in upper and 'SERVICIO' in upper:
+            columnas['valor'] = col
+        if 'DOMICILIO' in upper:
+            columnas['domicilio'] = col
+        # Para IVA y materiales se queda la primera coincidencia
+        if 'IVA' in upper and columnas['iva'] is None:
+            columnas['iva'] = col
+        if 'MATERIAL' in upper and 'VALOR' not in upper and columnas['materiales'] is None:
+            columnas['materiales'] = col
+        if 'VALOR' in upper and 'MATERIAL' in upper and columnas['valor_materiales'] is None:
+            columnas['valor_materiales'] = col
+
+    # Si no hay columna de dirección, intentar alternativas
+    if not columnas['direccion']:
+        for posible_col in ['DIRECCION', 'DIRECCIÓN', 'UBICACION', 'UBICACIÓN']:
+            if posible_col in por_nombre:
+                columnas['direccion'] = por_nombre[posible_col]
+                break
+
+    # Si no hay columna de servicio realizado, intentar alternativas
+    if not columnas['servicio']:
+        for posible_col in ['SERVICIO', 'DESCRIPCION', 'DESCRIPCIÓN', 'TRABAJO']:
+            if posible_col in por_nombre:
+                columnas['servicio'] = por_nombre[posible_col]
+                break
+
+    return columnas
@@ -0,0 +1,174 @@
+# src/core/exporters.py
+"""
+Exportación de los servicios procesados (resultado de extraer_servicios) a
+CSV, Excel (XLSX) y Parquet, para que contabilidad no tenga que copiar los
+importes del PDF.
+
+Parquet es opcional: solo está disponible si pyarrow está instalado (no está en
+requirements.txt); formatos_disponibles() indica qué formatos se pueden usar.
+El CSV es el formato rápido (100.000 servicios en menos de un segundo); el XLSX
+tarda unas veinte veces más porque openpyxl escribe celda a celda en Python,
+aunque sea en modo de solo escritura (ver benchmarks/bench_exportar.py).
+
+Las columnas son las del informe PDF (report_layout.COLUMNAS_INFORME): los
+textos salen de los mismos formatos de report_data y los importes se escriben
+como números. Las filas se preparan y escriben por bloques de
+EXPORT_CONFIG["CHUNK_ROWS"], así que la memoria no crece con el tamaño del
+archivo exportado.
+"""
+import os
+import numpy as np
+import openpyxl
+import pandas as pd
+from src.config import settings
+from src.core.report_data import calcular_importes, fechas_informe, FORMATOS_CAMPO
+from src.core.report_layout import crear_diseno
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet es opcional: solo se necesita para exportar en ese formato
+    pa = pq = None
+
+FORMATOS_EXPORTACION = ('csv', 'xlsx', 'parquet')
+
+def formatos_disponibles():
+    """Formatos de FORMATOS_EXPORTACION que se pueden usar en esta instalación."""
+    return tuple(formato for formato in FORMATOS_EXPORTACION if formato != 'parquet' or pq is not None)
+
+def tabla_exportacion(df, diseno=None):
+    """
+    Prepara las columnas del informe para exportarlas.
+
+    Returns:
+        pd.DataFrame: Una columna por cada columna del diseño, con el título
+                      del encabezado: importes como float, fechas como
+                      datetime y el resto con los mismos textos del PDF
+    """
+    if diseno is None:
+        diseno = crear_diseno()
+    valores = calcular_importes(df)
+    columnas = {}
+    for columna in diseno["columnas"]:
+        titulo = columna["titulo"].replace("\n", " ")
+        if columna.get("importe"):
+            columnas[titulo] = valores[columna["importe"]].to_numpy()
+        elif columna.get("fecha"):
+            columnas[titulo] = fechas_informe(df).to_numpy()
+        else:
+            formato = columna.get("formato") or FORMATOS_CAMPO[columna["campo"]]
+            columnas[titulo] = formato(df, valores)
+    return pd.DataFrame(columnas)
+
+def _bloques(df, diseno, filas_por_bloque):
+    """Devuelve la tabla de exportación de cada bloque de filas."""
+    filas_por_bloque = filas_por_bloque or settings.EXPORT_CONFIG["CHUNK_ROWS"]
+    for inicio in range(0, len(df), filas_por_bloque):
+        yield tabla_exportacion(df.iloc[inicio:inicio + filas_por_bloque], diseno)
+
+def exportar_servicios(df, ruta, formato=None, diseno=None, filas_por_bloque=None):
+    """
+    Exporta los servicios en el formato indicado o, si no se indica, en el de
+    la extensión de ruta ('.csv', '.xlsx' o '.parquet').
+
+    Returns:
+        tuple: (exito, mensaje)
+    """
+    if formato is None:
+        formato = os.path.splitext(ruta)[1].lstrip('.').lower()
+    exportadores = {'csv': exportar_csv, 'xlsx': exportar_xlsx, 'parquet': exportar_parquet}
+    if formato not in exportadores:
+        return False, f"Formato de exportación no soportado: '{formato}' (use {', '.join(FORMATOS_EXPORTACION)})"
+    return exportadores[formato](df, ruta, diseno, filas_por_bloque)
+
+def _textos_unicos(serie, formato):
+    """
+    Aplica formato a cada valor distinto de serie (fechas e importes se repiten
+    mucho) y devuelve el texto de cada fila; los valores nulos quedan vacíos.
+    """
+    codigos, unicos = pd.factorize(serie)
+    textos = np.array([formato(valor) for valor in unicos] + [''], dtype=object)
+    return textos[codigos]
+
+def _textos_csv(tabla):
+    """
+    Convierte las fechas y los importes de tabla en los textos del CSV.
+
+    to_csv con decimal y date_format formatea valor por valor y tarda varias
+    veces más que escribir columnas que ya son texto.
+    """
+    decimal = settings.EXPORT_CONFIG["CSV_DECIMAL"]
+    for titulo in tabla.columns:
+        serie = tabla[titulo]
+        if pd.api.types.is_datetime64_any_dtype(serie):
+            tabla[titulo] = _textos_unicos(serie.dt.normalize(), lambda fecha: f"{fecha:%d/%m/%Y}")
+        elif pd.api.types.is_float_dtype(serie):
+            tabla[titulo] = _textos_unicos(serie, lambda valor: repr(valor).replace('.', decimal))
+    return tabla
+
+def exportar_csv(df, ruta, diseno=None, filas_por_bloque=None):
+    """Exporta los servicios a CSV con el separador y los decimales de EXPORT_CONFIG."""
+    if df.empty:
+        return False, "No hay datos para exportar"
+    try:
+        with open(ruta, 'w', encoding=settings.EXPORT_CONFIG["CSV_ENCODING"], newline='') as f:
+            for i, tabla in enumerate(_bloques(df, diseno, filas_por_bloque)):
+                _textos_csv(tabla).to_csv(
+                    f, index=False, header=(i == 0),
+                    sep=settings.EXPORT_CONFIG["CSV_SEPARATOR"]
+                )
+        return True, f"{len(df)} servicios exportados a {ruta}"
+    except Exception as e:
+        return False, f"Error al exportar a CSV: {str(e)}"
+
+def exportar_xlsx(df, ruta, diseno=None, filas_por_bloque=None):
+    """
+    Exporta los servicios a Excel con openpyxl en modo de solo escritura (las
+    filas no se guardan en memoria). Es unas veinte veces más lento que exportar_csv.
+    """
+    if df.empty:
+        return False, "No hay datos para exportar"
+    if diseno is None:
+        diseno = crear_diseno()
+    try:
+        libro = openpyxl.Workbook(write_only=True)
+        hoja = libro.create_sheet(settings.EXPORT_CONFIG["XLSX_SHEET_NAME"])
+        for i, tabla in enumerate(_bloques(df, diseno, filas_por_bloque)):
+            if i == 0:
+                # El ancho de cada columna en Excel sigue el del PDF (en mm)
+                for n, columna in enumerate(diseno["columnas"], start=1):
+                    hoja.column_dimensions[openpyxl.utils.get_column_letter(n)].width = columna["ancho"] * 0.6
+                hoja.append(list(tabla.columns))
+            for titulo in tabla.columns:
+                if pd.api.types.is_datetime64_any_dtype(tabla[titulo]):
+                    # openpyxl escribe fechas (sin hora) y no acepta NaT
+                    fechas = tabla[titulo]
+                    tabla[titulo] = fechas.dt.date.astype(object).where(fechas.notna(), None)
+            for fila in tabla.itertuples(index=False, name=None):
+                hoja.append(fila)
+        libro.save(ruta)
+        return True, f"{len(df)} servicios exportados a {ruta}"
+    except Exception as e:
+        return False, f"Error al exportar a Excel: {str(e)}"
+
+def exportar_parquet(df, ruta, diseno=None, filas_por_bloque=None):
+    """Exporta los servicios a Parquet escribiendo un grupo de filas por bloque (requiere pyarrow)."""
+    if pq is None:
+        return False, settings.APP_MESSAGES["EXPORT_PARQUET_UNAVAILABLE"]
+    if df.empty:
+        return False, "No hay datos para exportar"
+    escritor = None
+    try:
+        for tabla in _bloques(df, diseno, filas_por_bloque):
+            if escritor is None:
+                bloque = pa.Table.from_pandas(tabla, preserve_index=False)
+                escritor = pq.ParquetWriter(ruta, bloque.schema)
+            else:
+                bloque = pa.Table.from_pandas(tabla, schema=escritor.schema, preserve_index=False)
+            escritor.write_table(bloque)
+        return True, f"{len(df)} servicios exportados a {ruta}"
+    except Exception as e:
+        return False, f"Error al exportar a Parquet: {str(e)}"
+    finally:
+        if escritor is not None:
+            escritor.close()
@@ -0,0 +1,90 @@
+# src/core/pdf_cache.py
+"""
+Caché en disco de los informes PDF ya generados.
+
+Cada informe se guarda con el nombre de su huella: un hash de las filas del
+DataFrame, las notas, el período y la configuración que afecta al dibujo. Si se
+vuelve a pedir el mismo informe, se copia el PDF guardado en lugar de volver a
+generarlo con FPDF. Las entradas menos usadas se eliminan cuando la caché
+supera el tamaño máximo configurado.
+"""
+import hashlib
+import os
+import shutil
+import pandas as pd
+from src.config import settings
+from src.utils.cache_utils import marcar_uso, expulsar_lru
+
+_EXTENSION = ".pdf"
+
+# Cambiar este valor cuando cambie el dibujo del informe, para no reutilizar PDFs con el formato anterior
+_VERSION_INFORME = "2"
+
+def _directorio(directorio=None):
+    """Devuelve la carpeta de la caché, usando la de la configuración por defecto."""
+    return directorio or settings.get_cache_dir(settings.CACHE_CONFIG["PDF_FOLDER_NAME"])
+
+def huella_informe(df, notas, fecha_inicio_analisis=None, fecha_fin_analisis=None):
+    """
+    Calcula la huella de un informe a partir de sus datos de entrada.
+
+    Returns:
+        str: Hash hexadecimal, o None si las filas no se pueden hashear
+    """
+    h = hashlib.sha256()
+    partes = [
+        _VERSION_INFORME,
+        repr(sorted(settings.PDF_CONFIG.items())),
+        repr([(str(col), str(tipo)) for col, tipo in df.dtypes.items()]),
+        str(notas or ""),
+        str(fecha_inicio_analisis),
+        str(fecha_fin_analisis),
+    ]
+    for parte in partes:
+        h.update(parte.encode('utf-8'))
+        h.update(b'\0')
+    try:
+        h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    except TypeError:
+        return None
+    return h.hexdigest()
+
+def copiar_informe(huella, ruta_destino, directorio=None):
+    """
+    Copia a ruta_destino el PDF guardado para la huella.
+
+    Returns:
+        bool: True si el informe estaba en la caché
+    """
+    ruta = os.path.join(_directorio(directorio), huella + _EXTENSION)
+    if not os.path.exists(ruta):
+        return False
+    shutil.copyfile(ruta, ruta_destino)
+    marcar_uso(ruta)
+    return True
+
+def guardar_informe(huella, ruta_origen, directorio=None, max_bytes=None):
+    """Guarda en la caché una copia del PDF generado y aplica la expulsión LRU."""
+    directorio = _directorio(directorio)
+    if max_bytes is None:
+        max_bytes = settings.CACHE_CONFIG["PDF_MAX_BYTES"]
+
+    ruta = os.path.join(directorio, huella + _EXTENSION)
+    shutil.copyfile(ruta_origen, ruta + ".tmp")
+    os.replace(ruta + ".tmp", ruta)
+    expulsar_lru(directorio, max_bytes, _EXTENSION)
+
+def limpiar_cache_informes(directorio=None):
+    """
+    Elimina todos los informes guardados en la caché.
+
+    Returns:
+        int: Número de informes eliminados
+    """
+    directorio = _directorio(directorio)
+    eliminados = 0
+    for nombre in os.listdir(directorio):
+        if nombre.endswith(_EXTENSION):
+            os.remove(os.path.join(directorio, nombre))
+            eliminados += 1
+    return eliminados
@@ -1,12 +1,107 @@
 import os
 import datetime
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import accumulate
 from fpdf import FPDF
+import numpy as np
 import pandas as pd
 from src.utils import  fecha_larga
+from src.utils.job_runner import TareaCancelada, comprobar_cancelacion
+from src.utils.progress import avisar_progreso
+from src.config import settings
+from src.core import pdf_cache
+from src.core.report_data import preparar_filas, calcular_totales
+from src.core.report_layout import crear_diseno
+
+# Atributos de FPDF con la fuente, los colores y el grosor de línea actuales de la página
+_ESTADO_GRAFICO = (
+    'font_family', 'font_style', 'font_size_pt', 'font_size', 'current_font', 'underline',
+    'unifontsubset', 'draw_color', 'fill_color', 'text_color', 'color_flag', 'line_width'
+)
+
+class _TextoDocumento:
+    """
+    Texto del documento que FPDF va escribiendo con self.buffer += ... Con un
+    str cada escritura copia todo lo escrito hasta entonces, lo que hace que
+    escribir un informe de miles de páginas tarde un tiempo cuadrático; aquí
+    las partes se guardan en una lista y se unen una sola vez al terminar.
+    """
+    def __init__(self):
+        self._partes = []
+        self._largo = 0
+
+    def __iadd__(self, texto):
+        self._partes.append(texto)
+        self._largo += len(texto)
+        return self
+
+    def __len__(self):
+        # FPDF usa la longitud como posición de cada objeto en la tabla xref
+        return self._largo
+
+    def __str__(self):
+        return ''.join(self._partes)
+
+# Fuentes del informe (encabezado, filas, pie y notas), en el orden en que se registran
+_FUENTES_INFORME = (('Helvetica', 'B'), ('Helvetica', ''), ('Helvetica', 'I'))
 
 # === CLASE PARA PDF (ORIGINAL RESTAURADO) ===
 class PDF(FPDF):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buffer = _TextoDocumento()
+        # Líneas en que se divide cada texto: (fuente, estilo, tamaño, ancho, texto) -> lista de líneas
+        self._cache_lineas = {}
+        # Ancho de cada texto medido: (fuente, estilo, tamaño, texto) -> ancho
+        self._cache_anchos = {}
+        # Totales del último informe dibujado con tabla_servicios (ver calcular_totales)
+        self.resumen_totales = None
+        # Dibujar los encabezados repetidos como plantillas (form XObjects) del PDF
+        self.usar_plantillas = False
+        # Plantillas ya dibujadas: nombre -> contenido y posición en que se dibujó
+        self._plantillas = {}
+        # Páginas anteriores a este documento cuando es un tramo de un informe dibujado en paralelo
+        self.desplazamiento_paginas = 0
+        # Fecha del pie de página, la misma en todas las páginas
+        self.fecha_generacion = datetime.datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+        # TokenCancelacion que dibujar_filas comprueba antes de cada página nueva (opcional)
+        self.cancelacion = None
+        # Función progreso("pdf", filas_dibujadas, filas_totales, paginas=...) a la que se avisa en cada página (opcional)
+        self.progreso = None
+
+    def get_string_width(self, s):
+        """
+        Ancho de un texto con la fuente actual. FPDF lo mide carácter a carácter
+        cada vez que centra o alinea una celda; como los importes y textos se
+        repiten mucho, el resultado se memoriza por fuente, tamaño y texto.
+        """
+        clave = (self.font_family, self.font_style, self.font_size_pt, s)
+        ancho = self._cache_anchos.get(clave)
+        if ancho is None:
+            ancho = super().get_string_width(s)
+            self._cache_anchos[clave] = ancho
+        return ancho
+
+    def dividir_lineas(self, texto, ancho):
+        """
+        Devuelve las líneas en que se divide un texto dentro de un ancho con la
+        fuente actual. Las direcciones y servicios se repiten mucho entre filas,
+        así que la división se calcula una sola vez por texto y se reutiliza
+        tanto para la altura de la fila como para dibujarla.
+        """
+        clave = (self.font_family, self.font_style, self.font_size_pt, ancho, texto)
+        lineas = self._cache_lineas.get(clave)
+        if lineas is None:
+            lineas = self.multi_cell(ancho, 0, texto, border=0, align='C', split_only=True)
+            self._cache_lineas[clave] = lineas
+        return lineas
+
     def header(self):
+        self.dibujar_plantilla('encabezado_pagina', self._encabezado_pagina)
+
+    def _encabezado_pagina(self):
         # Configurar la fuente y colores del encabezado
         self.set_font("Helvetica", 'B', 16)
         self.set_text_color(50, 50, 50)
@@ -17,325 +112,317 @@ class PDF(FPDF):
         self.line(10, 22, self.w - 10, 22)
         self.ln(12)
 
+    def dibujar_plantilla(self, nombre, dibujar):
+        """
+        Dibuja un bloque que se repite igual en todas las páginas (encabezados).
+
+        Con usar_plantillas, la primera vez las operaciones de dibujo se guardan
+        en un form XObject del PDF y en cada página solo se escribe una
+        referencia a él, desplazada a la posición actual. La plantilla hereda el
+        grosor y el color de línea de la página; la fuente y los colores que
+        cambie por dentro no afectan a lo que se dibuja después.
+        """
+        if not self.usar_plantillas or self.state != 2:
+            dibujar()
+            return
+
+        x, y = self.x, self.y
+        estado = {atributo: self.__dict__[atributo] for atributo in _ESTADO_GRAFICO if atributo in self.__dict__}
+        plantilla = self._plantillas.get(nombre)
+        if plantilla is None:
+            pagina = self.page
+            inicio = len(self.pages[pagina])
+            # Forzar a que la fuente y el color del texto queden escritos dentro de la plantilla
+            self.font_family = ''
+            self.color_flag = True
+            dibujar()
+            if self.page != pagina:
+                # El bloque no cupo en la página: se queda dibujado tal cual
+                return
+            plantilla = {
+                'indice': len(self._plantillas) + 1,
+                'contenido': self.pages[pagina][inicio:],
+                'x': x, 'y': y,
+                'avance_x': self.x - x, 'avance_y': self.y - y,
+            }
+            self._plantillas[nombre] = plantilla
+            self.pages[pagina] = self.pages[pagina][:inicio]
+
+        self._out('q 1 0 0 1 %.2f %.2f cm /TPL%d Do Q' % (
+            (x - plantilla['x']) * self.k, (plantilla['y'] - y) * self.k, plantilla['indice']))
+        # El PDF recupera el estado gráfico anterior al terminar la plantilla
+        self.__dict__.update(estado)
+        self.x = x + plantilla['avance_x']
+        self.y = y + plantilla['avance_y']
+
+    def _enddoc(self):
+        super()._enddoc()
+        self.buffer = str(self.buffer)
+
+    def _putimages(self):
+        super()._putimages()
+        # Las plantillas se escriben junto a las imágenes, como XObjects del diccionario de recursos
+        for plantilla in sorted(self._plantillas.values(), key=lambda p: p['indice']):
+            contenido = plantilla['contenido']
+            filtro = ''
+            if self.compress:
+                filtro = '/Filter /FlateDecode '
+                contenido = zlib.compress(contenido.encode('latin-1'))
+            self._newobj()
+            plantilla['n'] = self.n
+            self._out('<</Type /XObject /Subtype /Form /BBox [0 0 %.2f %.2f] /Resources 2 0 R %s/Length %d>>' % (
+                self.w_pt, self.h_pt, filtro, len(contenido)))
+            self._putstream(contenido)
+            self._out('endobj')
+
+    def _putxobjectdict(self):
+        super()._putxobjectdict()
+        for plantilla in sorted(self._plantillas.values(), key=lambda p: p['indice']):
+            self._out('/TPL%d %d 0 R' % (plantilla['indice'], plantilla['n']))
+
+    def pagina_actual(self):
+        """Número de la página actual dentro del informe completo."""
+        return self.page_no() + self.desplazamiento_paginas
+
     def footer(self):
         self.set_y(-15)
         self.set_font("Helvetica", 'I', 8)
         self.set_text_color(100, 100, 100)
         # Añadir fecha de generación
-        fecha_actual = datetime.datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-        self.cell(0, 5, f'Generado el: {fecha_actual}', align="L")
+        self.cell(0, 5, f'Generado el: {self.fecha_generacion}', align="L")
         self.ln(5)
         # Añadir número de página
-        self.cell(0, 5, f'Página {self.page_no()} de {{nb}}', align="C")
+        self.cell(0, 5, f'Página {self.pagina_actual()} de {{nb}}', align="C")
         self.set_font("Helvetica", '', 8)
         self.set_text_color(0, 0, 0)
 
-    def tabla_servicios(self, df, notas=None, fecha_inicio_analisis=None, fecha_fin_analisis=None):
-        # Ajuste de anchos de columna
-        ancho_fecha = 22
-        ancho_direccion = 50
-        ancho_servicio = 45
-        ancho_materiales = 30
-        ancho_valor_materiales = 25
-        ancho_valor = 25
-        ancho_subtotal = 25
-        ancho_iva = 20
-        ancho_total = 28
-
-        # Altura base por línea (para multi_cell)
-        altura_linea = 6
-
-        # Colores para la tabla
-        color_encabezado_bg = (200, 220, 230) # Gris azulado suave
-        color_fila_impar_bg = (230, 230, 230) # Gris muy claro
-        color_fila_par_bg = (255, 255, 255) # Blanco
-        color_borde = (100, 100, 100) # Gris oscuro
-        color_texto = (0, 0, 0) # Negro
-        color_totales_bg = (180, 200, 210) # Tono ligeramente más oscuro que el encabezado
-
-        # Configurar estilos
-        self.set_fill_color(*color_fila_par_bg)
-        self.set_text_color(*color_texto)
-        self.set_draw_color(*color_borde)
-        self.set_line_width(0.2)
-
-        # Encabezado de la tabla
-        self.set_font("Helvetica", 'B', 9)
-        self.set_fill_color(*color_encabezado_bg)
-
-        # Dibujar encabezados
-        y_header_inicial = self.get_y()
-
-        # Usamos cell para encabezados de una línea y multi_cell para los que necesitan salto
-        self.cell(ancho_fecha, altura_linea * 2, "Fecha", 1, 0, 'C', True)
-        self.cell(ancho_direccion, altura_linea * 2, "Dirección", 1, 0, 'C', True)
-        self.cell(ancho_servicio, altura_linea * 2, "Servicio", 1, 0, 'C', True)
-        self.cell(ancho_materiales, altura_linea * 2, "Materiales", 1, 0, 'C', True)
-        self.cell(ancho_valor_materiales, altura_linea * 2, "Valor Mat.", 1, 0, 'C', True)
-        self.cell(ancho_valor, altura_linea * 2, "Valor Servicio", 1, 0, 'C', True)
-
-        # Encabezado Subtotal ABRECAR con salto de línea forzado
-        x_subtotal_header = self.get_x()
-        self.multi_cell(ancho_subtotal, altura_linea, "Subtotal\nABRECAR", 1, 'C', True)
-        # Volver a la posición Y inicial del encabezado para la siguiente celda
-        self.set_xy(x_subtotal_header + ancho_subtotal, y_header_inicial)
-
-        # Celdas de encabezado restantes
-        self.cell(ancho_iva, altura_linea * 2, "IVA", 1, 0, 'C', True)
-        self.cell(ancho_total, altura_linea * 2, "Total\nABRECAR", 1, 1, 'C', True) # ln=1 para ir a la siguiente línea después del encabezado
-
-        self.set_font("Helvetica", '', 8)
-        fill = False
-        subtotal_sum = 0
-        total_sum = 0
-
-        # Filas de datos
-        for index, row in df.iterrows():
+    def fila_totales(self, etiqueta, sumas, diseno, altura, color_bg, tamano_fuente):
+        """
+        Dibuja una fila de totales (subtotal de la página, "Van", "Vienen" o los
+        totales del informe) con la etiqueta alineada a la derecha antes de la
+        primera columna con total y cada importe bajo su columna.
+        """
+        self.set_font(diseno["estilo"]["FONT"], 'B', tamano_fuente)
+        self.set_fill_color(*color_bg)
+        self.cell(diseno["ancho_etiqueta_totales"], altura, etiqueta, 1, 0, 'R', True)
+        ultima = len(diseno["totales"]) - 1
+        for i, (ancho, clave) in enumerate(diseno["totales"]):
+            texto = f"$ {sumas[clave]:,.0f}".replace(',', '.') if clave else ""
+            self.cell(ancho, altura, texto, 1, 1 if i == ultima else 0, 'R', True)
+
+    def encabezado_tabla(self, diseno):
+        """Dibuja la fila de títulos de la tabla de servicios según el diseño (ver report_layout)."""
+        estilo = diseno["estilo"]
+        altura_linea = estilo["LINE_HEIGHT"]
+        self.set_font(estilo["FONT"], 'B', estilo["HEADER_FONT_SIZE"])
+        self.set_fill_color(*estilo["HEADER_BG"])
+        x_inicial, y_inicial = self.get_x(), self.get_y()
+
+        x = x_inicial
+        for titulo, ancho in zip(diseno["titulos"], diseno["anchos"]):
+            self.set_xy(x, y_inicial)
+            if '\n' in titulo:
+                # Títulos de dos líneas: una línea de la celda por cada parte
+                self.multi_cell(ancho, altura_linea, titulo, 1, 'C', True)
+            else:
+                self.cell(ancho, altura_linea * 2, titulo, 1, 0, 'C', True)
+            x += ancho
+        # Continuar debajo del encabezado
+        self.set_xy(x_inicial, y_inicial + altura_linea * 2)
+
+    def medir_filas(self, filas, diseno):
+        """
+        Divide en líneas los textos de las columnas con ajuste y calcula la
+        altura de cada fila, antes de empezar a dibujar.
+
+        Returns:
+            list: Por cada fila, (lineas, altura) donde lineas tiene por cada
+                  columna la lista de líneas, o None si no se ajusta
+        """
+        estilo = diseno["estilo"]
+        altura_linea = estilo["LINE_HEIGHT"]
+        margen = estilo["WRAP_MARGIN"]
+        self.set_font(estilo["FONT"], '', estilo["ROW_FONT_SIZE"])
+        anchos = diseno["anchos"]
+        ajustar = diseno["ajustar"]
+
+        medidas = []
+        for textos in filas:
+            lineas = [None] * len(anchos)
+            max_lineas = 1
+            for i in ajustar:
+                lineas[i] = self.dividir_lineas(textos[i], anchos[i] - margen)
+                max_lineas = max(max_lineas, len(lineas[i]))
+            medidas.append((lineas, max_lineas * altura_linea))
+        return medidas
+
+    def fila_servicio(self, textos, lineas, altura_fila, diseno):
+        """
+        Dibuja una fila de la tabla con el color de relleno actual: el contenido
+        de cada celda centrado verticalmente y después los bordes con la altura
+        completa de la fila.
+        """
+        altura_linea = diseno["estilo"]["LINE_HEIGHT"]
+        x_inicial, y_inicial = self.get_x(), self.get_y()
+
+        x = x_inicial
+        for texto, lineas_celda, ancho, alineacion in zip(textos, lineas, diseno["anchos"], diseno["alineaciones"]):
+            altura_contenido = altura_linea if lineas_celda is None else max(len(lineas_celda), 1) * altura_linea
+            self.set_xy(x, y_inicial + max(altura_fila - altura_contenido, 0) / 2)
+            if lineas_celda is None:
+                self.cell(ancho, altura_linea, texto, border=0, ln=0, align=alineacion, fill=True)
+            else:
+                # Cada línea ya dividida se dibuja con el ancho exacto de la columna, una debajo de otra
+                for linea in lineas_celda:
+                    self.cell(ancho, altura_linea, linea, border=0, ln=2, align=alineacion, fill=True)
+            x += ancho
+
+        self.set_xy(x_inicial, y_inicial)
+        for ancho in diseno["anchos"]:
+            self.cell(ancho, altura_fila, '', border=1, ln=0, fill=False)
+        self.set_y(y_inicial + altura_fila)
+
+    def tabla_servicios(self, df, notas=None, fecha_inicio_analisis=None, fecha_fin_analisis=None, arrastre=None,
+                        diseno=None):
+        """
+        Dibuja la tabla de servicios con su fila de totales, el período y las notas.
+
+        Las columnas, anchos y colores salen del diseño (por defecto
+        crear_diseno() con las columnas de report_layout.COLUMNAS_INFORME).
+
+        Con arrastre (por defecto PDF_CONFIG["CARRIED_TOTALS"]), al final de cada
+        página que continúa se imprimen el subtotal de la página y el acumulado
+        ("Van"), y al inicio de la siguiente el mismo acumulado ("Vienen"). Los
+        acumulados se llevan fila a fila, sin volver a sumar el DataFrame.
+        """
+        if arrastre is None:
+            arrastre = settings.PDF_CONFIG["CARRIED_TOTALS"]
+        if diseno is None:
+            diseno = crear_diseno()
+
+        self.estilo_tabla(diseno)
+        self.dibujar_plantilla('encabezado_tabla', lambda: self.encabezado_tabla(diseno))
+
+        # Textos e importes de todas las filas, calculados por columnas antes de dibujar,
+        # y las líneas y la altura de cada fila
+        filas, valores = preparar_filas(df, diseno["campos"])
+        medidas = self.medir_filas(filas, diseno)
+        importes = list(zip(*(valores[clave].tolist() for clave in diseno["claves_totales"])))
+        paginas_filas, _, _ = self.dibujar_filas(filas, medidas, importes, diseno, arrastre)
+
+        # Totales con los mismos importes mostrados en las filas (también quedan como resumen del informe)
+        totales = calcular_totales(valores, paginas_filas)
+        self.resumen_totales = totales
+        self.cierre_tabla(diseno, totales, _texto_periodo(df, fecha_inicio_analisis, fecha_fin_analisis), notas)
+
+    def estilo_tabla(self, diseno):
+        """Fija los colores y el grosor de línea con que empieza la tabla."""
+        estilo = diseno["estilo"]
+        self.set_fill_color(*estilo["EVEN_ROW_BG"])
+        self.set_text_color(*estilo["TEXT_COLOR"])
+        self.set_draw_color(*estilo["BORDER_COLOR"])
+        self.set_line_width(estilo["LINE_WIDTH"])
+
+    def _limite_filas(self, diseno, arrastre):
+        """Posición vertical que no puede pasar ninguna fila de la página."""
+        # 15 es el margen inferior, ajustado para el pie de página; con arrastre se
+        # reserva además el espacio de las filas de subtotal y "Van"
+        reserva_arrastre = diseno["estilo"]["LINE_HEIGHT"] * 2 if arrastre else 0
+        return self.h - 15 - reserva_arrastre
+
+    def dibujar_filas(self, filas, medidas, importes, diseno, arrastre, acumulado=None, saltos=None, primera_fila=0):
+        """
+        Dibuja las filas de la tabla desde la posición actual, pasando de página
+        cuando la fila siguiente no cabe o, si se indican, en las filas de saltos.
+
+        Args:
+            filas (list): Textos de cada fila (ver preparar_filas)
+            medidas (list): Líneas y altura de cada fila (ver medir_filas)
+            importes (list): Importes de diseno["claves_totales"] de cada fila
+            acumulado (dict): Totales de las filas anteriores a la primera (opcional)
+            saltos (set): Posiciones de las filas que empiezan página (opcional)
+            primera_fila (int): Posición de la primera fila dentro del informe
+
+        Returns:
+            tuple: (paginas_filas, acumulado, de_la_pagina) con la página en que
+                   se dibujó cada fila y los totales parciales al terminar
+        """
+        estilo = diseno["estilo"]
+        altura_linea = estilo["LINE_HEIGHT"]
+        claves = diseno["claves_totales"]
+        acumulado = dict(acumulado) if acumulado else dict.fromkeys(claves, 0.0)
+        de_la_pagina = dict.fromkeys(claves, 0.0)
+        limite = self._limite_filas(diseno, arrastre)
+        # Página en que se dibuja cada fila, para los subtotales por página del resumen
+        paginas_filas = []
+
+        self.set_font(estilo["FONT"], '', estilo["ROW_FONT_SIZE"])
+        for posicion, textos, (lineas, altura_fila), importes_fila in zip(
+                range(primera_fila, primera_fila + len(filas)), filas, medidas, importes):
             # Alternar color de fondo
-            bg_color = color_fila_impar_bg if fill else color_fila_par_bg
-            self.set_fill_color(*bg_color)
-
-            # Preparar datos
-            fecha_str = row['FECHA'].strftime("%d/%m/%Y") if pd.notnull(row['FECHA']) else "-"
-            direccion = str(row['DIRECCION_PARA_INFORME']).replace('\n', ' ').replace('\r', ' ').strip()
-            servicio = str(row['SERVICIO_PARA_INFORME']).replace('\n', ' ').replace('\r', ' ').strip()
-            materiales = str(row['MATERIALES']).replace('\n', ' ').replace('\r', ' ').strip()
-            if materiales.lower() == 'nan' or materiales == '':
-                materiales = "-"
-
-            # Procesar valores monetarios
-            valor_materiales = row['VALOR MATERIALES'] if 'VALOR MATERIALES' in row and pd.notnull(row['VALOR MATERIALES']) else 0
-            try:
-                valor_materiales = float(str(valor_materiales).replace('$', '').replace(',', '').strip())
-            except:
-                valor_materiales = 0
-            valor_materiales_str = f"$ {valor_materiales:,.0f}".replace(',', '.') if valor_materiales > 0 else "-"
-
-            valor_servicio_original = row['VALOR_ORIGINAL'] if 'VALOR_ORIGINAL' in row else 0
-            try:
-                valor_servicio_original = float(str(valor_servicio_original).replace('$', '').replace(',', '').strip())
-            except:
-                valor_servicio_original = 0
-
-            valor_servicio_neto = max(0, valor_servicio_original - valor_materiales)
-            valor_original_str = f"$ {valor_servicio_neto:,.0f}".replace(',', '.') if valor_servicio_neto > 0 else "-"
-
-            subtotal = valor_servicio_neto * 0.5
-            subtotal_sum += subtotal
-            subtotal_str = f"$ {subtotal:,.0f}".replace(',', '.')
-
-            # Procesar valor de IVA de forma robusta
-            iva = 0.0
-            if 'IVA' in df.columns and pd.notnull(row['IVA']): # Se quita .any() aquí
-                try:
-                    iva = float(str(row['IVA']).replace('$', '').replace(',', '').strip())
-                except ValueError:
-                    iva = 0.0
-            iva_str = f"$ {iva:,.0f}".replace(',', '.') if iva > 0 else "-"
-
-            total = subtotal + iva
-            total_sum += total
-            total_str = f"$ {total:,.0f}".replace(',', '.')
-
-            # --- Cálculo de altura de fila basado en contenido ---
-            self.set_font("Helvetica", '', 8) # Asegurar la fuente y tamaño correctos para el cálculo
-
-            # Altura base mínima por línea
-            altura_base_linea = altura_linea
+            bg_color = estilo["ODD_ROW_BG"] if posicion % 2 else estilo["EVEN_ROW_BG"]
 
-            # Pre-calcular la altura necesaria para cada celda que podría ser multi-línea
-            offset_ancho_calculo = 1 # Un pequeño offset para el cálculo en el cálculo de lineas
-
-            # Calcular las líneas para cada columna multi-línea
-            lineas_direccion = self.multi_cell(ancho_direccion - offset_ancho_calculo, altura_base_linea, direccion, border=0, align='C', split_only=True)
-            lineas_servicio = self.multi_cell(ancho_servicio - offset_ancho_calculo, altura_base_linea, servicio, border=0, align='C', split_only=True)
-            lineas_materiales = self.multi_cell(ancho_materiales - offset_ancho_calculo, altura_base_linea, materiales, border=0, align='C', split_only=True)
-
-            # Calcular la altura máxima requerida por el contenido multi-línea
-            altura_multicell_max = max(len(lineas_direccion), len(lineas_servicio), len(lineas_materiales)) * altura_base_linea
-
-            # La altura final de la fila es la máxima entre la altura base y la altura calculada por multi_cell
-            altura_fila = max(altura_base_linea, altura_multicell_max)
-
-            # Asegurar que la altura mínima sea al menos altura_base_linea si hay contenido en la fila
-            if altura_fila < altura_base_linea and any(texto.strip() for texto in [direccion, servicio, materiales, fecha_str, valor_materiales_str, valor_original_str, subtotal_str, iva_str, total_str]):
-                 altura_fila = altura_base_linea
-            # Si no hay contenido relevante que fuerce multi_cell, asegurar altura base
-            elif altura_fila == altura_base_linea and not any(texto.strip() for texto in [direccion, servicio, materiales]):
-                 altura_fila = altura_base_linea
-
-
-            # --- Salto de página si es necesario (usando la altura_fila calculada) ---
-            if self.get_y() + altura_fila > self.h - 15: # 15 es un margen inferior, ajustado para pie de página
+            if posicion in saltos if saltos is not None else self.get_y() + altura_fila > limite:
+                comprobar_cancelacion(self.cancelacion)
+                avisar_progreso(self.progreso, "pdf", posicion, primera_fila + len(filas), paginas=self.pagina_actual())
+                if arrastre and posicion > 0:
+                    self.filas_van(de_la_pagina, acumulado, diseno)
                 self.add_page()
-                # Redibujar encabezado en nueva página
-                self.set_font("Helvetica", 'B', 9)
-                self.set_fill_color(*color_encabezado_bg)
-                y_header_inicial = self.get_y() # Actualizar la posición Y del encabezado en la nueva página
-
-                # Dibujar encabezados (misma lógica que al inicio)
-                self.cell(ancho_fecha, altura_linea * 2, "Fecha", 1, 0, 'C', True)
-                self.cell(ancho_direccion, altura_linea * 2, "Dirección", 1, 0, 'C', True)
-                self.cell(ancho_servicio, altura_linea * 2, "Servicio", 1, 0, 'C', True)
-                self.cell(ancho_materiales, altura_linea * 2, "Materiales", 1, 0, 'C', True)
-                self.cell(ancho_valor_materiales, altura_linea * 2, "Valor Mat.", 1, 0, 'C', True)
-                self.cell(ancho_valor, altura_linea * 2, "Valor Servicio", 1, 0, 'C', True)
-
-                # Encabezado Subtotal ABRECAR
-                x_subtotal_header = self.get_x()
-                self.multi_cell(ancho_subtotal, altura_linea, "Subtotal\nABRECAR", 1, 'C', True)
-                self.set_xy(x_subtotal_header + ancho_subtotal, y_header_inicial) # Volver a la posición para la siguiente celda
-
-                self.cell(ancho_iva, altura_linea * 2, "IVA", 1, 0, 'C', True)
-                self.cell(ancho_total, altura_linea * 2, "Total\nABRECAR", 1, 1, 'C', True)
-
-                self.set_font("Helvetica", '', 8)
-                # Usar el color de fondo de la fila actual para la nueva página
-                self.set_fill_color(*bg_color)
-                # El borde superior de la primera fila en la nueva página se dibujará con el borde de la celda
-
-
-            # --- Dibujar fila: Contenido y Bordes ---
-            x_pos_inicial = self.get_x()
-            y_pos_inicial = self.get_y()
-
-            # Configurar color de relleno para las celdas
+                self.dibujar_plantilla('encabezado_tabla', lambda: self.encabezado_tabla(diseno))
+                if arrastre and posicion > 0:
+                    self.fila_totales("Vienen", acumulado, diseno, altura_linea, estilo["TOTALS_BG"],
+                                      estilo["ROW_FONT_SIZE"])
+                    de_la_pagina = dict.fromkeys(claves, 0.0)
+                self.set_font(estilo["FONT"], '', estilo["ROW_FONT_SIZE"])
+
+            paginas_filas.append(self.pagina_actual())
+            for clave, importe in zip(claves, importes_fila):
+                acumulado[clave] += importe
+                de_la_pagina[clave] += importe
+
             self.set_fill_color(*bg_color)
-            self.set_text_color(*color_texto) # Asegurar color de texto normal
-
-            # Lista de datos de la fila en el orden de las columnas
-            datos_fila_ordenados = [
-                fecha_str,
-                direccion,
-                servicio,
-                materiales,
-                valor_materiales_str,
-                valor_original_str,
-                subtotal_str,
-                iva_str,
-                total_str
-            ]
-            anchos_columnas_ordenados = [
-                ancho_fecha, ancho_direccion, ancho_servicio, ancho_materiales,
-                ancho_valor_materiales, ancho_valor, ancho_subtotal, ancho_iva, ancho_total
-            ]
-            # Identificar qué columnas usan multi_cell para el contenido (requieren ajuste de texto)
-            usar_multicell_contenido = [
-                False, # Fecha
-                True,  # Dirección
-                True,  # Servicio
-                True,  # Materiales
-                False, # Valor Mat.
-                False, # Valor Servicio
-                False, # Subtotal ABRECAR
-                False, # IVA
-                False  # Total ABRECAR
-            ]
-
-            # Verificar que todas las listas tengan la misma longitud
-            if not (len(datos_fila_ordenados) == len(anchos_columnas_ordenados) == len(usar_multicell_contenido)):
-                # Esto no debería ocurrir si las listas están definidas correctamente, pero es una seguridad
-                raise ValueError("Las listas de datos, anchos y configuración de multi_cell deben tener la misma longitud")
-
-            current_x = x_pos_inicial
-
-            # Dibujar el contenido de cada celda con centrado vertical
-            for i in range(len(datos_fila_ordenados)):
-                texto = datos_fila_ordenados[i]
-                ancho_columna = anchos_columnas_ordenados[i]
-                usar_multicell = usar_multicell_contenido[i]
-
-                # Calcular la altura real del contenido de esta celda
-                content_height = altura_base_linea # Altura por defecto para celdas simples
-                if usar_multicell:
-                    # Recalcular líneas para esta celda específica para obtener su altura real.
-                    # Usamos el ancho original de la columna para el cálculo de contenido y el offset.
-                    # Añadimos un pequeño factor de corrección si es necesario.
-                    try:
-                        lines = self.multi_cell(ancho_columna - offset_ancho_calculo, altura_base_linea, texto, border=0, align='C', split_only=True)
-                        content_height = len(lines) * altura_base_linea
-                        # Asegurar que si hay texto, la altura sea al menos la base
-                        if content_height < altura_base_linea and texto.strip():
-                             content_height = altura_base_linea
-                        # Añadir un pequeño ajuste si el cálculo es 0 pero hay texto
-                        if content_height == 0 and texto.strip():
-                             content_height = altura_base_linea
-
-                    except Exception as e:
-                        # En caso de error en el cálculo de multi_cell, usar altura base
-                        print(f"Error calculando líneas para multi_cell: {e} Texto: {texto}")
-                        content_height = altura_base_linea
-
-                # Calcular el offset vertical para centrar el contenido
-                # Si la altura de la fila es mayor que la altura del contenido, calculamos el espacio sobrante
-                y_offset_vertical = y_pos_inicial
-                if altura_fila > content_height:
-                     y_offset_vertical = y_pos_inicial + (altura_fila - content_height) / 2
-
-                # Establecer la posición para dibujar el contenido
-                self.set_xy(current_x, y_offset_vertical)
-
-                # Dibujar el contenido de la celda (sin borde ni avance de línea)
-                if usar_multicell:
-                    # Al dibujar, usamos el ancho exacto de la columna
-                    self.multi_cell(ancho_columna, altura_base_linea, texto, border=0, align='C', fill=True)
-                else:
-                    self.cell(ancho_columna, altura_base_linea, texto, border=0, ln=0, align='C', fill=True)
-
-                # Mover la posición X para la siguiente celda de contenido
-                current_x += ancho_columna
-
-            # Después de dibujar todo el contenido de la fila, dibujar los bordes
-            self.set_xy(x_pos_inicial, y_pos_inicial) 
-
-            for i in range(len(anchos_columnas_ordenados)):
-                ancho_columna = anchos_columnas_ordenados[i]
-                # Dibujamos celdas vacías con la altura de fila completa y borde
-                self.cell(ancho_columna, altura_fila, '', border=1, ln=0, fill=False) # fill=False para no dibujar el fondo de nuevo
-
-            # Mover a la siguiente línea (siguiente fila) después de dibujar los bordes y bordes
-            self.set_y(y_pos_inicial + altura_fila)
-
-            # Alternar el estado de relleno para la próxima fila
-            fill = not fill
-
-        # Fila de totales
+            self.fila_servicio(textos, lineas, altura_fila, diseno)
+        return paginas_filas, acumulado, de_la_pagina
+
+    def paginar_filas(self, medidas, diseno, arrastre, y_inicio):
+        """
+        Calcula sin dibujar nada en qué filas empieza cada página, con la misma
+        regla que dibujar_filas. Todas las páginas empiezan a dibujar filas en
+        y_inicio (debajo del encabezado de la tabla), más la fila "Vienen".
+
+        Returns:
+            list: Posiciones de las filas que empiezan una página nueva
+        """
+        altura_vienen = diseno["estilo"]["LINE_HEIGHT"] if arrastre else 0
+        limite = self._limite_filas(diseno, arrastre)
+        saltos = []
+        y = y_inicio
+        for posicion, (_, altura_fila) in enumerate(medidas):
+            if y + altura_fila > limite:
+                saltos.append(posicion)
+                y = y_inicio + (altura_vienen if posicion > 0 else 0)
+            y += altura_fila
+        return saltos
+
+    def filas_van(self, de_la_pagina, acumulado, diseno):
+        """Dibuja al pie de la tabla el subtotal de la página y el acumulado que pasa a la siguiente ("Van")."""
+        estilo = diseno["estilo"]
+        self.fila_totales(f"Subtotal página {self.pagina_actual()}", de_la_pagina, diseno,
+                          estilo["LINE_HEIGHT"], estilo["HEADER_BG"], estilo["ROW_FONT_SIZE"])
+        self.fila_totales("Van", acumulado, diseno, estilo["LINE_HEIGHT"], estilo["TOTALS_BG"],
+                          estilo["ROW_FONT_SIZE"])
+
+    def cierre_tabla(self, diseno, totales, texto_periodo, notas=None):
+        """Dibuja después de las filas la fila de totales, el número de servicios, el período y las notas."""
+        estilo = diseno["estilo"]
         self.ln(2)
-        self.set_font("Helvetica", 'B', 10)
-        self.set_fill_color(*color_totales_bg)
-        # Ajustar la celda de TOTALES para que ocupe el ancho correcto antes de los valores
-        ancho_celda_totales_texto = ancho_fecha + ancho_direccion + ancho_servicio + ancho_materiales + ancho_valor_materiales
-        self.cell(ancho_celda_totales_texto, 10, "TOTALES", 1, 0, 'R', True)
-
-        # Asegurarse de que la columna IVA exista antes de intentar acceder a ella y verificar nulos
-        iva_sum = df['IVA'].sum() if 'IVA' in df.columns and not df['IVA'].empty else 0 
-
-        # Recalcular el valor total neto sumando los valores netos calculados por fila
-        valor_total_neto_sum = df.apply(lambda row: max(0, (row['VALOR_ORIGINAL'] if 'VALOR_ORIGINAL' in row and pd.notnull(row['VALOR_ORIGINAL']) else 0) - (row['VALOR MATERIALES'] if 'VALOR MATERIALES' in row and pd.notnull(row['VALOR MATERIALES']) else 0)), axis=1).sum()
-      
-        self.cell(ancho_valor, 10, f"$ {valor_total_neto_sum:,.0f}".replace(',', '.'), 1, 0, 'R', True) # Usar el nuevo total neto sumado
-        self.cell(ancho_subtotal, 10, f"$ {subtotal_sum:,.0f}".replace(',', '.'), 1, 0, 'R', True)
-        self.cell(ancho_iva, 10, f"$ {iva_sum:,.0f}".replace(',', '.'), 1, 0, 'R', True)
-        self.cell(ancho_total, 10, f"$ {total_sum:,.0f}".replace(',', '.'), 1, 1, 'R', True)
+        self.fila_totales("TOTALES", totales, diseno, estilo["TOTALS_HEIGHT"], estilo["TOTALS_BG"],
+                          estilo["TOTALS_FONT_SIZE"])
 
         self.ln(5)
         self.set_font("Helvetica", '', 10)
-        self.cell(0, 6, f"Total de servicios registrados: {len(df)}", 0, 1)
-        if fecha_inicio_analisis and fecha_fin_analisis:
-            self.cell(
-                0, 6,
-                f"Período analizado: {fecha_larga(fecha_inicio_analisis)} a {fecha_larga(fecha_fin_analisis)}",
-                0, 1
-            )
-        elif not df.empty and 'FECHA' in df.columns and not df['FECHA'].empty:
-            try:
-                fecha_inicio_str = fecha_larga(df['FECHA'].min())
-                fecha_fin_str = fecha_larga(df['FECHA'].max())
-                self.cell(0, 6, f"Período analizado: {fecha_inicio_str} a {fecha_fin_str}", 0, 1)
-            except Exception:
-                self.cell(0, 6, f"Período analizado: {df['FECHA'].min().strftime('%d/%m/%Y')} al {df['FECHA'].max().strftime('%d/%m/%Y')}", 0, 1)
-        else:
-            self.cell(0, 6, "Período analizado: Sin datos", 0, 1)
+        self.cell(0, 6, f"Total de servicios registrados: {totales['servicios']}", 0, 1)
+        self.cell(0, 6, texto_periodo, 0, 1)
 
         if notas and notas.strip():
             self.ln(8)
@@ -344,45 +431,316 @@ class PDF(FPDF):
             self.multi_cell(0, 8, f"NOTAS:\n{notas.strip()}")
             self.set_text_color(0, 0, 0)
 
-def generar_pdf(df_servicios, ruta_pdf, notas="", fecha_inicio_analisis=None, fecha_fin_analisis=None):
+    def registrar_fuentes(self, fuentes=_FUENTES_INFORME):
+        """
+        Registra las fuentes del informe en un orden fijo antes de la primera
+        página, para que los tramos dibujados en procesos distintos usen los
+        mismos recursos (/F1, /F2...) y se puedan unir en un solo documento.
+        """
+        for familia, estilo in fuentes:
+            self.set_font(familia, estilo)
+        # La primera página escribe la fuente cuando se elija, no la última registrada
+        self.font_family = ''
+
+    def cerrar_paginas(self):
+        """Dibuja el pie de la última página y la cierra, sin terminar el documento."""
+        self.in_footer = 1
+        self.footer()
+        self.in_footer = 0
+        self._endpage()
+
+    def anexar_paginas(self, paginas):
+        """Añade al documento páginas ya dibujadas por otro PDF con las mismas fuentes y plantillas."""
+        if self.state == 0:
+            self.open()
+        for contenido in paginas:
+            self.page += 1
+            self.pages[self.page] = contenido
+        self.state = 1
+
+    def terminar_documento(self):
+        """Escribe el documento a partir de páginas anexadas (output() ya no dibuja el pie)."""
+        self._enddoc()
+
+def _texto_periodo(df, fecha_inicio_analisis=None, fecha_fin_analisis=None):
+    """Línea "Período analizado" del informe: el período pedido o, si no, el de las fechas de los servicios."""
+    if fecha_inicio_analisis and fecha_fin_analisis:
+        return f"Período analizado: {fecha_larga(fecha_inicio_analisis)} a {fecha_larga(fecha_fin_analisis)}"
+    if not df.empty and 'FECHA' in df.columns and not df['FECHA'].empty:
+        try:
+            fecha_inicio_str = fecha_larga(df['FECHA'].min())
+            fecha_fin_str = fecha_larga(df['FECHA'].max())
+            return f"Período analizado: {fecha_inicio_str} a {fecha_fin_str}"
+        except Exception:
+            return f"Período analizado: {df['FECHA'].min().strftime('%d/%m/%Y')} al {df['FECHA'].max().strftime('%d/%m/%Y')}"
+    return "Período analizado: Sin datos"
+
+def _nuevo_pdf(compacto):
+    """Crea un documento vacío con la configuración del informe."""
+    # Crear PDF con orientación horizontal (landscape) para tener más espacio
+    pdf = PDF(orientation='L')
+    pdf.set_compression(True)
+    pdf.usar_plantillas = compacto
+    pdf.alias_nb_pages()
+
+    # Configurar márgenes (izquierda, superior, derecha)
+    pdf.set_margins(10, 10, 10)
+
+    # Configurar auto page break
+    pdf.set_auto_page_break(True, margin=15)
+    return pdf
+
+def _construir_pdf(df_servicios, notas="", fecha_inicio_analisis=None, fecha_fin_analisis=None, compacto=None,
+                   paralelo=None, cancelacion=None, progreso=None, log_callback=None):
     """
-    Genera un PDF con los datos de servicios procesados
+    Crea el documento del informe con la tabla de servicios ya dibujada.
+
+    El contenido de las páginas siempre se comprime. Con compacto (por defecto
+    PDF_CONFIG["COMPACT_OUTPUT"]) además los encabezados de página y de la
+    tabla se escriben una sola vez como plantillas que cada página reutiliza.
+
+    Con paralelo (por defecto PDF_CONFIG["PARALLEL_RENDER"] a partir de
+    PDF_CONFIG["PARALLEL_MIN_ROWS"] filas) las páginas se dibujan por tramos en
+    varios procesos (ver _construir_pdf_paralelo). Si no se puede crear el pool
+    de procesos (p. ej. en un ejecutable congelado) se avisa por log_callback y
+    se dibuja en un solo proceso: el PDF es el mismo, solo tarda más.
+
+    Con cancelacion (un TokenCancelacion de src/utils/job_runner.py), antes de
+    cada página se comprueba si se pidió cancelar y en ese caso se lanza
+    TareaCancelada. Con progreso se avisa de las filas y páginas dibujadas
+    (ver src/utils/progress.py).
+    """
+    if compacto is None:
+        compacto = settings.PDF_CONFIG["COMPACT_OUTPUT"]
+    if paralelo is None:
+        paralelo = (settings.PDF_CONFIG["PARALLEL_RENDER"]
+                    and len(df_servicios) >= settings.PDF_CONFIG["PARALLEL_MIN_ROWS"])
+
+    if paralelo:
+        try:
+            pdf = _construir_pdf_paralelo(df_servicios, notas, fecha_inicio_analisis, fecha_fin_analisis, compacto,
+                                          settings.PDF_CONFIG["RENDER_WORKERS"], cancelacion, progreso)
+            if pdf is not None:
+                return pdf
+        except (BrokenProcessPool, OSError, NotImplementedError) as e:
+            if log_callback:
+                log_callback(f"No se pudo dibujar el PDF en paralelo, se dibuja en un solo proceso: {str(e)}",
+                             "warning")
+
+    pdf = _nuevo_pdf(compacto)
+    pdf.cancelacion = cancelacion
+    pdf.progreso = progreso
+
+    # Agregar primera página
+    pdf.add_page()
+
+    # Agregar tabla de servicios
+    pdf.tabla_servicios(df_servicios, notas, fecha_inicio_analisis, fecha_fin_analisis)
+    avisar_progreso(progreso, "pdf", len(df_servicios), len(df_servicios), paginas=pdf.page)
+    return pdf
+
+def _construir_pdf_paralelo(df_servicios, notas, fecha_inicio_analisis, fecha_fin_analisis, compacto, procesos=None,
+                            cancelacion=None, progreso=None):
+    """
+    Dibuja el informe repartiendo las páginas en tramos entre varios procesos.
+
+    Antes de dibujar se preparan los textos, se mide cada fila y se calcula en
+    qué fila empieza cada página (paginar_filas), de modo que cada proceso
+    recibe un tramo de páginas completas con el acumulado "Vienen" con que
+    empieza y su primer número de página. El último tramo dibuja además los
+    totales del informe. Las páginas de todos los tramos se unen en un solo
+    documento, que numera "Página X de N" con el total de páginas. La
+    cancelación se comprueba antes de repartir los tramos y al recibir cada
+    uno, que es también cuando se avisa del progreso.
+
+    Returns:
+        PDF: Documento ya terminado, o None si solo hay un proceso o una
+             página para repartir
+    """
+    procesos = procesos or os.cpu_count() or 1
+    if procesos < 2:
+        return None
+    diseno = crear_diseno()
+    arrastre = settings.PDF_CONFIG["CARRIED_TOTALS"]
+    fecha_generacion = datetime.datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+
+    # Las filas empiezan en todas las páginas debajo del encabezado de la tabla
+    medidor = _nuevo_pdf(False)
+    medidor.add_page()
+    medidor.encabezado_tabla(diseno)
+    y_inicio = medidor.get_y()
+
+    filas, valores = preparar_filas(df_servicios, diseno["campos"])
+    medidas = medidor.medir_filas(filas, diseno)
+    saltos = medidor.paginar_filas(medidas, diseno, arrastre, y_inicio)
+    inicios = [0] + saltos
+    if len(inicios) < 2 or saltos[0] == 0:
+        return None
+    comprobar_cancelacion(cancelacion)
+
+    paginas_filas = np.searchsorted(saltos, np.arange(len(filas)), side='right') + 1
+    totales = calcular_totales(valores, paginas_filas)
+
+    # Acumulado con que empieza cada fila, sumado en el mismo orden que al dibujar
+    claves = diseno["claves_totales"]
+    acumulados = {clave: list(accumulate(valores[clave].tolist(), initial=0.0)) for clave in claves}
+    importes = list(zip(*(valores[clave].tolist() for clave in claves)))
+    # Los procesos solo necesitan lo que se usa para dibujar (los formatos pueden no ser serializables)
+    diseno_dibujo = {k: v for k, v in diseno.items() if k not in ("columnas", "campos")}
+
+    n_tramos = min(procesos, len(inicios))
+    cortes = [round(i * len(inicios) / n_tramos) for i in range(n_tramos + 1)]
+    tramos = []
+    for i in range(n_tramos):
+        desde = inicios[cortes[i]]
+        hasta = inicios[cortes[i + 1]] if i + 1 < n_tramos else len(filas)
+        tramos.append({
+            "diseno": diseno_dibujo,
+            "arrastre": arrastre,
+            "compacto": compacto,
+            "fecha_generacion": fecha_generacion,
+            "primera_pagina": cortes[i] + 1,
+            "primera_fila": desde,
+            "filas": filas[desde:hasta],
+            "medidas": medidas[desde:hasta],
+            "importes": importes[desde:hasta],
+            "saltos": set(inicios[cortes[i] + 1:cortes[i + 1]]),
+            "acumulado": {clave: acumulados[clave][desde] for clave in claves},
+            "cierre": (totales, _texto_periodo(df_servicios, fecha_inicio_analisis, fecha_fin_analisis), notas)
+                      if i == n_tramos - 1 else None,
+        })
+
+    with ProcessPoolExecutor(max_workers=n_tramos) as pool:
+        futuros = [pool.submit(_dibujar_tramo, tramo) for tramo in tramos]
+        resultados = []
+        for tramo, futuro in zip(tramos, futuros):
+            if cancelacion is not None and cancelacion.cancelado:
+                for pendiente in futuros:
+                    pendiente.cancel()
+                cancelacion.comprobar()
+            resultados.append(futuro.result())
+            avisar_progreso(progreso, "pdf", tramo["primera_fila"] + len(tramo["filas"]), len(filas),
+                            paginas=tramo["primera_pagina"] - 1 + len(resultados[-1][0]))
+
+    pdf = _nuevo_pdf(compacto)
+    pdf.fecha_generacion = fecha_generacion
+    _, pdf.fonts, pdf._plantillas = resultados[0]
+    for paginas, fuentes, plantillas in resultados:
+        # Todos los tramos deben usar los mismos recursos para compartir el diccionario del documento
+        if {k: f['i'] for k, f in fuentes.items()} != {k: f['i'] for k, f in pdf.fonts.items()}:
+            raise ValueError("Los tramos del PDF no usan las mismas fuentes")
+        if any(p['indice'] != pdf._plantillas.get(nombre, {}).get('indice') for nombre, p in plantillas.items()):
+            raise ValueError("Los tramos del PDF no usan las mismas plantillas")
+        pdf.anexar_paginas(paginas)
+    pdf.resumen_totales = totales
+    pdf.terminar_documento()
+    return pdf
+
+def _dibujar_tramo(tramo):
+    """
+    Dibuja en un documento aparte las páginas de un tramo del informe (ver
+    _construir_pdf_paralelo).
+
+    Returns:
+        tuple: (paginas, fuentes, plantillas) con el contenido de cada página
+    """
+    diseno = tramo["diseno"]
+    arrastre = tramo["arrastre"]
+    estilo = diseno["estilo"]
+
+    pdf = _nuevo_pdf(tramo["compacto"])
+    pdf.fecha_generacion = tramo["fecha_generacion"]
+    pdf.desplazamiento_paginas = tramo["primera_pagina"] - 1
+    pdf.registrar_fuentes()
+    pdf.add_page()
+    pdf.estilo_tabla(diseno)
+    pdf.dibujar_plantilla('encabezado_tabla', lambda: pdf.encabezado_tabla(diseno))
+    if arrastre and tramo["primera_fila"] > 0:
+        pdf.fila_totales("Vienen", tramo["acumulado"], diseno, estilo["LINE_HEIGHT"], estilo["TOTALS_BG"],
+                         estilo["ROW_FONT_SIZE"])
+
+    _, acumulado, de_la_pagina = pdf.dibujar_filas(
+        tramo["filas"], tramo["medidas"], tramo["importes"], diseno, arrastre,
+        acumulado=tramo["acumulado"], saltos=tramo["saltos"], primera_fila=tramo["primera_fila"])
+    if tramo["cierre"] is not None:
+        pdf.cierre_tabla(diseno, *tramo["cierre"])
+    elif arrastre:
+        pdf.filas_van(de_la_pagina, acumulado, diseno)
+    pdf.cerrar_paginas()
+    return [pdf.pages[n] for n in range(1, pdf.page + 1)], pdf.fonts, pdf._plantillas
+
+def generar_pdf_bytes(df_servicios, notas="", fecha_inicio_analisis=None, fecha_fin_analisis=None, compacto=None,
+                      paralelo=None, cancelacion=None, progreso=None, log_callback=None):
+    """
+    Genera el PDF del informe en memoria, sin escribir nada en disco.
+    compacto elige el formato de salida, paralelo si las páginas se dibujan
+    en varios procesos, cancelacion permite detenerlo entre páginas, progreso
+    recibe el avance y log_callback los avisos (ver _construir_pdf; la
+    cancelación se propaga como TareaCancelada).
+
+    Returns:
+        tuple: (exito, resultado) donde resultado son los bytes del PDF si se
+               generó, o el mensaje de error si no
     """
     if df_servicios.empty:
         return False, "No hay datos para generar el informe"
 
     try:
-        # Verificar si podemos escribir en la carpeta
-        carpeta = os.path.dirname(ruta_pdf)
-        if not os.access(carpeta, os.W_OK):
-            return False, f"No hay permisos de escritura en la carpeta: {carpeta}"
-
-        # Crear PDF con orientación horizontal (landscape) para tener más espacio
-        pdf = PDF(orientation='L')
-        pdf.alias_nb_pages()
-
-        # Configurar márgenes (izquierda, superior, derecha)
-        pdf.set_margins(10, 10, 10)
+        pdf = _construir_pdf(df_servicios, notas, fecha_inicio_analisis, fecha_fin_analisis, compacto, paralelo,
+                             cancelacion, progreso, log_callback)
+        # FPDF 1.7 devuelve el documento como texto latin-1 (un carácter por byte)
+        return True, pdf.output(dest='S').encode('latin-1')
+    except TareaCancelada:
+        raise
+    except Exception as e:
+        return False, f"Error al generar el PDF: {str(e)}"
 
-        # Configurar auto page break
-        pdf.set_auto_page_break(True, margin=15)
+def generar_pdf(df_servicios, ruta_pdf, notas="", fecha_inicio_analisis=None, fecha_fin_analisis=None, compacto=None,
+                paralelo=None, cancelacion=None, progreso=None, log_callback=None):
+    """
+    Genera un PDF con los datos de servicios procesados.
 
-        # Agregar primera página
-        pdf.add_page()
+    ruta_pdf puede ser la ruta del archivo o cualquier objeto binario con
+    write() (un archivo abierto, un io.BytesIO, un zip...). compacto elige el
+    formato de salida, paralelo si las páginas se dibujan en varios procesos,
+    cancelacion permite detenerlo entre páginas, progreso recibe el avance y
+    log_callback los avisos (ver _construir_pdf).
+    """
+    if df_servicios.empty:
+        return False, "No hay datos para generar el informe"
 
-        # Agregar tabla de servicios
-        pdf.tabla_servicios(df_servicios, notas, fecha_inicio_analisis, fecha_fin_analisis)
+    en_disco = not hasattr(ruta_pdf, 'write')
+    if en_disco:
+        # Verificar si podemos escribir en la carpeta
+        carpeta = os.path.dirname(ruta_pdf) or '.'
+        if not os.access(carpeta, os.W_OK):
+            return False, f"No hay permisos de escritura en la carpeta: {carpeta}"
 
-        # Generar archivo
-        pdf.output(ruta_pdf)
+    exito, resultado = generar_pdf_bytes(df_servicios, notas, fecha_inicio_analisis, fecha_fin_analisis, compacto,
+                                         paralelo, cancelacion, progreso, log_callback)
+    if not exito:
+        return False, resultado
 
-        return True, f"PDF generado exitosamente: {ruta_pdf}"
+    try:
+        if en_disco:
+            with open(ruta_pdf, 'wb') as f:
+                f.write(resultado)
+            return True, f"PDF generado exitosamente: {ruta_pdf}"
+        ruta_pdf.write(resultado)
+        return True, "PDF generado exitosamente"
     except Exception as e:
-        print(f"Error detallado al generar PDF: {str(e)}")  # Para depuración
         return False, f"Error al generar el PDF: {str(e)}"
 
 
-def generar_pdf_modular(df, nombre_pdf, notas, fecha_inicio_analisis=None, fecha_fin_analisis=None, log_callback=None):
+def generar_pdf_modular(df, nombre_pdf, notas, fecha_inicio_analisis=None, fecha_fin_analisis=None, log_callback=None,
+                        usar_cache=True, cancelacion=None, progreso=None):
+    """
+    Genera el PDF en la carpeta de informes. Con usar_cache, si ya se generó un
+    informe con las mismas filas, notas y período, se copia el PDF guardado en
+    la caché (ver src/core/pdf_cache.py) en lugar de volver a dibujarlo. Si se
+    cancela con cancelacion, se lanza TareaCancelada y no se escribe el PDF;
+    progreso recibe el avance del dibujo.
+    """
     try:
         desktop = os.path.expanduser("~/OneDrive/Escritorio")
         carpeta_pdf = os.path.join(desktop, "pdf-relacion-servicios-en-efectivo")
@@ -390,8 +748,29 @@ def generar_pdf_modular(df, nombre_pdf, notas, fecha_inicio_analisis=None, fecha
         if log_callback:
             log_callback(f"📄 Intentando guardar PDF en: {ruta_pdf}", "info")
 
+        huella = None
+        if usar_cache and not df.empty:
+            try:
+                huella = pdf_cache.huella_informe(df, notas, fecha_inicio_analisis, fecha_fin_analisis)
+                if huella and pdf_cache.copiar_informe(huella, ruta_pdf):
+                    if log_callback:
+                        log_callback("📦 Informe sin cambios: se reutiliza el PDF ya generado", "info")
+                        log_callback("✅ PDF generado exitosamente! - Listo para abrir", "success")
+                    return True, f"PDF generado exitosamente: {ruta_pdf}"
+            except Exception as e:
+                if log_callback:
+                    log_callback(f"No se pudo usar la caché de informes: {e}", "warning")
+
         # Llama a la función real que crea el PDF
-        exito, mensaje = generar_pdf(df, ruta_pdf, notas, fecha_inicio_analisis, fecha_fin_analisis)
+        exito, mensaje = generar_pdf(df, ruta_pdf, notas, fecha_inicio_analisis, fecha_fin_analisis,
+                                     cancelacion=cancelacion, progreso=progreso, log_callback=log_callback)
+
+        if exito and huella:
+            try:
+                pdf_cache.guardar_informe(huella, ruta_pdf)
+            except Exception as e:
+                if log_callback:
+                    log_callback(f"No se pudo guardar el informe en la caché: {e}", "warning")
 
         if log_callback:
             if exito:
@@ -400,6 +779,8 @@ def generar_pdf_modular(df, nombre_pdf, notas, fecha_inicio_analisis=None, fecha
                 log_callback(f"❌ {mensaje}", "error")
         return exito, mensaje
 
+    except TareaCancelada:
+        raise
     except Exception as e:
         if log_callback:
             log_callback(f"❌ Error al generar PDF: {e}", "error")
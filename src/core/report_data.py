@@ -0,0 +1,142 @@
+# src/core/report_data.py
+"""
+Preparación de los datos del informe antes de dibujar el PDF.
+
+Calcula de una vez, por columnas, todos los textos que se muestran en cada fila
+de la tabla (fecha, textos limpios e importes con formato) y los valores
+numéricos de cada servicio, para que el bucle de dibujo de tabla_servicios
+solo tenga que dibujar.
+"""
+import numpy as np
+import pandas as pd
+from src.utils.validation_utils import limpiar_valores_monetarios
+
+# Importes que se suman en los totales del informe
+COLUMNAS_TOTALES = ('valor_materiales', 'valor_original', 'neto', 'subtotal', 'iva', 'total')
+
+# Orden de los textos de cada fila, igual al de las columnas de la tabla
+CAMPOS_FILA = (
+    'fecha', 'direccion', 'servicio', 'materiales', 'valor_materiales',
+    'valor_servicio', 'subtotal', 'iva', 'total'
+)
+
+def preparar_filas(df, campos=CAMPOS_FILA):
+    """
+    Prepara las filas de la tabla de servicios.
+
+    Args:
+        df (pd.DataFrame): Servicios del informe (resultado de extraer_servicios)
+        campos (tuple): Textos de cada fila, en orden: nombres de FORMATOS_CAMPO
+                        o funciones (df, valores) -> lista de textos
+
+    Returns:
+        tuple: (filas, valores) donde filas es una lista de tuplas de textos en
+               el orden de campos, y valores un DataFrame con los importes
+               de cada fila: 'valor_materiales', 'valor_original', 'neto'
+               (valor del servicio menos materiales, nunca negativo),
+               'subtotal', 'iva' y 'total'
+    """
+    valores = calcular_importes(df)
+    columnas = [
+        (campo if callable(campo) else FORMATOS_CAMPO[campo])(df, valores)
+        for campo in campos
+    ]
+    return list(zip(*columnas)), valores
+
+def calcular_importes(df):
+    """Calcula los importes de cada servicio (ver preparar_filas)."""
+    ceros = pd.Series(0.0, index=df.index)
+    valor_materiales = limpiar_valores_monetarios(df['VALOR MATERIALES']) if 'VALOR MATERIALES' in df.columns else ceros
+    valor_original = limpiar_valores_monetarios(df['VALOR_ORIGINAL']) if 'VALOR_ORIGINAL' in df.columns else ceros
+    iva = limpiar_valores_monetarios(df['IVA']) if 'IVA' in df.columns else ceros
+
+    neto = (valor_original - valor_materiales).clip(lower=0)
+    subtotal = neto * 0.5
+    total = subtotal + iva
+    return pd.DataFrame({
+        'valor_materiales': valor_materiales.to_numpy(),
+        'valor_original': valor_original.to_numpy(),
+        'neto': neto.to_numpy(),
+        'subtotal': subtotal.to_numpy(),
+        'iva': iva.to_numpy(),
+        'total': total.to_numpy(),
+    })
+
+def fechas_informe(df):
+    """Fecha de cada servicio como datetime (NaT si no es una fecha válida)."""
+    fechas = df['FECHA']
+    if not pd.api.types.is_datetime64_any_dtype(fechas):
+        fechas = pd.to_datetime(fechas, errors='coerce', dayfirst=True)
+    return fechas
+
+def _textos_fecha(df, valores):
+    return fechas_informe(df).dt.strftime("%d/%m/%Y").fillna("-").tolist()
+
+def _textos_materiales(df, valores):
+    materiales = _limpiar_texto(df['MATERIALES'])
+    return materiales.where((materiales.str.lower() != 'nan') & (materiales != ''), "-").tolist()
+
+# Cómo se obtiene cada texto de la fila, columna a columna: funcion(df, valores) -> lista de textos
+FORMATOS_CAMPO = {
+    'fecha': _textos_fecha,
+    'direccion': lambda df, valores: _limpiar_texto(df['DIRECCION_PARA_INFORME']).tolist(),
+    'servicio': lambda df, valores: _limpiar_texto(df['SERVICIO_PARA_INFORME']).tolist(),
+    'materiales': _textos_materiales,
+    'valor_materiales': lambda df, valores: formatear_pesos(valores['valor_materiales'], guion_si_cero=True),
+    'valor_servicio': lambda df, valores: formatear_pesos(valores['neto'], guion_si_cero=True),
+    'subtotal': lambda df, valores: formatear_pesos(valores['subtotal']),
+    'iva': lambda df, valores: formatear_pesos(valores['iva'], guion_si_cero=True),
+    'total': lambda df, valores: formatear_pesos(valores['total']),
+}
+
+def calcular_totales(valores, paginas=None):
+    """
+    Suma los importes de las filas ya preparadas (los mismos que se muestran en
+    cada fila) y, si se indica la página de cada fila, los subtotales por página.
+
+    Args:
+        valores (pd.DataFrame): Importes de cada fila (segundo resultado de preparar_filas)
+        paginas (list): Número de página en que se dibujó cada fila (opcional)
+
+    Returns:
+        dict: 'servicios' y la suma de cada columna de COLUMNAS_TOTALES; con
+              paginas, además 'paginas': lista de dicts con 'pagina',
+              'servicios' y las mismas sumas para esa página
+    """
+    columnas = list(COLUMNAS_TOTALES)
+    sumas = valores[columnas].sum()
+    totales = {"servicios": len(valores)}
+    totales.update({col: float(sumas[col]) for col in columnas})
+
+    if paginas is not None:
+        grupos = valores[columnas].groupby(np.asarray(paginas), sort=True)
+        sumas_pagina = grupos.sum()
+        servicios_pagina = grupos.size()
+        totales["paginas"] = [
+            {"pagina": int(pagina), "servicios": int(servicios_pagina[pagina]),
+             **{col: float(sumas_pagina.at[pagina, col]) for col in columnas}}
+            for pagina in sumas_pagina.index
+        ]
+    return totales
+
+def formatear_pesos(valores, guion_si_cero=False):
+    """
+    Da formato de pesos a una columna de importes: "$ 1.250.000".
+    Los importes se repiten mucho, así que cada valor distinto se formatea una
+    sola vez. Con guion_si_cero, los importes que no son positivos se muestran como "-".
+
+    Returns:
+        list: Textos en el mismo orden que los valores
+    """
+    valores = np.asarray(valores, dtype=float)
+    codigos, unicos = pd.factorize(valores)
+    textos = np.array([f"$ {v:,.0f}".replace(',', '.') for v in unicos] + ["-"], dtype=object)
+    # factorize asigna -1 a los NaN, que apunta al último elemento ("-")
+    resultado = textos[codigos]
+    if guion_si_cero:
+        resultado = np.where(valores > 0, resultado, "-")
+    return resultado.tolist()
+
+def _limpiar_texto(serie):
+    """Convierte una columna a texto sin saltos de línea ni espacios en los extremos."""
+    return serie.astype(str).str.replace('\n', ' ', regex=False).str.replace('\r', ' ', regex=False).str.strip()
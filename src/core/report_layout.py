@@ -0,0 +1,91 @@
+# src/core/report_layout.py
+"""
+Diseño de la tabla de servicios del informe PDF.
+
+Las columnas de la tabla se describen en COLUMNAS_INFORME y el estilo en
+ESTILO_TABLA. crear_diseno calcula una sola vez por informe lo que necesita el
+dibujo (anchos, títulos, alineación, columnas con ajuste de línea y posición de
+los totales), de modo que para añadir, quitar o reordenar columnas basta con
+cambiar la lista, sin tocar el bucle de dibujo de tabla_servicios.
+"""
+from src.core.report_data import COLUMNAS_TOTALES, FORMATOS_CAMPO
+
+# Cada columna es un dict con:
+#   campo:      texto de la fila (nombre de FORMATOS_CAMPO en report_data)
+#   titulo:     título del encabezado ("\n" lo parte en dos líneas)
+#   ancho:      ancho en mm
+#   ajustar:    dividir el texto en varias líneas si no cabe (opcional)
+#   alineacion: 'L', 'C' o 'R' (opcional, centrado por defecto)
+#   formato:    función (df, valores) -> lista de textos, en lugar de la del campo (opcional)
+#   total:      importe de COLUMNAS_TOTALES que se muestra bajo la columna en las filas de totales (opcional)
+#   importe:    importe de COLUMNAS_TOTALES que muestra la columna; las exportaciones lo escriben como número (opcional)
+#   fecha:      la columna muestra la fecha del servicio; las exportaciones la escriben como fecha (opcional)
+COLUMNAS_INFORME = (
+    {"campo": "fecha", "titulo": "Fecha", "ancho": 22, "fecha": True},
+    {"campo": "direccion", "titulo": "Dirección", "ancho": 50, "ajustar": True},
+    {"campo": "servicio", "titulo": "Servicio", "ancho": 45, "ajustar": True},
+    {"campo": "materiales", "titulo": "Materiales", "ancho": 30, "ajustar": True},
+    {"campo": "valor_materiales", "titulo": "Valor Mat.", "ancho": 25, "importe": "valor_materiales"},
+    {"campo": "valor_servicio", "titulo": "Valor Servicio", "ancho": 25, "total": "neto", "importe": "neto"},
+    {"campo": "subtotal", "titulo": "Subtotal\nABRECAR", "ancho": 25, "total": "subtotal", "importe": "subtotal"},
+    {"campo": "iva", "titulo": "IVA", "ancho": 20, "total": "iva", "importe": "iva"},
+    {"campo": "total", "titulo": "Total\nABRECAR", "ancho": 28, "total": "total", "importe": "total"},
+)
+
+ESTILO_TABLA = {
+    "FONT": "Helvetica",
+    "HEADER_FONT_SIZE": 9,
+    "ROW_FONT_SIZE": 8,
+    "TOTALS_FONT_SIZE": 10,
+    # Altura de cada línea de texto en mm (el encabezado ocupa dos)
+    "LINE_HEIGHT": 6,
+    # Altura de la fila final de totales en mm
+    "TOTALS_HEIGHT": 10,
+    # Margen en mm que se descuenta del ancho de la columna al dividir el texto en líneas
+    "WRAP_MARGIN": 1,
+    "LINE_WIDTH": 0.2,
+    "HEADER_BG": (200, 220, 230),      # Gris azulado suave
+    "ODD_ROW_BG": (230, 230, 230),     # Gris muy claro
+    "EVEN_ROW_BG": (255, 255, 255),    # Blanco
+    "BORDER_COLOR": (100, 100, 100),   # Gris oscuro
+    "TEXT_COLOR": (0, 0, 0),           # Negro
+    "TOTALS_BG": (180, 200, 210),      # Tono ligeramente más oscuro que el encabezado
+}
+
+def crear_diseno(columnas=COLUMNAS_INFORME, estilo=ESTILO_TABLA):
+    """
+    Calcula el diseño de la tabla a partir de la descripción de sus columnas.
+
+    Returns:
+        dict: 'columnas', 'estilo', 'campos' (para preparar_filas), 'anchos',
+              'titulos', 'alineaciones', 'ajustar' (índices de las columnas con
+              ajuste de línea), 'ancho_etiqueta_totales' (ancho de las
+              columnas anteriores al primer total), 'totales' (ancho e importe,
+              o None, de cada columna desde el primer total) y
+              'claves_totales' (los importes que se muestran en los totales)
+
+    Raises:
+        ValueError: Si una columna no tiene un campo conocido ni formato, o su
+                    total o importe no está en COLUMNAS_TOTALES
+    """
+    for columna in columnas:
+        if "formato" not in columna and columna["campo"] not in FORMATOS_CAMPO:
+            raise ValueError(f"Columna sin formato para el campo '{columna['campo']}'")
+        for clave in ("total", "importe"):
+            if columna.get(clave) is not None and columna[clave] not in COLUMNAS_TOTALES:
+                raise ValueError(f"Importe no válido para la columna '{columna['campo']}': {columna[clave]}")
+
+    anchos = tuple(columna["ancho"] for columna in columnas)
+    primer_total = next((i for i, columna in enumerate(columnas) if columna.get("total")), len(columnas))
+    return {
+        "columnas": tuple(columnas),
+        "estilo": estilo,
+        "campos": tuple(columna.get("formato") or columna["campo"] for columna in columnas),
+        "anchos": anchos,
+        "titulos": tuple(columna["titulo"] for columna in columnas),
+        "alineaciones": tuple(columna.get("alineacion", 'C') for columna in columnas),
+        "ajustar": tuple(i for i, columna in enumerate(columnas) if columna.get("ajustar")),
+        "ancho_etiqueta_totales": sum(anchos[:primer_total]),
+        "totales": tuple((columna["ancho"], columna.get("total")) for columna in columnas[primer_total:]),
+        "claves_totales": tuple(columna["total"] for columna in columnas if columna.get("total")),
+    }
@@ -0,0 +1,114 @@
+# src/core/report_preview.py
+"""
+Datos de la vista previa de los servicios procesados en la interfaz.
+
+La vista previa muestra las mismas columnas y textos que la tabla del PDF
+(report_layout.COLUMNAS_INFORME), pero solo da formato a las filas que se
+van a ver: filas(inicio, cantidad) prepara por bloques de
+PREVIEW_CONFIG["BLOCK_ROWS"] las filas pedidas y guarda los últimos bloques.
+Al ordenar por una columna, el orden (argsort estable de los importes, las
+fechas o los textos) se calcula una sola vez por columna y se reutiliza en
+los dos sentidos.
+"""
+from collections import OrderedDict
+import numpy as np
+from src.config import settings
+from src.core.report_data import preparar_filas, calcular_importes, fechas_informe, FORMATOS_CAMPO
+from src.core.report_layout import crear_diseno
+
+class ModeloVistaPrevia:
+    """Filas de df_resultado listas para mostrar, en el orden elegido."""
+    def __init__(self, df, diseno=None):
+        self.diseno = diseno or crear_diseno()
+        self._df = df.reset_index(drop=True)
+        self._valores = None
+        # Posición en df de cada fila mostrada (None: el orden original)
+        self._orden = None
+        # Columna -> índices que la ordenan de menor a mayor
+        self._ordenes = {}
+        self.columna_orden = None
+        self.descendente = False
+        self._bloques = OrderedDict()
+
+    def __len__(self):
+        return len(self._df)
+
+    def filas(self, inicio, cantidad):
+        """Devuelve los textos de las filas mostradas desde la posición inicio."""
+        inicio = max(0, inicio)
+        fin = min(len(self._df), inicio + cantidad)
+        tam_bloque = settings.PREVIEW_CONFIG["BLOCK_ROWS"]
+        filas = []
+        for bloque in range(inicio // tam_bloque, (fin - 1) // tam_bloque + 1 if fin > inicio else 0):
+            desde = bloque * tam_bloque
+            filas.extend(self._bloque(bloque)[max(0, inicio - desde):fin - desde])
+        return filas
+
+    def _bloque(self, bloque):
+        """Textos de un bloque de filas, preparados la primera vez que se piden."""
+        if bloque in self._bloques:
+            self._bloques.move_to_end(bloque)
+            return self._bloques[bloque]
+        tam_bloque = settings.PREVIEW_CONFIG["BLOCK_ROWS"]
+        posiciones = slice(bloque * tam_bloque, (bloque + 1) * tam_bloque)
+        indices = np.arange(len(self._df))[posiciones] if self._orden is None else self._orden[posiciones]
+        filas, _ = preparar_filas(self._df.iloc[indices], self.diseno["campos"])
+        self._bloques[bloque] = filas
+        if len(self._bloques) > settings.PREVIEW_CONFIG["CACHED_BLOCKS"]:
+            self._bloques.popitem(last=False)
+        return filas
+
+    def ordenar(self, columna, descendente=False):
+        """
+        Ordena las filas por la columna (posición en el diseño, o None para el
+        orden original). Los importes se ordenan por su valor, las fechas como
+        fechas y el resto por su texto sin distinguir mayúsculas; las filas
+        iguales conservan su orden original y las fechas no válidas quedan al
+        final en los dos sentidos.
+        """
+        if columna is None:
+            self._orden = None
+        else:
+            if columna not in self._ordenes:
+                clave, sin_valor = self._clave_orden(columna)
+                validas = np.flatnonzero(~sin_valor)
+                al_final = np.flatnonzero(sin_valor)
+                ascendente = validas[np.argsort(clave[validas], kind='stable')]
+                de_mayor_a_menor = _invertir_estable(ascendente, clave[ascendente])
+                self._ordenes[columna] = (np.concatenate([ascendente, al_final]),
+                                          np.concatenate([de_mayor_a_menor, al_final]))
+            self._orden = self._ordenes[columna][1 if descendente else 0]
+        self.columna_orden = columna
+        self.descendente = descendente
+        self._bloques.clear()
+
+    def _clave_orden(self, columna):
+        """
+        Valores por los que se ordena una columna y máscara de las filas sin
+        valor (fechas no válidas o importes vacíos), que van siempre al final.
+        """
+        spec = self.diseno["columnas"][columna]
+        if spec.get("importe"):
+            valores = self._importes()[spec["importe"]].to_numpy(dtype=float)
+            return valores, np.isnan(valores)
+        if spec.get("fecha"):
+            fechas = fechas_informe(self._df)
+            return fechas.to_numpy(dtype='int64', na_value=0), fechas.isna().to_numpy()
+        formato = spec.get("formato") or FORMATOS_CAMPO[spec["campo"]]
+        textos = np.array([texto.casefold() for texto in formato(self._df, self._importes())])
+        return textos, np.zeros(len(textos), dtype=bool)
+
+    def _importes(self):
+        if self._valores is None:
+            self._valores = calcular_importes(self._df)
+        return self._valores
+
+def _invertir_estable(ascendente, clave_ordenada):
+    """Orden de mayor a menor en el que las filas iguales siguen en su orden original."""
+    if len(clave_ordenada) == 0:
+        return ascendente
+    # Número de grupo de valores iguales de cada posición del orden ascendente
+    distinto = np.ones(len(clave_ordenada), dtype=bool)
+    distinto[1:] = clave_ordenada[1:] != clave_ordenada[:-1]
+    grupo = np.cumsum(distinto)
+    return ascendente[np.lexsort((ascendente, -grupo))]
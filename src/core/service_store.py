@@ -0,0 +1,148 @@
+# src/core/service_store.py
+"""
+Almacén local en SQLite de los servicios ya procesados.
+
+Guarda el resultado de extraer_servicios (una fila por servicio, con sus
+valores ya limpios y calculados) junto con el archivo y la hoja de donde salió,
+para poder consultar cualquier período sin volver a leer los libros de Excel y
+conservar el histórico de varios archivos.
+"""
+import os
+import sqlite3
+from contextlib import closing
+import pandas as pd
+from src.config import settings
+
+# Columna del DataFrame -> columna de la tabla
+_COLUMNAS = {
+    "FECHA": "fecha",
+    "HOJA": "hoja",
+    "FORMA_PAGO_CLEAN": "forma_pago",
+    "DIRECCION_PARA_INFORME": "direccion",
+    "SERVICIO_PARA_INFORME": "servicio",
+    "VALOR_ORIGINAL": "valor_original",
+    "VALOR_COMBINADO": "valor_combinado",
+    "MATERIALES": "materiales",
+    "VALOR MATERIALES": "valor_materiales",
+    "SUBTOTAL": "subtotal",
+    "IVA": "iva",
+    "TOTAL EMPRESA": "total_empresa",
+}
+_TEXTO = {"hoja", "forma_pago", "direccion", "servicio", "materiales"}
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS servicios (
+    id INTEGER PRIMARY KEY,
+    archivo TEXT NOT NULL,
+    hoja TEXT NOT NULL,
+    fecha TEXT NOT NULL,
+    forma_pago TEXT NOT NULL,
+    direccion TEXT NOT NULL DEFAULT '',
+    servicio TEXT NOT NULL DEFAULT '',
+    valor_original REAL NOT NULL DEFAULT 0,
+    valor_combinado REAL NOT NULL DEFAULT 0,
+    materiales TEXT NOT NULL DEFAULT '',
+    valor_materiales REAL NOT NULL DEFAULT 0,
+    subtotal REAL NOT NULL DEFAULT 0,
+    iva REAL NOT NULL DEFAULT 0,
+    total_empresa REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_servicios_fecha ON servicios (fecha);
+CREATE INDEX IF NOT EXISTS idx_servicios_hoja ON servicios (hoja, fecha);
+CREATE INDEX IF NOT EXISTS idx_servicios_forma_pago ON servicios (forma_pago, fecha);
+CREATE INDEX IF NOT EXISTS idx_servicios_archivo ON servicios (archivo, fecha);
+"""
+
+# Las fechas se guardan como texto ISO, que en SQLite se ordena igual que la fecha
+_FORMATO_FECHA = "%Y-%m-%d %H:%M:%S"
+
+def _conectar(ruta_db=None):
+    """Abre la base (creándola con su esquema si no existe)."""
+    ruta_db = ruta_db or settings.get_store_path()
+    conexion = sqlite3.connect(ruta_db)
+    conexion.executescript(_ESQUEMA)
+    return conexion
+
+def _texto_fecha(fecha):
+    return pd.Timestamp(fecha).strftime(_FORMATO_FECHA)
+
+def importar_servicios(df, archivo, fecha_inicio, fecha_fin, ruta_db=None):
+    """
+    Guarda en el almacén los servicios extraídos de un archivo para un período.
+    Los servicios que ya había de ese archivo en el período se reemplazan, así
+    que volver a importar el mismo archivo y período no duplica filas.
+
+    Args:
+        df (pd.DataFrame): Resultado de extraer_servicios con incluir_hoja=True
+                           (sin la columna HOJA la hoja se guarda vacía)
+        archivo (str): Ruta del archivo Excel de origen
+        fecha_inicio (datetime): Inicio del período procesado
+        fecha_fin (datetime): Fin del período procesado
+        ruta_db (str): Ruta de la base SQLite (opcional)
+
+    Returns:
+        int: Número de servicios guardados
+    """
+    archivo = os.path.abspath(archivo)
+    filas = []
+    if not df.empty:
+        datos = pd.DataFrame(index=df.index)
+        for columna, campo in _COLUMNAS.items():
+            if columna in df.columns:
+                datos[campo] = df[columna]
+            else:
+                datos[campo] = '' if campo in _TEXTO else 0.0
+        datos['fecha'] = pd.to_datetime(datos['fecha'], errors='coerce')
+        datos = datos[datos['fecha'].notnull()].copy()
+        datos['fecha'] = datos['fecha'].dt.strftime(_FORMATO_FECHA)
+        for campo in _TEXTO:
+            datos[campo] = datos[campo].fillna('').astype(str)
+        for campo in set(_COLUMNAS.values()) - _TEXTO - {'fecha'}:
+            datos[campo] = pd.to_numeric(datos[campo], errors='coerce').fillna(0).astype(float)
+        datos.insert(0, 'archivo', archivo)
+        filas = list(datos.itertuples(index=False, name=None))
+
+    campos = ['archivo'] + list(_COLUMNAS.values())
+    with closing(_conectar(ruta_db)) as conexion, conexion:
+        conexion.execute(
+            "DELETE FROM servicios WHERE archivo = ? AND fecha BETWEEN ? AND ?",
+            (archivo, _texto_fecha(fecha_inicio), _texto_fecha(fecha_fin))
+        )
+        conexion.executemany(
+            f"INSERT INTO servicios ({', '.join(campos)}) VALUES ({', '.join('?' * len(campos))})",
+            filas
+        )
+    return len(filas)
+
+def consultar_servicios(fecha_inicio, fecha_fin, hojas=None, forma_pago=None, archivo=None, ruta_db=None):
+    """
+    Consulta los servicios guardados en un período, opcionalmente solo de
+    ciertas hojas, forma de pago o archivo.
+
+    Returns:
+        pd.DataFrame: Mismas columnas que extraer_servicios usa para el informe
+                      (FECHA, HOJA, DIRECCION_PARA_INFORME, VALOR_COMBINADO,
+                      SUBTOTAL, IVA, TOTAL EMPRESA...), ordenado por fecha
+    """
+    condiciones = ["fecha BETWEEN ? AND ?"]
+    parametros = [_texto_fecha(fecha_inicio), _texto_fecha(fecha_fin)]
+    if hojas:
+        condiciones.append(f"hoja IN ({', '.join('?' * len(hojas))})")
+        parametros.extend(hojas)
+    if forma_pago:
+        condiciones.append("forma_pago = ?")
+        parametros.append(str(forma_pago).upper().strip())
+    if archivo:
+        condiciones.append("archivo = ?")
+        parametros.append(os.path.abspath(archivo))
+
+    consulta = (
+        f"SELECT {', '.join(_COLUMNAS.values())} FROM servicios "
+        f"WHERE {' AND '.join(condiciones)} ORDER BY fecha, id"
+    )
+    with closing(_conectar(ruta_db)) as conexion:
+        df = pd.read_sql_query(consulta, conexion, params=parametros)
+
+    df.columns = list(_COLUMNAS.keys())
+    df['FECHA'] = pd.to_datetime(df['FECHA'], format=_FORMATO_FECHA)
+    return df
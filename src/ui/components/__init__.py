@@ -6,8 +6,9 @@ from .file_selection_card import FileSelectionCard
 from .header_component import HeaderComponent
 from .menu_lateral_component import MenuLateralComponent
 from .notes_card import NotesCard
+from .preview_table import PreviewTable
 from .splash_screen import SplashScreenComponent
-from .terminal_componet import create_terminal, add_log_message 
+from .terminal_componet import create_terminal, VistaLog, exportar_log
 
 __all__ = [
     'ActionCard',
@@ -16,8 +17,10 @@ __all__ = [
     'HeaderComponent',
     'MenuLateralComponent',
     'NotesCard',
+    'PreviewTable',
     'SplashScreenComponent',
     'create_terminal', 
-    'add_log_message',
+    'VistaLog',
+    'exportar_log',
     'create_terminal' 
 ]
@@ -190,6 +190,23 @@ class ActionCard(ctk.CTkFrame):
         )
         self.abrir_pdf_btn.grid(row=1, column=1, padx=(4, 0), sticky="ew")
 
+        # Progreso de la tarea en curso (hoja, filas, páginas y tiempo restante)
+        self.progress_bar = ctk.CTkProgressBar(
+            actions_frame,
+            mode="determinate",
+            height=10,
+            corner_radius=5,
+            fg_color=(self.colors["borde"], self.colors["borde"]),
+            progress_color=(self.colors["accent"], self.colors["accent"])
+        )
+        self.progress_bar.set(0)
+        self.progress_label = ctk.CTkLabel(
+            actions_frame,
+            text="",
+            font=ctk.CTkFont(size=12),
+            text_color=self.colors["texto"]
+        )
+
     def enable_pdf_buttons(self):
         """Habilita los botones de Generar PDF y Abrir PDF con sus colores de animación."""
         if self.generar_pdf_btn:
@@ -228,16 +245,18 @@ class ActionCard(ctk.CTkFrame):
             )
 
     def set_procesar_button_state(self, processing):
-        """Configura el texto y estado del botón Procesar Datos con sus colores de animación."""
+        """
+        Configura el texto y estado del botón Procesar Datos con sus colores de animación.
+        Mientras se procesa, el botón sigue activo y sirve para cancelar.
+        """
         if processing:
             self.procesar_btn.set_colors(
-                new_base_color=(self.colors["disabled"], self.colors["disabled"]),
-                new_hover_color=(self.colors["disabled"], self.colors["disabled"]), # Hover también en sombra
-                new_text_color=(self.colors["texto_disabled"], self.colors["texto_disabled"]),
-                state="disabled"
+                new_base_color=self.colors["error"],
+                new_hover_color=self.colors["error_hover"],
+                new_text_color=self.colors["texto_header"],
+                state="normal"
             )
-            self.procesar_btn.configure(text=settings.APP_MESSAGES["BUTTON_PROCESSING_TEXT"])
-            button_animate_progress(self.procesar_btn)  # Inicia la animación de progreso
+            self.procesar_btn.configure(text=settings.APP_MESSAGES["BUTTON_CANCEL_PROCESS_TEXT"])
             self.disable_pdf_buttons() # Asegura que los botones de PDF se deshabiliten también
         else:
             self.procesar_btn.set_colors(
@@ -249,6 +268,37 @@ class ActionCard(ctk.CTkFrame):
             self.procesar_btn.configure(text=settings.APP_MESSAGES["BUTTON_PROCESS_TEXT"])
             button_stop_progress_animation(self.procesar_btn)
             
+    def show_progress(self, fraccion, texto):
+        """Muestra la barra de progreso con la fracción completada y su descripción."""
+        if not self.progress_bar.winfo_ismapped():
+            self.progress_bar.grid(row=2, column=0, columnspan=2, pady=(12, 0), sticky="ew")
+            self.progress_label.grid(row=3, column=0, columnspan=2, pady=(4, 0), sticky="w")
+        self.progress_bar.set(fraccion)
+        self.progress_label.configure(text=texto)
+
+    def hide_progress(self):
+        """Oculta la barra de progreso al terminar la tarea."""
+        self.progress_bar.set(0)
+        self.progress_label.configure(text="")
+        self.progress_bar.grid_remove()
+        self.progress_label.grid_remove()
+
+    def set_generar_pdf_button_state(self, generating):
+        """Mientras se genera el PDF, el botón Generar PDF sirve para cancelar la generación."""
+        if generating:
+            self.generar_pdf_btn.set_colors(
+                new_base_color=self.colors["error"],
+                new_hover_color=self.colors["error_hover"],
+                new_text_color=self.colors["texto_header"],
+                state="normal"
+            )
+            self.generar_pdf_btn.configure(text=settings.APP_MESSAGES["BUTTON_CANCEL_PDF_TEXT"])
+            button_animate_progress(self.generar_pdf_btn)
+        else:
+            button_stop_progress_animation(self.generar_pdf_btn)
+            self.generar_pdf_btn.configure(text=settings.APP_MESSAGES["BUTTON_GENERATE_PDF_TEXT"])
+            self.enable_generate_pdf_button()
+
     def enable_generate_pdf_button(self):
         if self.generar_pdf_btn:
             self.generar_pdf_btn.set_colors(
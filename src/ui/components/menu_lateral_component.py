@@ -11,11 +11,15 @@ class MenuLateralComponent(ctk.CTkToplevel):
     Args:
         parent (ctk.CTk): La ventana principal de la aplicación.
         cambiar_tema_callback (function): Función de callback para cambiar el tema de la aplicación.
+        limpiar_cache_callback (function, opcional): Callback para vaciar la caché de archivos Excel.
+        exportar_callback (function, opcional): Callback para exportar los servicios procesados.
     """
-    def __init__(self, parent, cambiar_tema_callback):
+    def __init__(self, parent, cambiar_tema_callback, limpiar_cache_callback=None, exportar_callback=None):
         super().__init__(parent)
         self.parent = parent
         self._cambiar_tema_callback = cambiar_tema_callback
+        self._limpiar_cache_callback = limpiar_cache_callback
+        self._exportar_callback = exportar_callback
         self.colors = get_colors() 
         self.title(settings.APP_MESSAGES["MENU_OPTIONS_TITLE"]) 
         self.transient(parent) 
@@ -74,6 +78,30 @@ class MenuLateralComponent(ctk.CTkToplevel):
         )
         self.theme_combo.pack(side="right")
         self._set_current_theme_selection()
+
+        if self._limpiar_cache_callback:
+            ctk.CTkButton(
+                menu_frame,
+                text=settings.APP_MESSAGES["MENU_CLEAR_CACHE_BUTTON"],
+                command=self._limpiar_cache_callback,
+                height=35,
+                corner_radius=10,
+                font=ctk.CTkFont(size=14),
+                fg_color=self.colors["accent"],
+                hover_color=self.colors["accent_hover"]
+            ).pack(pady=(0, 15))
+
+        if self._exportar_callback:
+            ctk.CTkButton(
+                menu_frame,
+                text=settings.APP_MESSAGES["MENU_EXPORT_BUTTON"],
+                command=self._exportar_callback,
+                height=35,
+                corner_radius=10,
+                font=ctk.CTkFont(size=14),
+                fg_color=self.colors["accent"],
+                hover_color=self.colors["accent_hover"]
+            ).pack(pady=(0, 15))
         
     def _set_current_theme_selection(self):
         """Establece la selección inicial en el ComboBox del tema."""
@@ -94,7 +122,8 @@ class MenuLateralComponent(ctk.CTkToplevel):
         if x_pos + 250 > screen_width:  
             x_pos = screen_width - 260  
         
-        self.geometry(f"250x200+{x_pos}+{y_pos}")
+        botones = sum(1 for callback in (self._limpiar_cache_callback, self._exportar_callback) if callback)
+        self.geometry(f"250x{200 + 60 * botones}+{x_pos}+{y_pos}")
 
         self.attributes("-alpha",0)
         self.deiconify()
@@ -0,0 +1,163 @@
+# src/ui/components/preview_table.py
+
+import customtkinter as ctk
+from tkinter import ttk
+from src.ui.styles.palet_colors import get_colors
+from src.config import settings
+from src.core.report_layout import crear_diseno
+from src.core.report_preview import ModeloVistaPrevia
+
+# Milímetros de la columna del PDF -> píxeles de la columna de la vista previa
+PIXELES_POR_MM = 4
+
+class PreviewTable(ctk.CTkFrame):
+    """
+    Tabla con la vista previa de los servicios procesados.
+
+    La tabla solo tiene PREVIEW_CONFIG["VISIBLE_ROWS"] filas de Tk: al
+    desplazarse (barra o rueda del ratón) se cambian sus textos por los de
+    ModeloVistaPrevia.filas, de modo que abrir o recorrer 100.000 servicios
+    cuesta lo mismo que 12. Al pulsar un encabezado se ordena por esa columna;
+    pulsarlo otra vez invierte el orden.
+
+    Args:
+        parent (ctk.CTkFrame): El widget padre donde se colocará la tabla.
+    """
+    def __init__(self, parent):
+        self.colors = get_colors()
+        super().__init__(
+            parent,
+            corner_radius=12,
+            fg_color=(self.colors["card"], self.colors["card"]),
+            border_width=1,
+            border_color=self.colors["accent"]
+        )
+        self._modelo = None
+        self._inicio = 0
+        self._visibles = settings.PREVIEW_CONFIG["VISIBLE_ROWS"]
+        self._create_widgets()
+
+    def _create_widgets(self):
+        """Crea el título, la tabla y su barra de desplazamiento."""
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self.title_label = ctk.CTkLabel(
+            self,
+            text=settings.APP_MESSAGES["PREVIEW_TITLE"],
+            font=ctk.CTkFont(size=16, weight="bold"),
+            text_color=(self.colors["accent"], self.colors["accent"])
+        )
+        self.title_label.grid(row=0, column=0, columnspan=2, sticky="w", padx=15, pady=(10, 5))
+
+        estilo = ttk.Style(self)
+        estilo.configure(
+            "Preview.Treeview",
+            background=self.colors["card"],
+            fieldbackground=self.colors["card"],
+            foreground=self.colors["texto"],
+            rowheight=24
+        )
+        estilo.configure("Preview.Treeview.Heading", font=("Helvetica", 10, "bold"))
+
+        self._diseno = crear_diseno()
+        columnas = [str(i) for i in range(len(self._diseno["titulos"]))]
+        self.tree = ttk.Treeview(
+            self,
+            columns=columnas,
+            show="headings",
+            height=self._visibles,
+            selectmode="browse",
+            style="Preview.Treeview"
+        )
+        for i, (titulo, ancho) in enumerate(zip(self._diseno["titulos"], self._diseno["anchos"])):
+            self.tree.heading(columnas[i], text=titulo.replace("\n", " "), command=lambda i=i: self._ordenar(i))
+            self.tree.column(columnas[i], width=ancho * PIXELES_POR_MM, minwidth=40, stretch=True,
+                             anchor="e" if self._diseno["columnas"][i].get("importe") else "w")
+        self._items = [self.tree.insert("", "end", values=()) for _ in range(self._visibles)]
+        self.tree.grid(row=1, column=0, sticky="nsew", padx=(10, 0), pady=(0, 10))
+
+        self.scrollbar = ctk.CTkScrollbar(
+            self,
+            command=self._al_desplazar,
+            button_color=(self.colors["accent"], self.colors["accent"]),
+            button_hover_color=(self.colors["accent_hover"], self.colors["accent_hover"])
+        )
+        self.scrollbar.grid(row=1, column=1, sticky="ns", padx=(0, 5), pady=(0, 10))
+
+        self.tree.bind("<MouseWheel>", self._al_girar_rueda)
+        self.tree.bind("<Button-4>", lambda event: self._desplazar_a(self._inicio - settings.PREVIEW_CONFIG["WHEEL_ROWS"]))
+        self.tree.bind("<Button-5>", lambda event: self._desplazar_a(self._inicio + settings.PREVIEW_CONFIG["WHEEL_ROWS"]))
+        self.limpiar()
+
+    def mostrar(self, df):
+        """Muestra los servicios de df (resultado de extraer_servicios) desde el principio."""
+        if df is None or df.empty:
+            self.limpiar()
+            return
+        self._modelo = ModeloVistaPrevia(df, self._diseno)
+        self.title_label.configure(
+            text=f"{settings.APP_MESSAGES['PREVIEW_TITLE']} · "
+                 f"{settings.APP_MESSAGES['PREVIEW_COUNT'].format(len(self._modelo))}"
+        )
+        self._actualizar_encabezados()
+        self._desplazar_a(0)
+
+    def limpiar(self):
+        """Vacía la tabla."""
+        self._modelo = None
+        self.title_label.configure(
+            text=f"{settings.APP_MESSAGES['PREVIEW_TITLE']} · {settings.APP_MESSAGES['PREVIEW_EMPTY']}"
+        )
+        self._actualizar_encabezados()
+        self._desplazar_a(0)
+
+    def _ordenar(self, columna):
+        """Ordena por la columna pulsada; si ya estaba ordenada por ella, invierte el orden."""
+        if self._modelo is None:
+            return
+        descendente = self._modelo.columna_orden == columna and not self._modelo.descendente
+        self._modelo.ordenar(columna, descendente)
+        self._actualizar_encabezados()
+        self._desplazar_a(0)
+
+    def _actualizar_encabezados(self):
+        """Marca con ▲ o ▼ la columna por la que está ordenada la tabla."""
+        columna_orden = self._modelo.columna_orden if self._modelo is not None else None
+        for i, titulo in enumerate(self._diseno["titulos"]):
+            texto = titulo.replace("\n", " ")
+            if i == columna_orden:
+                texto += " ▼" if self._modelo.descendente else " ▲"
+            self.tree.heading(str(i), text=texto)
+
+    def _desplazar_a(self, inicio):
+        """Muestra las filas desde la posición inicio (ajustada a los límites de la tabla)."""
+        total = len(self._modelo) if self._modelo is not None else 0
+        self._inicio = max(0, min(inicio, total - self._visibles))
+        filas = self._modelo.filas(self._inicio, self._visibles) if self._modelo is not None else []
+        for i, item in enumerate(self._items):
+            if i < len(filas):
+                self.tree.item(item, values=filas[i])
+                self.tree.reattach(item, "", i)
+            else:
+                self.tree.detach(item)
+        if total > self._visibles:
+            self.scrollbar.set(self._inicio / total, (self._inicio + self._visibles) / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def _al_desplazar(self, accion, cantidad, unidad=None):
+        """Recibe los movimientos de la barra ('moveto' fracción o 'scroll' n units/pages)."""
+        if self._modelo is None:
+            return
+        if accion == "moveto":
+            self._desplazar_a(round(float(cantidad) * len(self._modelo)))
+        elif accion == "scroll":
+            paso = self._visibles if unidad == "pages" else 1
+            self._desplazar_a(self._inicio + int(cantidad) * paso)
+
+    def _al_girar_rueda(self, event):
+        """Rueda del ratón en Windows y macOS (en Linux llegan Button-4 y Button-5)."""
+        pasos = -1 if event.delta > 0 else 1
+        self._desplazar_a(self._inicio + pasos * settings.PREVIEW_CONFIG["WHEEL_ROWS"])
+        return "break"
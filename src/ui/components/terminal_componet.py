@@ -1,14 +1,15 @@
 # src/ui/components/terminal_componet.py
 import customtkinter as ctk
 from src.ui.styles.palet_colors import get_colors
-from datetime import datetime
+from tkinter import filedialog
 from src.utils import resource_path
+from src.utils.log_model import ModeloLog, formatear_linea, mensaje_log
 from PIL import Image
 from src.config import settings
 from src.ui.components.modern_button import ModernButton
 
-def create_terminal(parent, clear_callback):
-    """Crea y devuelve el componente de terminal con todas sus partes."""
+def create_terminal(parent, clear_callback, modelo=None):
+    """Crea y devuelve el componente de terminal y la VistaLog que muestra los mensajes de modelo."""
     colors = get_colors()
 
     terminal_frame = ctk.CTkFrame(
@@ -118,6 +119,39 @@ def create_terminal(parent, clear_callback):
     )
     clear_btn.button.configure(border_width=1, border_color=colors["accent"])
     clear_btn.pack(side="right", padx=10, pady=7.5)
+
+    export_btn = ModernButton(
+        control_frame,
+        text=settings.APP_MESSAGES["BUTTON_EXPORT_LOG_TEXT"],
+        command=lambda: exportar_log(vista),
+        height=35,
+        font=ctk.CTkFont(size=12, weight="bold"),
+        corner_radius=8,
+        base_color="#f8f9fa",
+        hover_color=colors["accent_hover"],
+        text_color=colors["accent"],
+    )
+    export_btn.button.configure(border_width=1, border_color=colors["accent"])
+    export_btn.pack(side="right", padx=(10, 0), pady=7.5)
+
+    filtros = {
+        settings.APP_MESSAGES["LOG_FILTER_ALL"]: None,
+        settings.APP_MESSAGES["LOG_FILTER_WARNINGS"]: ("warning", "error"),
+        settings.APP_MESSAGES["LOG_FILTER_ERRORS"]: ("error",),
+    }
+    filter_menu = ctk.CTkOptionMenu(
+        control_frame,
+        values=list(filtros),
+        command=lambda valor: vista.filtrar(filtros[valor]),
+        width=140,
+        height=30,
+        corner_radius=8,
+        font=ctk.CTkFont(size=12),
+        fg_color=colors["accent"],
+        button_color=colors["accent"],
+        button_hover_color=colors["accent_hover"]
+    )
+    filter_menu.pack(side="right", padx=(10, 0), pady=7.5)
     
     status_frame = ctk.CTkFrame(control_frame, fg_color="transparent")
     status_frame.pack(side="left", padx=15, pady=7.5)
@@ -147,26 +181,120 @@ def create_terminal(parent, clear_callback):
         settings.APP_MESSAGES["WELCOME_MESSAGE_6"],
     ]
     
-    for msg in welcome_messages:
-        add_log_message(log_textbox, msg, "success")
+    vista = VistaLog(log_textbox, modelo or ModeloLog())
+    vista.agregar([mensaje_log(msg, "success") for msg in welcome_messages])
     
-    return terminal_frame, log_textbox
+    return terminal_frame, vista
 
-def add_log_message(log_textbox, message, level="info"):
-    """Agrega un mensaje al log de la terminal."""
-    timestamp = datetime.now().strftime("%H:%M:%S")
-    
-    icons = {
-        "info": settings.APP_MESSAGES["LOG_ICON_INFO"],
-        "success": settings.APP_MESSAGES["LOG_ICON_SUCCESS"],
-        "error": settings.APP_MESSAGES["LOG_ICON_ERROR"],
-        "warning": settings.APP_MESSAGES["LOG_ICON_WARNING"]
-    }
-    
-    formatted_message = f"[{timestamp}] {icons.get(level, '')} {message}\n"
-    
-    log_textbox.insert("end", formatted_message, level)
-    log_textbox.see("end")
-    
-    
+class VistaLog:
+    """
+    Muestra en un CTkTextbox los mensajes de un ModeloLog sin cargarlos todos.
+
+    El texto solo contiene una ventana de LOG_CONFIG["VIEW_LINES"] mensajes
+    visibles. Mientras se sigue el final del log, cada lote nuevo se añade al
+    final y se eliminan las líneas que sobran al principio. Si se desplaza hasta
+    el borde superior o inferior de la ventana, esta se mueve
+    LOG_CONFIG["VIEW_MARGIN"] mensajes en esa dirección.
+    """
+    def __init__(self, textbox, modelo):
+        self.textbox = textbox
+        self.modelo = modelo
+        self._inicio = 0
+        self._mostradas = 0
+        for secuencia in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            textbox.bind(secuencia, self._al_desplazar, add="+")
+
+    def _siguiendo_final(self):
+        return self._inicio + self._mostradas >= self.modelo.cantidad_visibles()
+
+    def agregar(self, mensajes):
+        """Añade un lote de mensajes (hora, mensaje, nivel) al modelo y, si se está viendo el final, a la terminal."""
+        if not mensajes:
+            return
+        siguiendo = self._siguiendo_final()
+        total_antes = self.modelo.cantidad_visibles()
+        nuevos = self.modelo.agregar(mensajes)
+        # Los mensajes que el búfer circular descartó desplazan la ventana; si eran
+        # de la ventana misma, se vuelve a dibujar con el final del log
+        descartadas = total_antes + len(nuevos) - self.modelo.cantidad_visibles()
+        if descartadas > self._inicio:
+            self.mostrar()
+            self.textbox.see("end")
+            return
+        self._inicio = max(0, self._inicio - descartadas)
+        if not siguiendo:
+            return
+        self._insertar(nuevos)
+        sobrantes = self._mostradas - settings.LOG_CONFIG["VIEW_LINES"]
+        if sobrantes > 0:
+            self.textbox.delete("1.0", f"{sobrantes + 1}.0")
+            self._inicio += sobrantes
+            self._mostradas -= sobrantes
+        self.textbox.see("end")
 
+    def _insertar(self, mensajes):
+        """Inserta al final los mensajes seguidos del mismo nivel en una sola llamada."""
+        if not mensajes:
+            return
+        lineas, nivel_actual = [], mensajes[0][2]
+        for hora, mensaje, nivel in mensajes:
+            if nivel != nivel_actual:
+                self.textbox.insert("end", "".join(lineas), nivel_actual)
+                lineas, nivel_actual = [], nivel
+            lineas.append(formatear_linea(hora, mensaje, nivel) + "\n")
+        self.textbox.insert("end", "".join(lineas), nivel_actual)
+        self._mostradas += len(mensajes)
+
+    def mostrar(self, inicio=None):
+        """Vuelve a dibujar la ventana desde la posición inicio (por defecto, el final del log)."""
+        total = self.modelo.cantidad_visibles()
+        cantidad = settings.LOG_CONFIG["VIEW_LINES"]
+        if inicio is None:
+            inicio = total - cantidad
+        self._inicio = max(0, min(inicio, total - cantidad))
+        self._mostradas = 0
+        self.textbox.delete("1.0", "end")
+        self._insertar(self.modelo.ventana(self._inicio, cantidad))
+
+    def filtrar(self, niveles):
+        """Muestra solo los mensajes de los niveles indicados (todos si es None)."""
+        self.modelo.filtrar(niveles)
+        self.mostrar()
+        self.textbox.see("end")
+
+    def limpiar(self):
+        """Elimina todos los mensajes del modelo y de la terminal."""
+        self.modelo.limpiar()
+        self.mostrar()
+
+    def _al_desplazar(self, event=None):
+        # La rueda mueve el texto después de este evento: se revisa la posición cuando termina
+        self.textbox.after_idle(self._revisar_bordes)
+
+    def _revisar_bordes(self):
+        arriba, abajo = self.textbox.yview()
+        margen = settings.LOG_CONFIG["VIEW_MARGIN"]
+        if arriba <= 0.0 and self._inicio > 0:
+            anterior = self._inicio
+            self.mostrar(self._inicio - margen)
+            self.textbox.see(f"{anterior - self._inicio + 1}.0")
+        elif abajo >= 1.0 and not self._siguiendo_final():
+            anterior = self._inicio
+            self.mostrar(self._inicio + margen)
+            self.textbox.see(f"{max(1, self._mostradas - (self._inicio - anterior))}.0")
+
+def exportar_log(vista):
+    """Pide una ruta y guarda en ella el log completo."""
+    ruta = filedialog.asksaveasfilename(
+        title=settings.APP_MESSAGES["LOG_EXPORT_TITLE"],
+        filetypes=settings.APP_MESSAGES["LOG_EXPORT_FILE_TYPES"],
+        defaultextension=".txt",
+        initialfile=settings.APP_MESSAGES["LOG_EXPORT_DEFAULT_NAME"]
+    )
+    if not ruta:
+        return
+    exito, mensaje = vista.modelo.exportar(ruta)
+    if exito:
+        vista.agregar([mensaje_log(settings.APP_MESSAGES["LOG_EXPORTED"].format(ruta), "success")])
+    else:
+        vista.agregar([mensaje_log(mensaje, "error")])
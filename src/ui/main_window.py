@@ -1,15 +1,21 @@
 import customtkinter as ctk
 import tkinter as tk
 import os
-import threading
 from tkinter import messagebox, filedialog
 from datetime import datetime
 from src.utils import resource_path
+from src.utils.log_queue import ColaLog
+from src.utils.log_model import ModeloLog
 from src.core.excel_processor import extraer_servicios
+from src.core.excel_cache import limpiar_cache
+from src.core.pdf_cache import limpiar_cache_informes
+from src.core.service_store import importar_servicios
+from src.core.exporters import exportar_servicios, formatos_disponibles
 from src.core.pdf_generator import generar_pdf_modular, _abrir_pdf
-from src.ui.components.terminal_componet import create_terminal, add_log_message
+from src.ui.components.terminal_componet import create_terminal, VistaLog
 from src.ui.styles.palet_colors import get_colors
-from src.utils.animations import button_stop_progress_animation
+from src.utils.job_runner import EjecutorTareas
+from src.utils.progress import Progreso, describir_progreso
 from src.ui.components.header_component import HeaderComponent
 from src.ui.components.splash_screen import SplashScreenComponent
 from src.ui.components.file_selection_card import FileSelectionCard
@@ -17,6 +23,7 @@ from src.ui.components.date_range_card import DateRangeCard
 from src.ui.components.notes_card import NotesCard
 from src.ui.components.action_card import ActionCard
 from src.ui.components.menu_lateral_component import MenuLateralComponent
+from src.ui.components.preview_table import PreviewTable
 from src.config import settings
 
 class ModernInformesApp:
@@ -48,6 +55,12 @@ class ModernInformesApp:
                         border_color=(colors["borde"], colors["borde"])
                     )
                 
+                elif hasattr(self, 'preview_table') and widget == self.preview_table:
+                    widget.configure(
+                        fg_color=(colors["card"], colors["card"]),
+                        border_color=(colors["accent"], colors["accent"])
+                    )
+
                 elif "file_card" in str(widget) or \
                      "date_card" in str(widget) or \
                      "notes_card" in str(widget) or \
@@ -149,9 +162,12 @@ class ModernInformesApp:
         self.root = ctk.CTk()
         self.root.withdraw()
         self.log_textbox = None
+        self.log_view = None
+        self._cola_log = ColaLog()
+        self._modelo_log = ModeloLog()
         self.colors = self._get_colors() 
 
-        self.side_menu = MenuLateralComponent(self.root, self._cambiar_tema) 
+        self.side_menu = MenuLateralComponent(self.root, self._cambiar_tema, self._limpiar_cache, self._exportar_datos)
 
         self.root.title(settings.APP_MESSAGES["APP_TITLE"])
         screen_width = self.root.winfo_screenwidth()
@@ -168,6 +184,12 @@ class ModernInformesApp:
         self.nombre_pdf = tk.StringVar(value=settings.PDF_CONFIG["DEFAULT_NAME"])
         self.procesando = False
         self.df_resultado = None
+        # Tareas en segundo plano: el token de cancelación de cada una mientras está en curso
+        self._ejecutor = EjecutorTareas(self.root)
+        self._tarea_proceso = None
+        self._tarea_pdf = None
+        # Último avance de la tarea en curso, que _revisar_progreso muestra en la barra
+        self._progreso = Progreso()
         self._closing = False
         
         hoy = datetime.today()
@@ -189,6 +211,7 @@ class ModernInformesApp:
             self.root.grid_rowconfigure(0, weight=1)
             self.root.grid_columnconfigure(0, weight=1)
             self._update_theme()
+            self._vaciar_log()
             self.root.update_idletasks()
             self.root.update()
             self._log_message(settings.APP_MESSAGES["APP_STARTED_SUCCESSFULLY"], "success")
@@ -229,6 +252,7 @@ class ModernInformesApp:
         self.content_frame.grid(row=1, column=0, sticky="nsew", padx=25, pady=(0, 25))
         
         self.content_frame.grid_rowconfigure(0, weight=1)
+        self.content_frame.grid_rowconfigure(1, weight=1)
         self.content_frame.grid_columnconfigure(0, weight=0, minsize=700)
         self.content_frame.grid_columnconfigure(1, weight=1, minsize=350)        
         self._create_enhanced_left_panel()
@@ -244,7 +268,7 @@ class ModernInformesApp:
             border_width=1,
             border_color=(self.colors["borde"], self.colors["borde"]),
         )
-        self.left_panel.grid(row=0, column=0, sticky="nsew", padx=(0, 15))
+        self.left_panel.grid(row=0, column=0, rowspan=2, sticky="nsew", padx=(0, 15))
         
         self.file_card = FileSelectionCard(
             self.left_panel,
@@ -288,18 +312,24 @@ class ModernInformesApp:
             print(f"Error al cambiar tema: {e}")
 
     def _create_enhanced_right_panel(self):
-        """Panel derecho con terminal modular"""
+        """Panel derecho con terminal modular y la vista previa de los servicios"""
         try:
-            self.terminal_frame, self.log_textbox = create_terminal(
+            self.terminal_frame, self.log_view = create_terminal(
                 self.content_frame,
-                self._clear_log
+                self._clear_log,
+                self._modelo_log
             )
+            self.log_textbox = self.log_view.textbox
             self.terminal_frame.grid(row=0, column=1, sticky="nsew", padx=(15, 0))
             
         except Exception as e:
             print(settings.APP_MESSAGES["TERMINAL_CREATE_ERROR"].format(e))
             self.log_textbox = ctk.CTkTextbox(self.content_frame)
             self.log_textbox.grid(row=0, column=1, sticky="nsew", padx=(15, 0))
+            self.log_view = VistaLog(self.log_textbox, self._modelo_log)
+
+        self.preview_table = PreviewTable(self.content_frame)
+        self.preview_table.grid(row=1, column=1, sticky="nsew", padx=(15, 0), pady=(15, 0))
 
     def _add_animation_effects(self):
         """Agregar efectos de animación sutiles (Método de ejemplo, no directamente usado en este punto)"""
@@ -329,62 +359,168 @@ class ModernInformesApp:
             self._log_message(f"{settings.APP_MESSAGES['FILE_LOADED']}{os.path.basename(file_path)}", "info")
     
     def _procesar_datos_async(self):
-        """Procesar datos de forma asíncrona para no bloquear la UI"""
-        if self.procesando:
+        """Procesar datos en segundo plano para no bloquear la UI; si ya hay un procesamiento en curso, lo cancela"""
+        if self._tarea_proceso is not None:
+            self._tarea_proceso.cancelar()
+            self._log_message(settings.APP_MESSAGES["PROCESS_CANCELLING"], "warning")
             return
-        
+
+        if self._tarea_pdf is not None:
+            self._show_modern_error(settings.APP_MESSAGES["TASK_RUNNING"])
+            return
+
         if not self.excel_path.get():
             self._show_modern_error("Por favor selecciona un archivo Excel")
             return
-        
-        self.procesando = True
-        self._update_processing_state(True)
-        
-        thread = threading.Thread(target=self._procesar_datos)
-        thread.daemon = True
-        thread.start()
-    
-    def _procesar_datos(self):
+
         try:
-            self._log_message(settings.APP_MESSAGES["PROCESS_START"], "info")
             fecha_inicio = datetime.strptime(self.fecha_inicio.get(), settings.APP_MESSAGES["DEFAULT_DATE_FORMAT"])
             fecha_fin = datetime.strptime(self.fecha_fin.get(), settings.APP_MESSAGES["DEFAULT_DATE_FORMAT"])
-            self.df_resultado = extraer_servicios(
-                self.excel_path.get(),
-                fecha_inicio,
-                fecha_fin,
-                self._log_message
-            )
-            if self.df_resultado.empty:
-                self._log_message(settings.APP_MESSAGES["NO_RECORDS_FOUND"], "warning")
-            else:
-                self._log_message(settings.APP_MESSAGES["RECORDS_FOUND"].format(len(self.df_resultado)), "success")
-                self.root.after(0, lambda: self.action_card.enable_generate_pdf_button())
-        except Exception as e:
+        except ValueError as e:
             self._log_message(f"{settings.APP_MESSAGES['PROCESS_ERROR']} {e}", "error")
-            self.root.after(0, lambda: self._show_modern_error(f"{settings.APP_MESSAGES['ERROR_TITLE']}: {e}"))
-        finally:
-            self.procesando = False
-            button_stop_progress_animation(self.action_card.procesar_btn)
-            self.root.after(0, lambda: self._update_processing_state(False))
-            self._log_message(settings.APP_MESSAGES["PROCESS_COMPLETE"], "success")
+            self._show_modern_error(f"{settings.APP_MESSAGES['ERROR_TITLE']}: {e}")
+            return
+
+        self.procesando = True
+        self._update_processing_state(True)
+        self._log_message(settings.APP_MESSAGES["PROCESS_START"], "info")
+        self._iniciar_progreso()
+        self._tarea_proceso = self._ejecutor.lanzar(
+            self._procesar_datos,
+            self.excel_path.get(),
+            fecha_inicio,
+            fecha_fin,
+            al_terminar=self._al_terminar_proceso,
+            al_cancelar=self._al_cancelar_proceso,
+            al_fallar=self._al_fallar_proceso
+        )
     
+    def _procesar_datos(self, excel_path, fecha_inicio, fecha_fin, cancelacion=None):
+        """Extraer los servicios y guardarlos en el almacén (se ejecuta en segundo plano, sin tocar la UI)"""
+        df_resultado = extraer_servicios(
+            excel_path,
+            fecha_inicio,
+            fecha_fin,
+            self._log_message,
+            usar_cache=True,
+            paralelo=settings.EXCEL_READ_CONFIG["PARALLEL_SHEETS"],
+            max_workers=settings.EXCEL_READ_CONFIG["MAX_WORKERS"],
+            podar_columnas=settings.EXCEL_READ_CONFIG["ONLY_REPORT_COLUMNS"],
+            streaming=settings.EXCEL_READ_CONFIG["STREAMING"],
+            filas_por_bloque=settings.EXCEL_READ_CONFIG["STREAMING_CHUNK_ROWS"],
+            cancelacion=cancelacion,
+            progreso=self._progreso,
+            incluir_hoja=settings.STORE_CONFIG["IMPORT_AFTER_PROCESS"]
+        )
+        if settings.STORE_CONFIG["IMPORT_AFTER_PROCESS"]:
+            self._guardar_en_almacen(df_resultado, excel_path, fecha_inicio, fecha_fin)
+        return df_resultado
+
+    def _al_terminar_proceso(self, df_resultado):
+        self.df_resultado = df_resultado
+        self.preview_table.mostrar(self.df_resultado)
+        if self.df_resultado.empty:
+            self._log_message(settings.APP_MESSAGES["NO_RECORDS_FOUND"], "warning")
+        else:
+            self._log_message(settings.APP_MESSAGES["RECORDS_FOUND"].format(len(self.df_resultado)), "success")
+        self._fin_proceso()
+        self._log_message(settings.APP_MESSAGES["PROCESS_COMPLETE"], "success")
+
+    def _al_cancelar_proceso(self):
+        self._log_message(settings.APP_MESSAGES["PROCESS_CANCELLED"], "warning")
+        self._fin_proceso()
+
+    def _al_fallar_proceso(self, error):
+        self._log_message(f"{settings.APP_MESSAGES['PROCESS_ERROR']} {error}", "error")
+        self._fin_proceso()
+        self._show_modern_error(f"{settings.APP_MESSAGES['ERROR_TITLE']}: {error}")
+
+    def _fin_proceso(self):
+        """Dejar la UI lista para otro procesamiento; el PDF se puede generar si hay servicios procesados"""
+        self._tarea_proceso = None
+        self.action_card.hide_progress()
+        self.procesando = False
+        self._update_processing_state(False)
+        if self.df_resultado is not None and not self.df_resultado.empty:
+            self.action_card.enable_generate_pdf_button()
+    
+    def _guardar_en_almacen(self, df_resultado, excel_path, fecha_inicio, fecha_fin):
+        """Guardar los servicios procesados en el almacén local (SQLite)"""
+        try:
+            guardados = importar_servicios(df_resultado, excel_path, fecha_inicio, fecha_fin)
+            self._log_message(settings.APP_MESSAGES["STORE_IMPORTED"].format(guardados), "info")
+        except Exception as e:
+            self._log_message(settings.APP_MESSAGES["STORE_IMPORT_ERROR"].format(e), "warning")
+
     def _generar_pdf(self):
-        exito, mensaje = generar_pdf_modular(
+        """Generar el PDF en segundo plano; si ya se está generando, lo cancela"""
+        if self._tarea_pdf is not None:
+            self._tarea_pdf.cancelar()
+            self._log_message(settings.APP_MESSAGES["PDF_CANCELLING"], "warning")
+            return
+
+        if self._tarea_proceso is not None:
+            self._show_modern_error(settings.APP_MESSAGES["TASK_RUNNING"])
+            return
+
+        nombre_pdf = self.nombre_pdf.get()
+        self.action_card.set_generar_pdf_button_state(True)
+        self._iniciar_progreso()
+        self._tarea_pdf = self._ejecutor.lanzar(
+            generar_pdf_modular,
             self.df_resultado,
-            self.nombre_pdf.get(),
+            nombre_pdf,
             self.notas.get(),
             self.fecha_inicio.get(),
             self.fecha_fin.get(),
-            self._log_message
+            self._log_message,
+            progreso=self._progreso,
+            al_terminar=lambda resultado: self._al_terminar_pdf(resultado, nombre_pdf),
+            al_cancelar=self._al_cancelar_pdf,
+            al_fallar=lambda error: self._al_terminar_pdf((False, str(error)), nombre_pdf)
         )
-        self.ruta_pdf = settings.get_pdf_output_path(self.nombre_pdf.get())
+
+    def _al_terminar_pdf(self, resultado, nombre_pdf):
+        exito, mensaje = resultado
+        self._tarea_pdf = None
+        self.action_card.hide_progress()
+        self.action_card.set_generar_pdf_button_state(False)
+        self.ruta_pdf = settings.get_pdf_output_path(nombre_pdf)
 
         if exito:
             self.action_card.enable_open_pdf_button()
         else:
             self._show_modern_error(mensaje)
 
+    def _al_cancelar_pdf(self):
+        self._tarea_pdf = None
+        self.action_card.hide_progress()
+        self.action_card.set_generar_pdf_button_state(False)
+        self._log_message(settings.APP_MESSAGES["PDF_CANCELLED"], "warning")
+
+    def _exportar_datos(self):
+        """Exportar los servicios procesados a Excel, CSV o Parquet según la extensión elegida"""
+        if self.df_resultado is None or self.df_resultado.empty:
+            self._show_modern_error(settings.APP_MESSAGES["EXPORT_NO_DATA"])
+            return
+        formatos = formatos_disponibles()
+        if 'parquet' not in formatos:
+            self._log_message(settings.APP_MESSAGES["EXPORT_PARQUET_UNAVAILABLE"], "info")
+        ruta = filedialog.asksaveasfilename(
+            title=settings.APP_MESSAGES["EXPORT_TITLE"],
+            filetypes=[(nombre, patron) for nombre, patron in settings.APP_MESSAGES["EXPORT_FILE_TYPES"]
+                       if patron.lstrip('*.') in formatos],
+            defaultextension=".xlsx",
+            initialfile=os.path.splitext(self.nombre_pdf.get())[0]
+        )
+        if not ruta:
+            return
+        exito, mensaje = exportar_servicios(self.df_resultado, ruta)
+        if exito:
+            self._log_message(settings.APP_MESSAGES["EXPORT_DONE"].format(mensaje), "success")
+        else:
+            self._show_modern_error(mensaje)
+
     def _abrir_pdf(self):
         if hasattr(self, "ruta_pdf") and self.ruta_pdf and os.path.exists(self.ruta_pdf):
             _abrir_pdf(self.ruta_pdf, self._log_message)
@@ -394,26 +530,55 @@ class ModernInformesApp:
     # === MÉTODOS DE UI ===
     
     def _log_message(self, message, level="info"):
-        """Agregar mensaje al log usando el componente modular (solo consola visual, nunca terminal Python)"""
+        """Agregar mensaje al log. Se puede llamar desde cualquier hilo: el mensaje
+        queda en la cola y _vaciar_log lo escribe en la terminal desde el hilo de Tk"""
+        self._cola_log(message, level)
+
+    def _vaciar_log(self):
+        """Escribir en la terminal, en un solo lote, los mensajes pendientes de la cola"""
+        if self._closing:
+            return
         try:
-            if hasattr(self, 'log_textbox') and self.log_textbox is not None:
-                add_log_message(self.log_textbox, message, level)
+            mensajes = self._cola_log.vaciar(settings.LOG_CONFIG["MAX_BATCH"])
+            if mensajes and self.log_view is not None:
+                self.log_view.agregar(mensajes)
         except Exception as e:
             print(f"Error en log: {str(e)}")
+        # Si quedan mensajes de una ráfaga, se sigue enseguida en vez de esperar el intervalo
+        espera = 1 if self._cola_log.pendientes() else settings.LOG_CONFIG["FLUSH_INTERVAL_MS"]
+        self.root.after(espera, self._vaciar_log)
     
+    def _limpiar_cache(self):
+        """Vaciar la caché en disco de archivos Excel ya leídos y de informes PDF ya generados"""
+        try:
+            eliminadas = limpiar_cache() + limpiar_cache_informes()
+            self._log_message(settings.APP_MESSAGES["CACHE_CLEARED"].format(eliminadas), "success")
+        except Exception as e:
+            self._log_message(settings.APP_MESSAGES["CACHE_CLEAR_ERROR"].format(e), "error")
+
     def _clear_log(self):
         """Limpiar el log"""
-        self.log_textbox.delete("1.0", "end")
+        self.log_view.limpiar()
         self._log_message(settings.APP_MESSAGES["LOG_CLEARED"], "info")
     
-    def _update_progress(self, value):
-        """Actualizar barra de progreso (este método no está siendo usado activamente)"""
-        if hasattr(self, 'progress_bar') and self.progress_bar:
-            def update():
-                self.progress_bar.set(value)
-            self.root.after(0, update)
-        else:
-            pass
+    def _iniciar_progreso(self):
+        """Empezar a mostrar el progreso de la tarea que se va a lanzar"""
+        self._progreso.reiniciar()
+        self.action_card.show_progress(0, "")
+        self.root.after(settings.JOB_CONFIG["POLL_INTERVAL_MS"], self._revisar_progreso)
+
+    def _revisar_progreso(self):
+        """Mostrar el último aviso de progreso mientras haya tareas en curso"""
+        if self._closing or not self._ejecutor.ocupado:
+            return
+        evento = self._progreso.tomar()
+        if evento is not None:
+            self._update_progress(evento)
+        self.root.after(settings.JOB_CONFIG["POLL_INTERVAL_MS"], self._revisar_progreso)
+
+    def _update_progress(self, evento):
+        """Actualizar la barra de progreso con un evento de src/utils/progress.py"""
+        self.action_card.show_progress(evento["fraccion"], describir_progreso(evento))
     
     def _update_processing_state(self, processing):
         """Actualizar estado de procesamiento y delegar al action_card."""
@@ -428,6 +593,7 @@ class ModernInformesApp:
         """Manejar cierre de aplicación"""
         if messagebox.askyesno(settings.APP_MESSAGES["EXIT_CONFIRM_TITLE"], settings.APP_MESSAGES["EXIT_CONFIRM_MESSAGE"]):
             self._closing = True
+            self._ejecutor.cerrar()
             self.root.destroy()
 
     def run(self):
@@ -1,9 +1,10 @@
 from .file_utils import resource_path
 from .date_utils import fecha_larga
-from .validation_utils import limpiar_valor_monetario
+from .validation_utils import limpiar_valor_monetario, limpiar_valores_monetarios
 
 __all__ = [
     'resource_path',
     'fecha_larga',
-    'limpiar_valor_monetario'
+    'limpiar_valor_monetario',
+    'limpiar_valores_monetarios'
 ]
@@ -0,0 +1,66 @@
+import hashlib
+import os
+
+def hash_archivo(ruta, tam_bloque=1024 * 1024):
+    """
+    Calcula el hash SHA-256 del contenido de un archivo leyéndolo por bloques.
+
+    Args:
+        ruta (str): Ruta del archivo
+        tam_bloque (int): Tamaño de cada bloque leído en bytes
+
+    Returns:
+        str: Hash hexadecimal del contenido
+    """
+    h = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(tam_bloque), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+def marcar_uso(ruta):
+    """
+    Actualiza la fecha de modificación de una entrada de caché para que cuente
+    como usada recientemente al aplicar la expulsión LRU.
+    """
+    try:
+        os.utime(ruta, None)
+    except OSError:
+        pass
+
+def expulsar_lru(directorio, max_bytes, extension):
+    """
+    Elimina las entradas menos usadas recientemente de un directorio de caché
+    hasta que el tamaño total de los archivos con la extensión dada no supere max_bytes.
+
+    Args:
+        directorio (str): Carpeta de la caché
+        max_bytes (int): Tamaño máximo permitido en bytes
+        extension (str): Extensión de las entradas de la caché (por ejemplo '.pkl')
+
+    Returns:
+        list: Rutas de las entradas eliminadas
+    """
+    entradas = []
+    for nombre in os.listdir(directorio):
+        if not nombre.endswith(extension):
+            continue
+        ruta = os.path.join(directorio, nombre)
+        try:
+            st = os.stat(ruta)
+        except OSError:
+            continue
+        entradas.append((st.st_mtime, st.st_size, ruta))
+
+    total = sum(tamano for _, tamano, _ in entradas)
+    eliminadas = []
+    for _, tamano, ruta in sorted(entradas):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(ruta)
+        except OSError:
+            continue
+        total -= tamano
+        eliminadas.append(ruta)
+    return eliminadas
@@ -0,0 +1,105 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.config import settings
+
+class TareaCancelada(Exception):
+    """Se lanza en un punto de control de una tarea cuando se pidió cancelarla."""
+
+class TokenCancelacion:
+    """
+    Indica a una tarea en segundo plano que debe detenerse. La tarea llama a
+    comprobar() en sus puntos de control (entre hojas, entre páginas), que
+    lanza TareaCancelada si se pidió cancelar.
+    """
+    def __init__(self):
+        self._evento = threading.Event()
+
+    def cancelar(self):
+        self._evento.set()
+
+    @property
+    def cancelado(self):
+        return self._evento.is_set()
+
+    def comprobar(self):
+        """Lanza TareaCancelada si se pidió cancelar la tarea."""
+        if self._evento.is_set():
+            raise TareaCancelada()
+
+def comprobar_cancelacion(cancelacion):
+    """Punto de control para las funciones que aceptan cancelacion=None."""
+    if cancelacion is not None:
+        cancelacion.comprobar()
+
+class EjecutorTareas:
+    """
+    Ejecuta tareas largas (procesar el Excel, generar el PDF) en un pool de
+    hilos sin bloquear la interfaz.
+
+    Cada tarea recibe un TokenCancelacion en el argumento cancelacion. El
+    resultado se entrega en el hilo de Tk: un temporizador (root.after) revisa
+    las tareas en curso y, al terminar cada una, llama a al_terminar(resultado),
+    a al_cancelar() si se detuvo con TareaCancelada o a al_fallar(error) si
+    lanzó otra excepción.
+    """
+    def __init__(self, root, max_workers=None):
+        self._root = root
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers or settings.JOB_CONFIG["MAX_WORKERS"],
+            thread_name_prefix="tarea"
+        )
+        self._en_curso = []
+        self._revision = None
+
+    def lanzar(self, funcion, *args, al_terminar=None, al_cancelar=None, al_fallar=None, **kwargs):
+        """
+        Lanza funcion(*args, cancelacion=token, **kwargs) en segundo plano.
+
+        Returns:
+            TokenCancelacion: Para cancelar la tarea
+        """
+        token = TokenCancelacion()
+        futuro = self._pool.submit(funcion, *args, cancelacion=token, **kwargs)
+        self._en_curso.append((futuro, token, al_terminar, al_cancelar, al_fallar))
+        if self._revision is None:
+            self._revision = self._root.after(settings.JOB_CONFIG["POLL_INTERVAL_MS"], self._revisar)
+        return token
+
+    @property
+    def ocupado(self):
+        """True si hay tareas sin terminar."""
+        return bool(self._en_curso)
+
+    def _revisar(self):
+        """Entrega en el hilo de Tk el resultado de las tareas que ya terminaron."""
+        self._revision = None
+        terminadas, en_curso = [], []
+        for tarea in self._en_curso:
+            (terminadas if tarea[0].done() else en_curso).append(tarea)
+        self._en_curso = en_curso
+        for futuro, token, al_terminar, al_cancelar, al_fallar in terminadas:
+            error = None if futuro.cancelled() else futuro.exception()
+            if futuro.cancelled() or isinstance(error, TareaCancelada):
+                if al_cancelar:
+                    al_cancelar()
+            elif error is not None:
+                if al_fallar:
+                    al_fallar(error)
+            elif al_terminar:
+                al_terminar(futuro.result())
+        if self._en_curso:
+            self._revision = self._root.after(settings.JOB_CONFIG["POLL_INTERVAL_MS"], self._revisar)
+
+    def cancelar_todo(self):
+        """Pide cancelar todas las tareas en curso."""
+        for futuro, token, *_ in self._en_curso:
+            token.cancelar()
+            futuro.cancel()
+
+    def cerrar(self):
+        """Cancela las tareas en curso y libera el pool sin esperar a que terminen."""
+        self.cancelar_todo()
+        if self._revision is not None:
+            self._root.after_cancel(self._revision)
+            self._revision = None
+        self._pool.shutdown(wait=False, cancel_futures=True)
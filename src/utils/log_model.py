@@ -0,0 +1,115 @@
+from collections import deque
+from itertools import islice
+from datetime import datetime
+from src.config import settings
+
+NIVELES_LOG = ("info", "success", "warning", "error")
+
+def formatear_linea(hora, mensaje, nivel, formato_hora="%H:%M:%S"):
+    """Da formato a una línea del log: hora, icono del nivel y mensaje (sin salto de línea)."""
+    iconos = {
+        "info": settings.APP_MESSAGES["LOG_ICON_INFO"],
+        "success": settings.APP_MESSAGES["LOG_ICON_SUCCESS"],
+        "error": settings.APP_MESSAGES["LOG_ICON_ERROR"],
+        "warning": settings.APP_MESSAGES["LOG_ICON_WARNING"]
+    }
+    return f"[{hora.strftime(formato_hora)}] {iconos.get(nivel, '')} {mensaje}"
+
+class ModeloLog:
+    """
+    Mensajes del log de la interfaz en un búfer circular de capacidad fija.
+
+    Cuando se llena, cada mensaje nuevo descarta el más antiguo, así que la
+    memoria no crece con ejecuciones largas o muy detalladas. El filtro de
+    niveles decide qué mensajes muestra la terminal; exportar() guarda siempre
+    todos los que siguen en el búfer.
+
+    La lista de mensajes visibles se mantiene al añadir cada lote (los nuevos
+    que pasan el filtro se añaden al final y los descartados se saltan desde
+    el principio), así que añadir un lote no depende de la capacidad; solo
+    filtrar() la vuelve a calcular entera.
+    """
+    def __init__(self, capacidad=None):
+        self._lineas = deque(maxlen=capacidad or settings.LOG_CONFIG["CAPACITY"])
+        self._niveles = frozenset(NIVELES_LOG)
+        # Mensajes visibles desde la posición _desde; las anteriores ya se descartaron
+        self._filtradas = []
+        self._desde = 0
+        self.descartadas = 0
+
+    def agregar(self, mensajes):
+        """
+        Añade un lote de mensajes (hora, mensaje, nivel).
+
+        Returns:
+            list: Los mensajes del lote que pasan el filtro de niveles
+        """
+        sobrantes = max(0, len(self._lineas) + len(mensajes) - self._lineas.maxlen)
+        self.descartadas += sobrantes
+        # Los mensajes antiguos que salen del búfer y eran visibles son los primeros de _filtradas
+        antiguas = min(sobrantes, len(self._lineas))
+        self._desde += sum(1 for m in islice(self._lineas, antiguas) if m[2] in self._niveles)
+        self._lineas.extend(mensajes)
+
+        nuevos = [m for m in mensajes if m[2] in self._niveles]
+        # Si el lote no cabe entero, sus primeros mensajes tampoco se conservan
+        self._filtradas.extend(m for m in mensajes[sobrantes - antiguas:] if m[2] in self._niveles)
+        if self._desde > len(self._filtradas) // 2:
+            del self._filtradas[:self._desde]
+            self._desde = 0
+        return nuevos
+
+    def filtrar(self, niveles):
+        """Cambia los niveles que se muestran (todos si niveles es None)."""
+        self._niveles = frozenset(niveles or NIVELES_LOG)
+        self._filtradas = [m for m in self._lineas if m[2] in self._niveles]
+        self._desde = 0
+
+    @property
+    def niveles(self):
+        return self._niveles
+
+    def visibles(self):
+        """Devuelve los mensajes que pasan el filtro, del más antiguo al más reciente."""
+        return self._filtradas[self._desde:]
+
+    def cantidad_visibles(self):
+        """Número de mensajes que pasan el filtro (sin copiarlos)."""
+        return len(self._filtradas) - self._desde
+
+    def ventana(self, inicio, cantidad):
+        """Devuelve cantidad mensajes visibles a partir de la posición inicio."""
+        inicio = self._desde + max(0, inicio)
+        return self._filtradas[inicio:inicio + cantidad]
+
+    def limpiar(self):
+        """Elimina todos los mensajes."""
+        self._lineas.clear()
+        self._filtradas = []
+        self._desde = 0
+        self.descartadas = 0
+
+    def exportar(self, ruta):
+        """
+        Guarda en un archivo de texto todos los mensajes del búfer, sin aplicar el filtro.
+
+        Returns:
+            tuple: (exito, mensaje)
+        """
+        try:
+            formato = settings.APP_MESSAGES["LOG_FALLBACK_TIMESTAMP_FORMAT"]
+            with open(ruta, 'w', encoding='utf-8') as f:
+                if self.descartadas:
+                    f.write(f"... {self.descartadas} mensajes anteriores descartados\n")
+                for hora, mensaje, nivel in self._lineas:
+                    f.write(formatear_linea(hora, mensaje, nivel, formato) + "\n")
+            return True, f"{len(self._lineas)} mensajes guardados en {ruta}"
+        except Exception as e:
+            return False, f"Error al guardar el log: {str(e)}"
+
+    def __len__(self):
+        return len(self._lineas)
+
+def mensaje_log(mensaje, nivel="info"):
+    """Crea un mensaje (hora, mensaje, nivel) con la hora actual."""
+    return (datetime.now(), mensaje, nivel)
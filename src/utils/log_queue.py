@@ -0,0 +1,41 @@
+import queue
+from datetime import datetime
+
+class ColaLog:
+    """
+    Destino de log que se puede usar desde cualquier hilo.
+
+    Se pasa como log_callback (mensaje, nivel) a las funciones de src/core: cada
+    llamada solo deja el mensaje en una cola, sin tocar la interfaz. El hilo de
+    Tk recoge los mensajes pendientes con vaciar() desde un temporizador
+    (root.after) y los escribe todos de una vez en la terminal.
+    """
+    def __init__(self):
+        self._cola = queue.SimpleQueue()
+
+    def __call__(self, mensaje, nivel="info"):
+        """Encola un mensaje con la hora en que se emitió."""
+        self._cola.put((datetime.now(), mensaje, nivel))
+
+    def vaciar(self, max_mensajes=None):
+        """
+        Saca de la cola los mensajes pendientes, en el orden en que se emitieron.
+
+        Args:
+            max_mensajes (int): Máximo de mensajes a sacar (todos si es None),
+                                para no bloquear la interfaz con una ráfaga
+
+        Returns:
+            list: Tuplas (hora, mensaje, nivel)
+        """
+        mensajes = []
+        while max_mensajes is None or len(mensajes) < max_mensajes:
+            try:
+                mensajes.append(self._cola.get_nowait())
+            except queue.Empty:
+                break
+        return mensajes
+
+    def pendientes(self):
+        """Devuelve cuántos mensajes quedan por escribir (aproximado si otros hilos siguen escribiendo)."""
+        return self._cola.qsize()
@@ -0,0 +1,97 @@
+import threading
+import time
+from src.config import settings
+
+class Progreso:
+    """
+    Recibe el avance de una tarea larga y lo convierte en eventos limitados a
+    unos pocos por segundo.
+
+    Las funciones de src/core lo llaman como progreso(etapa, actual, total,
+    **datos) en cada hoja o página, desde el hilo que sea. Cada evento es un
+    dict con 'etapa', 'actual', 'total', 'fraccion', 'eta' (segundos que
+    faltan para terminar la etapa, o None si aún no se puede estimar) y los
+    datos adicionales (por ejemplo 'filas' o 'paginas'). Solo se emite si
+    pasaron PROGRESS_CONFIG["MIN_INTERVAL_S"] desde el anterior, salvo al
+    empezar una etapa nueva y al terminarla.
+
+    El último evento queda disponible con tomar(), para que la interfaz lo
+    recoja desde su propio hilo, y si se indica destino también se le pasa.
+    """
+    def __init__(self, destino=None, intervalo=None):
+        self._destino = destino
+        self._intervalo = settings.PROGRESS_CONFIG["MIN_INTERVAL_S"] if intervalo is None else intervalo
+        self._lock = threading.Lock()
+        self._etapa = None
+        self._inicio = 0.0
+        self._actual_inicio = 0
+        self._ultimo = 0.0
+        self._pendiente = None
+
+    def __call__(self, etapa, actual, total, **datos):
+        ahora = time.monotonic()
+        with self._lock:
+            nueva_etapa = etapa != self._etapa
+            if nueva_etapa:
+                self._etapa = etapa
+                self._inicio = ahora
+                self._actual_inicio = actual
+            elif actual < total and ahora - self._ultimo < self._intervalo:
+                return
+            self._ultimo = ahora
+            evento = dict(datos, etapa=etapa, actual=actual, total=total,
+                          fraccion=min(1.0, actual / total) if total else 0.0,
+                          eta=_estimar_restante(ahora - self._inicio, actual - self._actual_inicio, total - actual))
+            self._pendiente = evento
+        if self._destino:
+            self._destino(evento)
+
+    def reiniciar(self):
+        """Olvida la etapa y el evento pendiente, para empezar una tarea nueva."""
+        with self._lock:
+            self._etapa = None
+            self._pendiente = None
+
+    def tomar(self):
+        """Devuelve el último evento todavía no recogido, o None."""
+        with self._lock:
+            evento, self._pendiente = self._pendiente, None
+        return evento
+
+def _estimar_restante(transcurrido, hechos, restantes):
+    """
+    Segundos que faltan suponiendo que lo que queda avanza al mismo ritmo que
+    lo hecho desde el primer aviso de la etapa.
+    """
+    if hechos <= 0 or transcurrido <= 0:
+        return None
+    return transcurrido * max(0, restantes) / hechos
+
+def _miles(numero):
+    return f"{numero:,}".replace(",", ".")
+
+def describir_progreso(evento):
+    """Texto corto para mostrar un evento de progreso en la interfaz."""
+    mensajes = settings.APP_MESSAGES
+    etapa = evento["etapa"]
+    if etapa == "hojas":
+        partes = [mensajes["PROGRESS_READING"].format(evento["actual"], evento["total"])]
+    elif etapa == "analisis":
+        partes = [mensajes["PROGRESS_ANALYZING"].format(evento["actual"], evento["total"])]
+    elif etapa == "pdf":
+        partes = [mensajes["PROGRESS_PDF"].format(evento.get("paginas", 0), _miles(evento["actual"]),
+                                                   _miles(evento["total"]))]
+    else:
+        partes = [f"{etapa}: {evento['actual']} / {evento['total']}"]
+    if evento.get("filas") is not None and etapa != "pdf":
+        partes.append(mensajes["PROGRESS_ROWS"].format(_miles(evento["filas"])))
+    if evento.get("eta") is not None and evento["actual"] < evento["total"]:
+        segundos = round(evento["eta"])
+        restante = f"{segundos // 60} min {segundos % 60:02d} s" if segundos >= 60 else f"{segundos} s"
+        partes.append(mensajes["PROGRESS_ETA"].format(restante))
+    return " · ".join(partes)
+
+def avisar_progreso(progreso, etapa, actual, total, **datos):
+    """Llama a progreso si se indicó (para las funciones que aceptan progreso=None)."""
+    if progreso is not None:
+        progreso(etapa, actual, total, **datos)
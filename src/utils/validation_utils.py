@@ -1,20 +1,53 @@
+import re
+import numpy as np
 import pandas as pd
 
+# Importe con puntos como separador de miles al estilo colombiano (1.250.000 o 1.250.000,50)
+_REGEX_MILES_CON_PUNTO = re.compile(r'^-?\d{1,3}(?:\.\d{3})+(?:,\d+)?$')
+
 def limpiar_valor_monetario(valor_str):
     """
     Limpia y convierte una cadena de valor monetario a float.
-    
+
     Args:
         valor_str: Valor en cadena o numérico a limpiar
-        
+
     Returns:
         float: Valor monetario limpio o 0 si es inválido
 """
     try:
         if pd.isna(valor_str) or valor_str == '':
-            return 0  
-        valor_str = str(valor_str).strip()
-        valor_str = valor_str.replace('$', '').replace(',', '').strip()
+            return 0
+        if not isinstance(valor_str, str):
+            return float(valor_str)
+        valor_str = valor_str.replace('$', '').strip()
+        if _REGEX_MILES_CON_PUNTO.match(valor_str):
+            valor_str = valor_str.replace('.', '').replace(',', '.')
+        valor_str = valor_str.replace(',', '').strip()
         return float(valor_str)
-    except ValueError:
-        return 0   
\ No newline at end of file
+    except (ValueError, TypeError):
+        return 0
+
+def limpiar_valores_monetarios(serie):
+    """
+    Versión vectorizada de limpiar_valor_monetario para una columna completa.
+
+    Las columnas numéricas se convierten directamente con pd.to_numeric. En las
+    columnas mixtas (texto y números) los importes se repiten mucho, así que cada
+    valor distinto se limpia una sola vez con las mismas reglas de
+    limpiar_valor_monetario y el resultado se reparte a todas las filas con los
+    códigos de pd.factorize. Vacíos y valores no convertibles quedan en 0.
+
+    Args:
+        serie (pd.Series): Columna con los valores a limpiar
+
+    Returns:
+        pd.Series: Valores como float, con el mismo índice
+    """
+    if not pd.api.types.is_object_dtype(serie.dtype) and not pd.api.types.is_string_dtype(serie.dtype):
+        return pd.to_numeric(serie, errors='coerce').fillna(0).astype(float)
+
+    codigos, unicos = pd.factorize(serie)
+    # El último elemento (0) corresponde al código -1 que factorize asigna a los nulos
+    limpios = np.array([limpiar_valor_monetario(v) for v in unicos] + [0.0], dtype=float)
+    return pd.Series(limpios[codigos], index=serie.index)
@@ -0,0 +1,97 @@
+import unittest
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from unittest import mock
+import pandas as pd
+from src.core import excel_processor
+from src.core.batch import generar_informes, nombre_informe
+from src.core.service_store import consultar_servicios
+
+class TestGenerarInformes(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.salida = os.path.join(self.test_dir, 'informes')
+        self.test_file = os.path.join(self.test_dir, 'servicios.xlsx')
+        pd.DataFrame({
+            'FECHA': ['05/01/2024', '15/01/2024', '10/02/2024', '20/02/2024'],
+            'DIRECCION': ['Calle 1', 'Calle 2', 'Calle 3', 'Calle 4'],
+            'SERVICIO REALIZADO': ['Servicio 1', 'Servicio 2', 'Servicio 3', 'Servicio 4'],
+            'VALOR SERVICIO': [100000, 200000, 300000, 400000],
+            'FORMA DE PAGO': ['EFECTIVO', 'EFECTIVO', 'EFECTIVO', 'EFECTIVO'],
+            'ESTADO DEL SERVICIO': [None, None, None, None],
+        }).to_excel(self.test_file, index=False)
+        self.periodos = [
+            (datetime(2024, 1, 1), datetime(2024, 1, 31)),
+            (datetime(2024, 2, 1), datetime(2024, 2, 29)),
+            (datetime(2024, 3, 1), datetime(2024, 3, 31)),
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def _generar(self, **kwargs):
+        with mock.patch.dict(os.environ, {'LOCALAPPDATA': self.test_dir}):
+            return generar_informes(self.test_file, self.periodos, self.salida, log_callback=lambda *a: None, **kwargs)
+
+    def test_un_pdf_por_periodo_con_una_lectura(self):
+        with mock.patch('src.core.batch.extraer_servicios', wraps=excel_processor.extraer_servicios) as extraer:
+            exito, resumen = self._generar(procesos=1)
+
+        self.assertTrue(exito)
+        self.assertEqual(extraer.call_count, 1)
+        self.assertEqual([i['servicios'] for i in resumen['informes']], [2, 2, 0])
+        self.assertEqual((resumen['generados'], resumen['sin_datos'], resumen['fallidos']), (2, 1, 0))
+        self.assertEqual(sorted(os.listdir(self.salida)),
+                         [nombre_informe(*self.periodos[0]), nombre_informe(*self.periodos[1])])
+
+    def test_en_paralelo(self):
+        exito, resumen = self._generar(procesos=2)
+        self.assertTrue(exito)
+        self.assertEqual(resumen['generados'], 2)
+        self.assertTrue(all(i['segundos'] > 0 for i in resumen['informes'] if i['servicios']))
+
+    def test_desde_almacen_sin_leer_excel(self):
+        ruta_db = os.path.join(self.test_dir, 'servicios.sqlite3')
+        self._generar(procesos=1, ruta_db=ruta_db, importar=True)
+        shutil.rmtree(self.salida)
+
+        with mock.patch('src.core.batch.extraer_servicios') as extraer:
+            exito, resumen = self._generar(procesos=1, ruta_db=ruta_db, desde_almacen=True)
+
+        extraer.assert_not_called()
+        self.assertTrue(exito)
+        self.assertEqual(resumen['servicios'], 4)
+        self.assertEqual([i['servicios'] for i in resumen['informes']], [2, 2, 0])
+        self.assertEqual(len(os.listdir(self.salida)), 2)
+
+    def test_error_del_almacen_no_cuenta_como_informe_fallido(self):
+        with mock.patch('src.core.batch.importar_servicios', side_effect=OSError("disco lleno")):
+            exito, resumen = self._generar(procesos=1, importar=True)
+
+        self.assertFalse(exito)
+        self.assertEqual(resumen['error_almacen'], "disco lleno")
+        self.assertEqual((resumen['generados'], resumen['sin_datos'], resumen['fallidos']), (2, 1, 0))
+
+    def test_hoja_solo_al_guardar_en_almacen(self):
+        ruta_db = os.path.join(self.test_dir, 'servicios.sqlite3')
+        with mock.patch('src.core.batch.extraer_servicios', wraps=excel_processor.extraer_servicios) as extraer:
+            self._generar(procesos=1, ruta_db=ruta_db, importar=True)
+            self._generar(procesos=1)
+        self.assertEqual([llamada.kwargs['incluir_hoja'] for llamada in extraer.call_args_list], [True, False])
+        guardados = consultar_servicios(*self.periodos[0], ruta_db=ruta_db)
+        self.assertEqual(guardados['HOJA'].unique().tolist(), ['Sheet1'])
+
+    def test_archivo_danado_no_cuenta_como_sin_datos(self):
+        with open(self.test_file, 'wb') as archivo:
+            archivo.write(b'esto no es un libro de Excel')
+        exito, resumen = self._generar(procesos=1)
+
+        self.assertFalse(exito)
+        self.assertIn('No se pudo abrir el archivo Excel', resumen['error_lectura'])
+        self.assertEqual((resumen['generados'], resumen['sin_datos'], resumen['informes']), (0, 0, []))
+        self.assertFalse(os.path.exists(self.salida))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from contextlib import redirect_stdout, redirect_stderr
+from unittest import mock
+import pandas as pd
+from src.cli import main
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.salida = os.path.join(self.test_dir, 'informes')
+        self.test_file = os.path.join(self.test_dir, 'servicios.xlsx')
+        pd.DataFrame({
+            'FECHA': ['05/01/2024', '15/01/2024', '10/02/2024'],
+            'DIRECCION': ['Calle 1', 'Calle 2', 'Calle 3'],
+            'SERVICIO REALIZADO': ['Servicio 1', 'Servicio 2', 'Servicio 3'],
+            'VALOR SERVICIO': [100000, 200000, 300000],
+            'FORMA DE PAGO': ['EFECTIVO', 'EFECTIVO', 'EFECTIVO'],
+            'ESTADO DEL SERVICIO': [None, None, None],
+        }).to_excel(self.test_file, index=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def _ejecutar(self, *argumentos):
+        salida, errores = io.StringIO(), io.StringIO()
+        with mock.patch.dict(os.environ, {'LOCALAPPDATA': self.test_dir}), \
+                redirect_stdout(salida), redirect_stderr(errores):
+            codigo = main(list(argumentos))
+        return codigo, salida.getvalue(), errores.getvalue()
+
+    def test_varios_periodos(self):
+        codigo, salida, _ = self._ejecutar(
+            self.test_file, '--salida', self.salida,
+            '--periodo', '01/01/2024', '31/01/2024',
+            '--periodo', '01/03/2024', '31/03/2024',
+        )
+        self.assertEqual(codigo, 0)
+        self.assertEqual(os.listdir(self.salida), ['Informe_Servicios_20240101_20240131.pdf'])
+        self.assertIn('lectura:', salida)
+        self.assertIn('(2 servicios)', salida)
+        self.assertIn('total:', salida)
+
+    def test_guardar_en_almacen(self):
+        ruta_db = os.path.join(self.test_dir, 'servicios.sqlite3')
+        codigo, _, _ = self._ejecutar(
+            self.test_file, '--salida', self.salida, '--db', ruta_db,
+            '--periodo', '01/01/2024', '29/02/2024',
+        )
+        self.assertEqual(codigo, 0)
+        self.assertTrue(os.path.exists(ruta_db))
+
+    def test_desde_almacen(self):
+        ruta_db = os.path.join(self.test_dir, 'servicios.sqlite3')
+        self._ejecutar(self.test_file, '--salida', self.salida, '--db', ruta_db,
+                       '--periodo', '01/01/2024', '29/02/2024')
+        os.remove(self.test_file)
+
+        codigo, salida, _ = self._ejecutar(
+            '--desde-almacen', ruta_db, '--salida', self.salida,
+            '--periodo', '01/02/2024', '29/02/2024',
+        )
+        self.assertEqual(codigo, 0)
+        self.assertIn('(1 servicios)', salida)
+        self.assertIn('Informe_Servicios_20240201_20240229.pdf', os.listdir(self.salida))
+
+    def test_sin_archivo_ni_almacen(self):
+        with redirect_stderr(io.StringIO()), self.assertRaises(SystemExit) as salida:
+            main(['--periodo', '01/01/2024', '31/01/2024'])
+        self.assertEqual(salida.exception.code, 2)
+
+    def test_archivo_inexistente(self):
+        codigo, _, errores = self._ejecutar('no_existe.xlsx', '--periodo', '01/01/2024', '31/01/2024')
+        self.assertEqual(codigo, 1)
+        self.assertIn('No se encontró el archivo', errores)
+
+    def test_archivo_danado(self):
+        with open(self.test_file, 'wb') as archivo:
+            archivo.write(b'esto no es un libro de Excel')
+        codigo, salida, errores = self._ejecutar(
+            self.test_file, '--salida', self.salida, '--sin-cache', '--periodo', '01/01/2024', '31/01/2024'
+        )
+        self.assertEqual(codigo, 1)
+        self.assertIn('No se pudo abrir el archivo Excel', errores)
+        self.assertNotIn('total:', salida)
+
+    def test_no_importa_interfaz(self):
+        comando = "import sys, src.cli; print('customtkinter' in sys.modules or 'PIL' in sys.modules)"
+        resultado = subprocess.run([sys.executable, '-c', comando], capture_output=True, text=True,
+                                   cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.assertEqual(resultado.stdout.strip(), 'False')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,189 @@
+import unittest
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from unittest import mock
+import pandas as pd
+from src.core import excel_cache, excel_processor
+from src.core.excel_processor import extraer_servicios
+
+class TestExcelCache(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.test_dir, 'cache')
+        os.makedirs(self.cache_dir)
+
+        # Libro con las columnas reales del informe
+        self.test_data = pd.DataFrame({
+            'FECHA': ['05/01/2024', '15/01/2024', '10/02/2024'],
+            'DIRECCION': ['Calle 1', 'Calle 2', 'Calle 3'],
+            'SERVICIO REALIZADO': ['Servicio 1', 'Servicio 2', 'Servicio 3'],
+            'VALOR SERVICIO': [100000, 200000, 300000],
+            'FORMA DE PAGO': ['EFECTIVO', 'EFECTIVO', 'EFECTIVO'],
+            'ESTADO DEL SERVICIO': [None, None, None],
+        })
+        self.test_file = os.path.join(self.test_dir, 'servicios.xlsx')
+        self.test_data.to_excel(self.test_file, index=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_cargar_sin_entrada(self):
+        huella, hojas = excel_cache.cargar_hojas(self.test_file, directorio=self.cache_dir)
+        self.assertIsNone(hojas)
+        self.assertEqual(huella['ruta'], os.path.abspath(self.test_file))
+
+    def test_guardar_y_cargar(self):
+        huella, _ = excel_cache.cargar_hojas(self.test_file, directorio=self.cache_dir)
+        excel_cache.guardar_hojas(huella, [('Hoja1', self.test_data)], directorio=self.cache_dir)
+
+        _, hojas = excel_cache.cargar_hojas(self.test_file, directorio=self.cache_dir)
+        self.assertEqual(len(hojas), 1)
+        self.assertEqual(hojas[0][0], 'Hoja1')
+        pd.testing.assert_frame_equal(hojas[0][1], self.test_data)
+
+    def test_archivo_modificado_invalida_entrada(self):
+        huella, _ = excel_cache.cargar_hojas(self.test_file, directorio=self.cache_dir)
+        excel_cache.guardar_hojas(huella, [('Hoja1', self.test_data)], directorio=self.cache_dir)
+
+        self.test_data.iloc[:2].to_excel(self.test_file, index=False)
+        _, hojas = excel_cache.cargar_hojas(self.test_file, directorio=self.cache_dir)
+        self.assertIsNone(hojas)
+
+    def test_expulsion_por_tamano(self):
+        huella, _ = excel_cache.cargar_hojas(self.test_file, directorio=self.cache_dir)
+        excel_cache.guardar_indice_fechas(huella, {"hojas": ['Hoja1']}, directorio=self.cache_dir)
+        excel_cache.guardar_hojas(huella, [('Hoja1', self.test_data)], directorio=self.cache_dir, max_bytes=0,
+                                  marcas={'Hoja1': {'filas': 3}})
+        # Con las hojas expulsadas se borran también las marcas, el índice de fechas y la huella
+        self.assertEqual(os.listdir(self.cache_dir), ['indice.json'])
+        with open(os.path.join(self.cache_dir, 'indice.json'), encoding='utf-8') as f:
+            self.assertEqual(json.load(f), {})
+        _, hojas = excel_cache.cargar_hojas(self.test_file, directorio=self.cache_dir)
+        self.assertIsNone(hojas)
+
+    def test_limpiar_cache(self):
+        huella, _ = excel_cache.cargar_hojas(self.test_file, directorio=self.cache_dir)
+        excel_cache.guardar_hojas(huella, [('Hoja1', self.test_data)], directorio=self.cache_dir)
+        self.assertEqual(excel_cache.limpiar_cache(self.cache_dir), 1)
+        _, hojas = excel_cache.cargar_hojas(self.test_file, directorio=self.cache_dir)
+        self.assertIsNone(hojas)
+
+    def test_extraer_servicios_con_cache(self):
+        def mock_log(message, level="info"):
+            pass
+
+        with mock.patch.dict(os.environ, {'LOCALAPPDATA': self.cache_dir}):
+            primero = extraer_servicios(self.test_file, datetime(2024, 1, 1), datetime(2024, 1, 31), mock_log, usar_cache=True)
+            # Segundo período sobre el mismo archivo: se filtra desde la caché
+            with mock.patch('pandas.ExcelFile', side_effect=AssertionError("no debe releer el Excel")):
+                segundo = extraer_servicios(self.test_file, datetime(2024, 2, 1), datetime(2024, 2, 29), mock_log, usar_cache=True)
+
+        self.assertEqual(len(primero), 2)
+        self.assertEqual(len(segundo), 1)
+
+    def test_extraer_servicios_incremental(self):
+        mensajes = []
+        def mock_log(message, level="info"):
+            mensajes.append(message)
+
+        with mock.patch.dict(os.environ, {'LOCALAPPDATA': self.cache_dir}):
+            extraer_servicios(self.test_file, datetime(2024, 1, 1), datetime(2024, 2, 29), mock_log, usar_cache=True)
+            huella_anterior = excel_cache.huella_archivo(self.test_file)['hash']
+
+            # Se añaden filas al final: solo se leen las nuevas y se unen a las guardadas
+            ampliado = pd.concat([self.test_data, pd.DataFrame({
+                'FECHA': ['20/02/2024', '25/02/2024'],
+                'DIRECCION': ['Calle 4', 'Calle 5'],
+                'SERVICIO REALIZADO': ['Servicio 4', 'Servicio 5'],
+                'VALOR SERVICIO': [400000, 500000],
+                'FORMA DE PAGO': ['EFECTIVO', 'TRANSFERENCIA'],
+                'ESTADO DEL SERVICIO': [None, None],
+            })], ignore_index=True)
+            ampliado.to_excel(self.test_file, index=False)
+            mensajes.clear()
+            resultado = extraer_servicios(self.test_file, datetime(2024, 1, 1), datetime(2024, 2, 29), mock_log, usar_cache=True)
+
+            self.assertEqual(len(resultado), 4)
+            self.assertIn("Hoja Sheet1: 2 filas nuevas desde la última lectura", mensajes)
+            cache_excel = os.path.join(self.cache_dir, 'app-relacion-servicios', 'excel')
+            self.assertFalse([n for n in os.listdir(cache_excel) if n.startswith(huella_anterior)])
+
+            # Editar una fila ya leída obliga a leer la hoja completa
+            ampliado.loc[0, 'FORMA DE PAGO'] = 'TRANSFERENCIA'
+            ampliado.to_excel(self.test_file, index=False)
+            mensajes.clear()
+            resultado = extraer_servicios(self.test_file, datetime(2024, 1, 1), datetime(2024, 2, 29), mock_log, usar_cache=True)
+
+        self.assertEqual(len(resultado), 3)
+        self.assertFalse(any("filas nuevas" in m for m in mensajes))
+
+    def _libro_largo(self, filas):
+        return pd.DataFrame({
+            'FECHA': [f"{1 + i % 28:02d}/01/2024" for i in range(filas)],
+            'DIRECCION': [f"Calle {i}" for i in range(filas)],
+            'SERVICIO REALIZADO': [f"Servicio {i}" for i in range(filas)],
+            'VALOR SERVICIO': [1000 * (i + 1) for i in range(filas)],
+            'FORMA DE PAGO': ['EFECTIVO'] * filas,
+            'ESTADO DEL SERVICIO': [None] * filas,
+        })
+
+    def _extraer(self, mensajes):
+        return extraer_servicios(self.test_file, datetime(2024, 1, 1), datetime(2024, 1, 31),
+                                 lambda m, nivel="info": mensajes.append(m), usar_cache=True)
+
+    def test_incremental_detecta_edicion_en_fila_intermedia(self):
+        mensajes = []
+        libro = self._libro_largo(40)
+        libro.to_excel(self.test_file, index=False)
+        with mock.patch.dict(os.environ, {'LOCALAPPDATA': self.cache_dir}):
+            self._extraer(mensajes)
+
+            # Una fila del medio cambia y se añaden filas: no se puede reutilizar lo leído
+            libro.loc[15, 'FORMA DE PAGO'] = 'TRANSFERENCIA'
+            libro = pd.concat([libro, self._libro_largo(3)], ignore_index=True)
+            libro.to_excel(self.test_file, index=False)
+            mensajes.clear()
+            resultado = self._extraer(mensajes)
+
+        self.assertEqual(len(resultado), 42)
+        self.assertNotIn('Calle 15', resultado['DIRECCION'].tolist())
+        self.assertIn("Hoja Sheet1 modificada antes de la última fila leída, se vuelve a leer completa", mensajes)
+
+    def test_incremental_con_filas_vacias_y_filas_borradas(self):
+        mensajes = []
+        libro = self._libro_largo(20)
+        # Una fila vacía en medio: pandas la lee como fila, así que cuenta en la marca
+        libro.iloc[[7]] = None
+        libro.to_excel(self.test_file, index=False)
+        with mock.patch.dict(os.environ, {'LOCALAPPDATA': self.cache_dir}):
+            # Al llenar la caché no se calcula ningún hash de filas
+            with mock.patch('src.core.excel_processor._hash_filas') as hash_filas:
+                self._extraer(mensajes)
+            hash_filas.assert_not_called()
+
+            ampliado = pd.concat([libro, self._libro_largo(25).iloc[20:]], ignore_index=True)
+            ampliado.to_excel(self.test_file, index=False)
+            mensajes.clear()
+            with mock.patch('src.core.excel_processor._preparar_hoja',
+                            wraps=excel_processor._preparar_hoja) as preparar:
+                resultado = self._extraer(mensajes)
+            # Las filas ya leídas solo se preparan para compararlas con la caché; se anexan las nuevas
+            self.assertEqual([len(llamada.args[0]) for llamada in preparar.call_args_list], [20, 5])
+            self.assertIn("Hoja Sheet1: 5 filas nuevas desde la última lectura", mensajes)
+            sin_cache = extraer_servicios(self.test_file, datetime(2024, 1, 1), datetime(2024, 1, 31),
+                                          lambda m, nivel="info": None)
+            pd.testing.assert_frame_equal(resultado, sin_cache)
+
+            # Con filas borradas la hoja tiene menos filas que las ya leídas y se lee completa
+            ampliado.iloc[:22].to_excel(self.test_file, index=False)
+            mensajes.clear()
+            resultado = self._extraer(mensajes)
+
+        self.assertEqual(len(resultado), 21)
+        self.assertFalse(any("filas nuevas" in m for m in mensajes))
+
+if __name__ == '__main__':
+    unittest.main()
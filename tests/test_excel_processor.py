@@ -1,7 +1,12 @@
 import unittest
+import os
+import shutil
+import tempfile
 from datetime import datetime
+from unittest import mock
 import pandas as pd
 from src.core.excel_processor import extraer_servicios
+from src.utils.job_runner import TareaCancelada, TokenCancelacion
 
 class TestExcelProcessor(unittest.TestCase):
     def setUp(self):
@@ -57,5 +62,142 @@ class TestExcelProcessor(unittest.TestCase):
         
         self.assertTrue(df_resultado.empty)
 
+class TestExtraerServiciosVariasHojas(unittest.TestCase):
+    def setUp(self):
+        # Libro con una hoja por técnico y las columnas reales del informe
+        self.test_dir = tempfile.mkdtemp()
+        self.test_file = os.path.join(self.test_dir, 'servicios_tecnicos.xlsx')
+        with pd.ExcelWriter(self.test_file) as writer:
+            for i in range(4):
+                pd.DataFrame({
+                    'FECHA': ['05/01/2024', '15/01/2024', '10/02/2024', '20/01/2024'],
+                    'DIRECCION': [f'Calle {i}{j}' for j in range(4)],
+                    'SERVICIO REALIZADO': ['Revisión', 'Instalación', 'Cambio', 'Revisión'],
+                    'VALOR SERVICIO': [100000 * (i + 1), 200000, 300000, 50000],
+                    'FORMA DE PAGO': ['EFECTIVO', 'EFECTIVO', 'EFECTIVO', 'TRANSFERENCIA'],
+                    'ESTADO DEL SERVICIO': [None, None, None, None],
+                    'NOMBRE CLIENTE': ['Ana', 'Luis', 'Marta', 'Pedro'],
+                    'TELEFONO': ['300', '301', '302', '303'],
+                    'VALOR MATERIALES ': [0, 20000, 0, 0],
+                }).to_excel(writer, sheet_name=f'Tecnico {i}', index=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_paralelo_igual_a_secuencial(self):
+        mensajes = []
+
+        def log(message, level="info"):
+            mensajes.append(message)
+
+        secuencial = extraer_servicios(self.test_file, datetime(2024, 1, 1), datetime(2024, 1, 31), lambda *a: None)
+        paralelo = extraer_servicios(self.test_file, datetime(2024, 1, 1), datetime(2024, 1, 31), log,
+                                     paralelo=True, max_workers=2)
+
+        self.assertEqual(len(secuencial), 8)
+        pd.testing.assert_frame_equal(secuencial, paralelo)
+        leidas = [m for m in mensajes if m.startswith('Hoja leída:')]
+        self.assertEqual(leidas, [f'Hoja leída: Tecnico {i} (4 filas)' for i in range(4)])
+
+    def test_columna_hoja_solo_si_se_pide(self):
+        sin_hoja = extraer_servicios(self.test_file, datetime(2024, 1, 1), datetime(2024, 1, 31), lambda *a: None)
+        self.assertNotIn('HOJA', sin_hoja.columns)
+        con_hoja = extraer_servicios(self.test_file, datetime(2024, 1, 1), datetime(2024, 1, 31), lambda *a: None,
+                                     incluir_hoja=True)
+        self.assertEqual(con_hoja['HOJA'].tolist(), [f'Tecnico {i}' for i in range(4) for _ in range(2)])
+
+    def test_cancelar_entre_hojas(self):
+        token = TokenCancelacion()
+        analizadas = []
+
+        def log(message, level="info"):
+            if message.startswith('\nAnalizando hoja:'):
+                analizadas.append(message)
+                token.cancelar()
+
+        with self.assertRaises(TareaCancelada):
+            extraer_servicios(self.test_file, datetime(2024, 1, 1), datetime(2024, 1, 31), log, cancelacion=token)
+        self.assertEqual(analizadas, ['\nAnalizando hoja: Tecnico 0'])
+
+        for opciones in ({"streaming": True}, {"paralelo": True, "max_workers": 2}):
+            with self.assertRaises(TareaCancelada):
+                extraer_servicios(self.test_file, datetime(2024, 1, 1), datetime(2024, 1, 31), lambda *a: None,
+                                  cancelacion=token, **opciones)
+
+    def test_avisa_progreso_por_hoja(self):
+        for opciones in ({}, {"streaming": True}, {"paralelo": True, "max_workers": 2}):
+            avisos = []
+            extraer_servicios(self.test_file, datetime(2024, 1, 1), datetime(2024, 1, 31), lambda *a: None,
+                              progreso=lambda etapa, actual, total, **datos: avisos.append((etapa, actual, total)),
+                              **opciones)
+            self.assertEqual(avisos, [("hojas", i, 4) for i in range(1, 5)] + [("analisis", i, 4) for i in range(1, 5)])
+
+    def test_podar_columnas(self):
+        completo = extraer_servicios(self.test_file, datetime(2024, 1, 1), datetime(2024, 1, 31), lambda *a: None)
+        podado = extraer_servicios(self.test_file, datetime(2024, 1, 1), datetime(2024, 1, 31), lambda *a: None,
+                                   podar_columnas=True)
+
+        self.assertNotIn('TELEFONO', podado.columns)
+        self.assertNotIn('NOMBRE CLIENTE', podado.columns)
+        pd.testing.assert_frame_equal(podado, completo[podado.columns])
+
+    def test_streaming_igual_a_lectura_normal(self):
+        podado = extraer_servicios(self.test_file, datetime(2024, 1, 1), datetime(2024, 1, 31), lambda *a: None,
+                                   podar_columnas=True)
+        streaming = extraer_servicios(self.test_file, datetime(2024, 1, 1), datetime(2024, 1, 31), lambda *a: None,
+                                      streaming=True, filas_por_bloque=1)
+
+        self.assertEqual(list(streaming.columns), list(podado.columns))
+        pd.testing.assert_frame_equal(streaming, podado, check_dtype=False)
+
+class TestIndiceFechas(unittest.TestCase):
+    def setUp(self):
+        # Una hoja por año, con fechas reales en orden creciente
+        self.test_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.test_dir, 'cache')
+        self.test_file = os.path.join(self.test_dir, 'historico.xlsx')
+        with pd.ExcelWriter(self.test_file) as writer:
+            for anio in (2022, 2023, 2024):
+                fechas = pd.date_range(f'{anio}-01-01', f'{anio}-12-31', freq='7D')
+                pd.DataFrame({
+                    'FECHA': fechas,
+                    'DIRECCION': [f'Calle {i}' for i in range(len(fechas))],
+                    'VALOR SERVICIO': 100000,
+                    'FORMA DE PAGO': 'EFECTIVO',
+                    'ESTADO DEL SERVICIO': None,
+                }).to_excel(writer, sheet_name=str(anio), index=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def _extraer(self, inicio, fin, mensajes, **kwargs):
+        def log(message, level="info"):
+            mensajes.append(message)
+        with mock.patch.dict(os.environ, {'LOCALAPPDATA': self.cache_dir}):
+            return extraer_servicios(self.test_file, inicio, fin, log, usar_cache=True, **kwargs)
+
+    def test_omite_hojas_fuera_del_periodo(self):
+        referencia = extraer_servicios(self.test_file, datetime(2023, 3, 1), datetime(2023, 3, 31), lambda *a: None)
+
+        self._extraer(datetime(2024, 1, 1), datetime(2024, 1, 31), [])
+        mensajes = []
+        resultado = self._extraer(datetime(2023, 3, 1), datetime(2023, 3, 31), mensajes)
+
+        pd.testing.assert_frame_equal(resultado, referencia)
+        omitidas = [m for m in mensajes if 'sin fechas en el período' in m]
+        self.assertEqual(len(omitidas), 2)
+        self.assertNotIn('\nAnalizando hoja: 2022', mensajes)
+
+    def test_streaming_con_indice(self):
+        referencia = extraer_servicios(self.test_file, datetime(2023, 3, 1), datetime(2023, 3, 31), lambda *a: None)
+
+        # La primera pasada construye el índice; la segunda lo usa para saltar hojas y cortar la lectura
+        self._extraer(datetime(2024, 1, 1), datetime(2024, 1, 31), [], streaming=True)
+        mensajes = []
+        resultado = self._extraer(datetime(2023, 3, 1), datetime(2023, 3, 31), mensajes, streaming=True)
+
+        pd.testing.assert_frame_equal(resultado, referencia[resultado.columns], check_dtype=False)
+        self.assertEqual(len([m for m in mensajes if 'sin fechas en el período' in m]), 2)
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,88 @@
+import unittest
+import os
+import shutil
+import tempfile
+from datetime import date
+from unittest import mock
+import openpyxl
+import pandas as pd
+from src.core import exporters
+from src.core.exporters import exportar_servicios, tabla_exportacion
+
+class TestExporters(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.test_data = pd.DataFrame({
+            'FECHA': pd.to_datetime(['2024-01-05', '2024-01-15', '2024-01-20']),
+            'DIRECCION_PARA_INFORME': ['Calle 1', 'Calle 2', 'Calle 3'],
+            'SERVICIO_PARA_INFORME': ['Mantenimiento', 'Revisión', 'Instalación'],
+            'MATERIALES': ['', 'Válvula', ''],
+            'VALOR MATERIALES': [0.0, 20000.0, 0.0],
+            'VALOR_ORIGINAL': [100000.0, 200000.0, 50000.0],
+            'IVA': [0.0, 19000.0, 0.0],
+        })
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_tabla_usa_columnas_del_informe(self):
+        tabla = tabla_exportacion(self.test_data)
+        self.assertEqual(list(tabla.columns), [
+            'Fecha', 'Dirección', 'Servicio', 'Materiales', 'Valor Mat.',
+            'Valor Servicio', 'Subtotal ABRECAR', 'IVA', 'Total ABRECAR'
+        ])
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(tabla['Fecha']))
+        self.assertEqual(tabla['Servicio'].tolist(), ['Mantenimiento', 'Revisión', 'Instalación'])
+        self.assertEqual(tabla['Valor Mat.'].tolist(), [0.0, 20000.0, 0.0])
+        self.assertEqual(tabla['IVA'].tolist(), [0.0, 19000.0, 0.0])
+
+    def test_exportar_csv_por_bloques(self):
+        ruta = os.path.join(self.test_dir, 'servicios.csv')
+        exito, _ = exportar_servicios(self.test_data, ruta, filas_por_bloque=2)
+        self.assertTrue(exito)
+        with open(ruta, encoding='utf-8-sig') as f:
+            lineas = f.read().splitlines()
+        self.assertEqual(len(lineas), 4)
+        self.assertTrue(lineas[0].startswith('Fecha;Dirección;Servicio'))
+        self.assertTrue(lineas[2].startswith('15/01/2024;Calle 2;Revisión;Válvula;20000,0;'))
+
+    def test_exportar_csv_fechas_no_validas_e_importes_repetidos(self):
+        df = pd.concat([self.test_data] * 2, ignore_index=True)
+        df.loc[1, 'FECHA'] = pd.NaT
+        ruta = os.path.join(self.test_dir, 'servicios.csv')
+        exito, _ = exportar_servicios(df, ruta, filas_por_bloque=4)
+        self.assertTrue(exito)
+        with open(ruta, encoding='utf-8-sig') as f:
+            lineas = f.read().splitlines()
+        self.assertEqual(len(lineas), 7)
+        self.assertTrue(lineas[2].startswith(';Calle 2;Revisión;Válvula;20000,0;180000,0;'))
+        self.assertEqual(lineas[5], lineas[2].replace(';', '15/01/2024;', 1))
+
+    def test_exportar_xlsx(self):
+        ruta = os.path.join(self.test_dir, 'servicios.xlsx')
+        exito, _ = exportar_servicios(self.test_data, ruta, filas_por_bloque=2)
+        self.assertTrue(exito)
+        hoja = openpyxl.load_workbook(ruta, read_only=True)['Servicios']
+        filas = list(hoja.iter_rows(values_only=True))
+        self.assertEqual(len(filas), 4)
+        self.assertEqual(filas[0][0], 'Fecha')
+        self.assertEqual(filas[1][0].date(), date(2024, 1, 5))
+        self.assertEqual(filas[3][1], 'Calle 3')
+        self.assertEqual(filas[2][4], 20000)
+
+    def test_exportar_parquet_sin_pyarrow(self):
+        with mock.patch.object(exporters, 'pq', None):
+            exito, mensaje = exportar_servicios(self.test_data, os.path.join(self.test_dir, 'servicios.parquet'))
+            self.assertEqual(exporters.formatos_disponibles(), ('csv', 'xlsx'))
+        self.assertFalse(exito)
+        self.assertIn('pyarrow', mensaje)
+
+    def test_formato_no_soportado_y_sin_datos(self):
+        exito, _ = exportar_servicios(self.test_data, os.path.join(self.test_dir, 'servicios.json'))
+        self.assertFalse(exito)
+        exito, mensaje = exportar_servicios(self.test_data.iloc[0:0], os.path.join(self.test_dir, 'servicios.csv'))
+        self.assertFalse(exito)
+        self.assertEqual(mensaje, "No hay datos para exportar")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+import threading
+from src.utils.job_runner import EjecutorTareas, TareaCancelada, TokenCancelacion, comprobar_cancelacion
+
+class _RaizFalsa:
+    """Sustituye a la ventana de Tk: guarda los after() y los ejecuta al llamar a procesar()."""
+    def __init__(self):
+        self.pendientes = {}
+        self._siguiente = 0
+
+    def after(self, ms, funcion):
+        self._siguiente += 1
+        self.pendientes[self._siguiente] = funcion
+        return self._siguiente
+
+    def after_cancel(self, identificador):
+        self.pendientes.pop(identificador, None)
+
+    def procesar(self):
+        while self.pendientes:
+            identificador = min(self.pendientes)
+            self.pendientes.pop(identificador)()
+
+class TestEjecutorTareas(unittest.TestCase):
+    def setUp(self):
+        self.raiz = _RaizFalsa()
+        self.ejecutor = EjecutorTareas(self.raiz, max_workers=2)
+        self.eventos = []
+
+    def tearDown(self):
+        self.ejecutor.cerrar()
+
+    def _lanzar(self, funcion, *args):
+        return self.ejecutor.lanzar(
+            funcion, *args,
+            al_terminar=lambda r: self.eventos.append(("terminada", r, threading.current_thread())),
+            al_cancelar=lambda: self.eventos.append(("cancelada", None, threading.current_thread())),
+            al_fallar=lambda e: self.eventos.append(("fallida", str(e), threading.current_thread()))
+        )
+
+    def test_resultado_en_el_hilo_principal(self):
+        def sumar(a, b, cancelacion=None):
+            return a + b, threading.current_thread()
+
+        self._lanzar(sumar, 2, 3)
+        self.assertTrue(self.ejecutor.ocupado)
+        self.raiz.procesar()
+
+        self.assertFalse(self.ejecutor.ocupado)
+        tipo, (resultado, hilo_tarea), hilo_aviso = self.eventos[0]
+        self.assertEqual((tipo, resultado), ("terminada", 5))
+        self.assertIsNot(hilo_tarea, threading.main_thread())
+        self.assertIs(hilo_aviso, threading.main_thread())
+
+    def test_cancelar_y_fallar(self):
+        empezar = threading.Event()
+
+        def larga(cancelacion=None):
+            while True:
+                empezar.set()
+                cancelacion.comprobar()
+
+        def con_error(cancelacion=None):
+            raise ValueError("hoja dañada")
+
+        token = self._lanzar(larga)
+        self._lanzar(con_error)
+        empezar.wait(5)
+        token.cancelar()
+        self.raiz.procesar()
+
+        self.assertEqual(sorted((tipo, dato) for tipo, dato, _ in self.eventos),
+                         [("cancelada", None), ("fallida", "hoja dañada")])
+
+    def test_token(self):
+        token = TokenCancelacion()
+        comprobar_cancelacion(None)
+        token.comprobar()
+        token.cancelar()
+        self.assertTrue(token.cancelado)
+        with self.assertRaises(TareaCancelada):
+            comprobar_cancelacion(token)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from src.utils.log_model import ModeloLog, mensaje_log
+
+class TestModeloLog(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def _mensajes(self, cantidad, nivel="info"):
+        return [(datetime(2024, 1, 1, 10, 0, i % 60), f"mensaje {i}", nivel) for i in range(cantidad)]
+
+    def test_bufer_circular_descarta_los_mas_antiguos(self):
+        modelo = ModeloLog(capacidad=5)
+        modelo.agregar(self._mensajes(8))
+        self.assertEqual(len(modelo), 5)
+        self.assertEqual(modelo.descartadas, 3)
+        self.assertEqual(modelo.visibles()[0][1], "mensaje 3")
+        self.assertEqual([m[1] for m in modelo.ventana(3, 10)], ["mensaje 6", "mensaje 7"])
+
+    def test_filtro_de_niveles(self):
+        modelo = ModeloLog(capacidad=10)
+        modelo.agregar(self._mensajes(3))
+        nuevos = modelo.agregar([mensaje_log("falló", "error"), mensaje_log("ojo", "warning")])
+        self.assertEqual(len(nuevos), 2)
+
+        modelo.filtrar(("error",))
+        self.assertEqual([m[1] for m in modelo.visibles()], ["falló"])
+        self.assertEqual(modelo.agregar(self._mensajes(2)), [])
+        self.assertEqual(len(modelo.visibles()), 1)
+
+        modelo.filtrar(None)
+        self.assertEqual(len(modelo.visibles()), 7)
+
+    def test_visibles_al_descartar_con_filtro(self):
+        modelo = ModeloLog(capacidad=4)
+        modelo.filtrar(("error",))
+        for i in range(10):
+            modelo.agregar([mensaje_log(f"falló {i}", "error"), mensaje_log(f"ok {i}", "info")])
+            esperados = [m for m in modelo._lineas if m[2] == "error"]
+            self.assertEqual(modelo.cantidad_visibles(), len(esperados))
+            self.assertEqual(modelo.visibles(), esperados)
+        self.assertEqual([m[1] for m in modelo.ventana(1, 5)], ["falló 9"])
+
+        # Un lote mayor que la capacidad solo deja sus últimos mensajes
+        modelo.agregar([mensaje_log(f"falló {i}", "error") for i in range(10, 16)])
+        self.assertEqual([m[1] for m in modelo.visibles()], ["falló 12", "falló 13", "falló 14", "falló 15"])
+
+    def test_exportar_guarda_todo_sin_filtro(self):
+        modelo = ModeloLog(capacidad=3)
+        modelo.agregar(self._mensajes(4) + [mensaje_log("falló", "error")])
+        modelo.filtrar(("error",))
+        ruta = os.path.join(self.test_dir, 'log.txt')
+        exito, _ = modelo.exportar(ruta)
+        self.assertTrue(exito)
+        with open(ruta, encoding='utf-8') as f:
+            lineas = f.read().splitlines()
+        self.assertEqual(len(lineas), 4)
+        self.assertIn("2 mensajes anteriores descartados", lineas[0])
+        self.assertTrue(lineas[1].startswith("[2024-01-01 10:00:02]"))
+        self.assertTrue(lineas[-1].endswith("falló"))
+
+    def test_limpiar(self):
+        modelo = ModeloLog(capacidad=2)
+        modelo.agregar(self._mensajes(3))
+        modelo.limpiar()
+        self.assertEqual(len(modelo), 0)
+        self.assertEqual(modelo.descartadas, 0)
+        self.assertEqual(modelo.visibles(), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import unittest
+import threading
+from src.utils.log_queue import ColaLog
+
+class TestColaLog(unittest.TestCase):
+    def test_vaciar_en_orden_y_por_lotes(self):
+        cola = ColaLog()
+        for i in range(5):
+            cola(f"mensaje {i}", "warning" if i == 2 else "info")
+        self.assertEqual(cola.pendientes(), 5)
+
+        lote = cola.vaciar(3)
+        self.assertEqual([mensaje for _, mensaje, _ in lote], ["mensaje 0", "mensaje 1", "mensaje 2"])
+        self.assertEqual(lote[2][2], "warning")
+        self.assertEqual([mensaje for _, mensaje, _ in cola.vaciar()], ["mensaje 3", "mensaje 4"])
+        self.assertEqual(cola.vaciar(), [])
+
+    def test_escritura_desde_varios_hilos(self):
+        cola = ColaLog()
+
+        def escribir(hilo):
+            for i in range(200):
+                cola(f"{hilo}-{i}")
+
+        hilos = [threading.Thread(target=escribir, args=(n,)) for n in range(4)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        mensajes = [mensaje for _, mensaje, _ in cola.vaciar()]
+        self.assertEqual(len(mensajes), 800)
+        # Los mensajes de cada hilo conservan su orden
+        for n in range(4):
+            propios = [m for m in mensajes if m.startswith(f"{n}-")]
+            self.assertEqual(propios, [f"{n}-{i}" for i in range(200)])
+
+if __name__ == '__main__':
+    unittest.main()
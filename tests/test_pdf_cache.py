@@ -0,0 +1,87 @@
+import unittest
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from unittest import mock
+import pandas as pd
+from src.core import pdf_cache
+from src.core.pdf_generator import generar_pdf_modular
+
+class TestPdfCache(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.test_dir, 'cache')
+        os.makedirs(self.cache_dir)
+        self.test_data = pd.DataFrame({
+            'FECHA': pd.to_datetime(['2024-01-05', '2024-01-15']),
+            'DIRECCION_PARA_INFORME': ['Calle 1', 'Calle 2'],
+            'SERVICIO_PARA_INFORME': ['Mantenimiento', 'Revisión'],
+            'MATERIALES': ['', 'Válvula'],
+            'VALOR MATERIALES': [0.0, 20000.0],
+            'VALOR_ORIGINAL': [100000.0, 200000.0],
+            'IVA': [0.0, 19000.0],
+        })
+        self.inicio = datetime(2024, 1, 1)
+        self.fin = datetime(2024, 1, 31)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_huella_cambia_con_datos_notas_y_periodo(self):
+        huella = pdf_cache.huella_informe(self.test_data, "Notas", self.inicio, self.fin)
+        self.assertEqual(huella, pdf_cache.huella_informe(self.test_data.copy(), "Notas", self.inicio, self.fin))
+
+        modificado = self.test_data.copy()
+        modificado.loc[1, 'VALOR_ORIGINAL'] = 210000.0
+        self.assertNotEqual(huella, pdf_cache.huella_informe(modificado, "Notas", self.inicio, self.fin))
+        self.assertNotEqual(huella, pdf_cache.huella_informe(self.test_data, "Otras notas", self.inicio, self.fin))
+        self.assertNotEqual(huella, pdf_cache.huella_informe(self.test_data, "Notas", self.inicio, datetime(2024, 2, 29)))
+
+    def test_guardar_y_copiar(self):
+        huella = pdf_cache.huella_informe(self.test_data, "Notas")
+        destino = os.path.join(self.test_dir, 'informe.pdf')
+        self.assertFalse(pdf_cache.copiar_informe(huella, destino, self.cache_dir))
+
+        origen = os.path.join(self.test_dir, 'original.pdf')
+        with open(origen, 'wb') as f:
+            f.write(b'%PDF-1.3 contenido')
+        pdf_cache.guardar_informe(huella, origen, self.cache_dir)
+        self.assertTrue(pdf_cache.copiar_informe(huella, destino, self.cache_dir))
+        with open(destino, 'rb') as f:
+            self.assertEqual(f.read(), b'%PDF-1.3 contenido')
+
+        self.assertEqual(pdf_cache.limpiar_cache_informes(self.cache_dir), 1)
+        self.assertFalse(pdf_cache.copiar_informe(huella, destino, self.cache_dir))
+
+    def test_expulsion_lru(self):
+        origen = os.path.join(self.test_dir, 'original.pdf')
+        with open(origen, 'wb') as f:
+            f.write(b'x' * 100)
+        for i, huella in enumerate(['a', 'b', 'c']):
+            pdf_cache.guardar_informe(huella, origen, self.cache_dir, max_bytes=250)
+            os.utime(os.path.join(self.cache_dir, huella + '.pdf'), (1000 + i, 1000 + i))
+        pdf_cache.guardar_informe('d', origen, self.cache_dir, max_bytes=250)
+        self.assertEqual(sorted(os.listdir(self.cache_dir)), ['c.pdf', 'd.pdf'])
+
+    def test_generar_pdf_modular_reutiliza_informe(self):
+        with mock.patch.dict(os.environ, {'LOCALAPPDATA': self.cache_dir}), \
+             mock.patch('os.path.expanduser', return_value=self.test_dir):
+            carpeta = os.path.join(self.test_dir, 'pdf-relacion-servicios-en-efectivo')
+            os.makedirs(carpeta)
+            mensajes = []
+            log = lambda msg, nivel="info": mensajes.append(msg)
+            exito, _ = generar_pdf_modular(self.test_data, 'informe.pdf', "Notas", self.inicio, self.fin, log)
+            self.assertTrue(exito)
+
+            with mock.patch('src.core.pdf_generator.generar_pdf') as generar:
+                exito, _ = generar_pdf_modular(self.test_data, 'copia.pdf', "Notas", self.inicio, self.fin, log)
+                generar.assert_not_called()
+            self.assertTrue(exito)
+            self.assertTrue(any('se reutiliza' in m for m in mensajes))
+
+            with open(os.path.join(carpeta, 'informe.pdf'), 'rb') as a, open(os.path.join(carpeta, 'copia.pdf'), 'rb') as b:
+                self.assertEqual(a.read(), b.read())
+
+if __name__ == '__main__':
+    unittest.main()
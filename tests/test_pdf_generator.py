@@ -1,8 +1,16 @@
 import unittest
+import io
 import os
+import re
+import shutil
+import tempfile
+from unittest import mock
 import pandas as pd
 from datetime import datetime
-from src.core.pdf_generator import generar_pdf, generar_pdf_modular, _abrir_pdf
+from src.core.pdf_generator import PDF, generar_pdf, generar_pdf_bytes, generar_pdf_modular, _abrir_pdf
+from src.core.pdf_generator import _construir_pdf, _construir_pdf_paralelo
+from src.utils.job_runner import TareaCancelada, TokenCancelacion
+from src.config import settings
 
 class TestPDFGenerator(unittest.TestCase):
     def setUp(self):
@@ -75,5 +83,180 @@ class TestPDFGenerator(unittest.TestCase):
         resultado = _abrir_pdf('no_existe.pdf', mock_log)
         self.assertFalse(resultado)
 
+class TestTablaServicios(unittest.TestCase):
+    def setUp(self):
+        # DataFrame con las columnas que produce extraer_servicios
+        self.test_data = pd.DataFrame({
+            'FECHA': pd.to_datetime(['2024-01-05', '2024-01-15', '2024-01-31']),
+            'DIRECCION_PARA_INFORME': ['Calle 1 # 2-3', 'Carrera 45 # 67-89 Apartamento 1201 Torre B', 'Calle 1 # 2-3'],
+            'SERVICIO_PARA_INFORME': ['Mantenimiento', 'Cambio de válvula y revisión general', 'Mantenimiento'],
+            'MATERIALES': ['', 'Válvula', ''],
+            'VALOR MATERIALES': [0.0, 20000.0, 0.0],
+            'VALOR_ORIGINAL': [100000.0, 200000.0, 300000.0],
+            'IVA': [0.0, 19000.0, 0.0],
+        })
+        self.test_dir = tempfile.mkdtemp()
+        self.test_pdf = os.path.join(self.test_dir, 'informe.pdf')
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_generar_pdf_columnas_informe(self):
+        exito, mensaje = generar_pdf(self.test_data, self.test_pdf, "Notas de prueba",
+                                     datetime(2024, 1, 1), datetime(2024, 1, 31))
+        self.assertTrue(exito, mensaje)
+        with open(self.test_pdf, 'rb') as f:
+            self.assertTrue(f.read().startswith(b'%PDF'))
+
+    def test_generar_pdf_bytes(self):
+        exito, contenido = generar_pdf_bytes(self.test_data, "Notas de prueba")
+        self.assertTrue(exito)
+        self.assertTrue(contenido.startswith(b'%PDF-1.3'))
+        self.assertTrue(contenido.rstrip().endswith(b'%%EOF'))
+
+        # El mismo documento se puede escribir en cualquier objeto con write()
+        buffer = io.BytesIO()
+        exito, _ = generar_pdf(self.test_data, buffer, "Notas de prueba")
+        self.assertTrue(exito)
+        self.assertTrue(buffer.getvalue().startswith(b'%PDF-1.3'))
+        self.assertEqual(os.listdir(self.test_dir), [])
+
+    def test_encabezados_como_plantillas(self):
+        df = pd.concat([self.test_data] * 30, ignore_index=True)
+        exito, normal = generar_pdf_bytes(df, "Notas", compacto=False)
+        self.assertTrue(exito)
+        exito, compacto = generar_pdf_bytes(df, "Notas", compacto=True)
+        self.assertTrue(exito)
+        self.assertNotIn(b'/Subtype /Form', normal)
+        self.assertEqual(compacto.count(b'/Subtype /Form'), 2)
+        self.assertIn(b'/TPL1', compacto)
+        self.assertLess(len(compacto), len(normal))
+
+        # Cada página reutiliza las plantillas en lugar de repetir los títulos
+        pdf = PDF(orientation='L')
+        pdf.usar_plantillas = True
+        pdf.add_page()
+        pdf.tabla_servicios(df)
+        self.assertGreater(pdf.page, 1)
+        for pagina in range(1, pdf.page + 1):
+            self.assertIn('/TPL1 Do', pdf.pages[pagina])
+            self.assertNotIn('(Fecha) Tj', pdf.pages[pagina])
+        self.assertIn('/TPL2 Do', pdf.pages[1])
+        self.assertIn('/TPL2 Do', pdf.pages[2])
+        self.assertIn('(Fecha) Tj', pdf._plantillas['encabezado_tabla']['contenido'])
+
+    def test_dibujo_en_paralelo(self):
+        df = pd.concat([self.test_data] * 60, ignore_index=True)
+        secuencial = _construir_pdf(df, "Notas", compacto=False, paralelo=False)
+        secuencial.output(dest='S')
+        paralelo = _construir_pdf_paralelo(df, "Notas", None, None, False, procesos=3)
+        paralelo.output(dest='S')
+
+        # Mismas páginas con los mismos textos, numeradas sobre el total del informe
+        self.assertGreater(secuencial.page, 3)
+        self.assertEqual(paralelo.page, secuencial.page)
+        textos = lambda pdf, n: [t for t in re.findall(r'\((.*?)\) Tj', pdf.pages[n]) if not t.startswith('Generado el')]
+        for n in range(1, secuencial.page + 1):
+            self.assertEqual(textos(paralelo, n), textos(secuencial, n))
+        self.assertIn(f'Página {paralelo.page} de {paralelo.page}', textos(paralelo, paralelo.page))
+        self.assertEqual(paralelo.resumen_totales, secuencial.resumen_totales)
+
+        # Con una sola página no se reparte
+        self.assertIsNone(_construir_pdf_paralelo(self.test_data, "", None, None, False, procesos=3))
+
+    def test_sin_pool_de_procesos_se_dibuja_en_un_proceso(self):
+        df = pd.concat([self.test_data] * 60, ignore_index=True)
+        avisos = []
+        with mock.patch.dict(settings.PDF_CONFIG, {"RENDER_WORKERS": 3}), \
+             mock.patch('src.core.pdf_generator.ProcessPoolExecutor', side_effect=OSError("sin semáforos")):
+            pdf = _construir_pdf(df, "Notas", paralelo=True, log_callback=lambda m, nivel: avisos.append(nivel))
+        self.assertGreater(pdf.page, 3)
+        self.assertEqual(avisos, ['warning'])
+
+        # Un error al unir los tramos no se oculta como si faltara el pool
+        with mock.patch('src.core.pdf_generator._construir_pdf_paralelo',
+                        side_effect=ValueError("Los tramos del PDF no usan las mismas fuentes")):
+            exito, mensaje = generar_pdf_bytes(df, "Notas", paralelo=True)
+        self.assertFalse(exito)
+        self.assertIn('mismas fuentes', mensaje)
+
+    def test_cancelar_entre_paginas(self):
+        df = pd.concat([self.test_data] * 60, ignore_index=True)
+        token = TokenCancelacion()
+        token.cancelar()
+        with self.assertRaises(TareaCancelada):
+            generar_pdf_bytes(df, "Notas", cancelacion=token)
+        with self.assertRaises(TareaCancelada):
+            _construir_pdf_paralelo(df, "Notas", None, None, False, procesos=3, cancelacion=token)
+        with self.assertRaises(TareaCancelada):
+            generar_pdf(df, self.test_pdf, "Notas", cancelacion=token)
+        self.assertFalse(os.path.exists(self.test_pdf))
+
+    def test_avisa_progreso_por_pagina(self):
+        df = pd.concat([self.test_data] * 60, ignore_index=True)
+        for paralelo in (False, True):
+            avisos = []
+            avisar = lambda etapa, actual, total, paginas: avisos.append((etapa, actual, total, paginas))
+            if paralelo:
+                pdf = _construir_pdf_paralelo(df, "Notas", None, None, False, procesos=3, progreso=avisar)
+            else:
+                pdf = _construir_pdf(df, "Notas", paralelo=False, progreso=avisar)
+            self.assertEqual(avisos[-1], ("pdf", len(df), len(df), pdf.page))
+            self.assertEqual([a[1] for a in avisos], sorted(a[1] for a in avisos))
+
+    def test_generar_pdf_bytes_sin_datos(self):
+        exito, mensaje = generar_pdf_bytes(self.test_data.iloc[:0])
+        self.assertFalse(exito)
+        self.assertEqual(mensaje, "No hay datos para generar el informe")
+
+    def test_resumen_totales(self):
+        pdf = PDF(orientation='L')
+        pdf.add_page()
+        pdf.tabla_servicios(self.test_data)
+        totales = pdf.resumen_totales
+        self.assertEqual(totales['servicios'], 3)
+        self.assertEqual(totales['neto'], 580000.0)
+        self.assertEqual(totales['iva'], 19000.0)
+        self.assertEqual(totales['total'], 309000.0)
+        self.assertEqual(totales['paginas'][0]['pagina'], 1)
+
+    def test_dividir_lineas_reutiliza_calculo(self):
+        pdf = PDF(orientation='L')
+        pdf.add_page()
+        pdf.set_font("Helvetica", '', 8)
+        texto = 'Carrera 45 # 67-89 Apartamento 1201 Torre B'
+        with mock.patch.object(PDF, 'multi_cell', wraps=pdf.multi_cell) as multi_cell:
+            lineas = pdf.dividir_lineas(texto, 49)
+            self.assertEqual(pdf.dividir_lineas(texto, 49), lineas)
+            self.assertEqual(multi_cell.call_count, 1)
+            # Otro ancho u otra fuente dividen el texto de nuevo
+            pdf.dividir_lineas(texto, 100)
+            pdf.set_font("Helvetica", 'B', 8)
+            pdf.dividir_lineas(texto, 49)
+            self.assertEqual(multi_cell.call_count, 3)
+        self.assertGreater(len(lineas), 1)
+        self.assertEqual(' '.join(lineas), texto)
+
+    def test_totales_van_vienen(self):
+        df = pd.concat([self.test_data] * 30, ignore_index=True)
+        pdf = PDF(orientation='L')
+        pdf.set_auto_page_break(True, margin=15)
+        pdf.add_page()
+        pdf.tabla_servicios(df)
+
+        paginas = pdf.resumen_totales['paginas']
+        self.assertGreater(len(paginas), 1)
+        neto_pagina_1 = f"$ {paginas[0]['neto']:,.0f}".replace(',', '.')
+        self.assertIn('(Van) Tj', pdf.pages[1])
+        self.assertIn(f'({neto_pagina_1}) Tj', pdf.pages[1])
+        self.assertIn('(Vienen) Tj', pdf.pages[2])
+        self.assertIn(f'({neto_pagina_1}) Tj', pdf.pages[2])
+        self.assertNotIn('(Van) Tj', pdf.pages[len(paginas)])
+
+        sin_arrastre = PDF(orientation='L')
+        sin_arrastre.add_page()
+        sin_arrastre.tabla_servicios(df, arrastre=False)
+        self.assertNotIn('(Vienen) Tj', sin_arrastre.pages[2])
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,42 @@
+import unittest
+from unittest import mock
+from src.utils.progress import Progreso, describir_progreso
+
+class TestProgreso(unittest.TestCase):
+    def test_limita_los_avisos_y_siempre_avisa_el_final(self):
+        eventos = []
+        reloj = [100.0]
+        progreso = Progreso(eventos.append, intervalo=0.25)
+        with mock.patch('src.utils.progress.time.monotonic', side_effect=lambda: reloj[0]):
+            for i in range(1, 11):
+                reloj[0] += 0.1
+                progreso("hojas", i, 10, filas=i * 100)
+
+        # La primera de la etapa, una cada 0.25 s y la última
+        self.assertEqual([e["actual"] for e in eventos], [1, 4, 7, 10])
+        self.assertEqual(eventos[-1]["fraccion"], 1.0)
+        self.assertEqual(eventos[-1]["filas"], 1000)
+        # Tras 3 hojas en 0.3 s, faltan 6 hojas a 0.1 s cada una
+        self.assertAlmostEqual(eventos[1]["eta"], 0.6)
+        self.assertIs(progreso.tomar(), eventos[-1])
+        self.assertIsNone(progreso.tomar())
+
+    def test_etapa_nueva_se_avisa_enseguida(self):
+        eventos = []
+        progreso = Progreso(eventos.append, intervalo=60)
+        progreso("hojas", 1, 3)
+        progreso("hojas", 2, 3)
+        progreso("analisis", 1, 3)
+        self.assertEqual([(e["etapa"], e["actual"]) for e in eventos], [("hojas", 1), ("analisis", 1)])
+        self.assertIsNone(eventos[1]["eta"])
+
+    def test_describir_progreso(self):
+        texto = describir_progreso({"etapa": "hojas", "actual": 3, "total": 20, "fraccion": 0.15,
+                                    "filas": 12345, "eta": 75.2})
+        self.assertEqual(texto, "Leyendo hoja 3 de 20 · 12.345 filas · faltan ~1 min 15 s")
+        texto = describir_progreso({"etapa": "pdf", "actual": 5000, "total": 5000, "fraccion": 1.0,
+                                    "paginas": 210, "eta": 0.0})
+        self.assertEqual(texto, "Dibujando PDF: página 210 (5.000 de 5.000 filas)")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+import pandas as pd
+from src.core.report_data import preparar_filas, calcular_totales, formatear_pesos
+
+class TestPrepararFilas(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'FECHA': pd.to_datetime(['2024-01-05', None]),
+            'DIRECCION_PARA_INFORME': ['Calle 1\n# 2-3 ', 'Carrera 4'],
+            'SERVICIO_PARA_INFORME': ['Mantenimiento', 'Revisión\r'],
+            'MATERIALES': ['Válvula', float('nan')],
+            'VALOR MATERIALES': ['$ 20.000', None],
+            'VALOR_ORIGINAL': [1250000, 10000],
+            'IVA': [0, '1,900'],
+        }, index=[7, 3])
+
+    def test_textos_de_cada_fila(self):
+        filas, _ = preparar_filas(self.df)
+        self.assertEqual(filas, [
+            ('05/01/2024', 'Calle 1 # 2-3', 'Mantenimiento', 'Válvula',
+             '$ 20.000', '$ 1.230.000', '$ 615.000', '-', '$ 615.000'),
+            ('-', 'Carrera 4', 'Revisión', '-',
+             '-', '$ 10.000', '$ 5.000', '$ 1.900', '$ 6.900'),
+        ])
+
+    def test_valores_numericos(self):
+        df = self.df.copy()
+        df['VALOR MATERIALES'] = [20000, 50000]
+        _, valores = preparar_filas(df)
+        # El valor neto nunca es negativo
+        self.assertEqual(valores['neto'].tolist(), [1230000.0, 0.0])
+        self.assertEqual(valores['subtotal'].tolist(), [615000.0, 0.0])
+        self.assertEqual(valores['total'].tolist(), [615000.0, 1900.0])
+
+    def test_totales_por_pagina(self):
+        _, valores = preparar_filas(self.df)
+        totales = calcular_totales(valores, paginas=[1, 2])
+        self.assertEqual(totales['servicios'], 2)
+        self.assertEqual(totales['neto'], 1240000.0)
+        # El IVA se suma ya limpio ('1,900' cuenta como 1900)
+        self.assertEqual(totales['iva'], 1900.0)
+        self.assertEqual(totales['total'], 621900.0)
+        self.assertEqual([p['pagina'] for p in totales['paginas']], [1, 2])
+        self.assertEqual(totales['paginas'][1]['total'], 6900.0)
+        self.assertEqual(sum(p['subtotal'] for p in totales['paginas']), totales['subtotal'])
+
+    def test_totales_sin_filas(self):
+        _, valores = preparar_filas(self.df.iloc[:0])
+        totales = calcular_totales(valores, paginas=[])
+        self.assertEqual(totales['total'], 0.0)
+        self.assertEqual(totales['paginas'], [])
+
+    def test_formatear_pesos(self):
+        self.assertEqual(formatear_pesos([1250000, 0, 1250000]), ['$ 1.250.000', '$ 0', '$ 1.250.000'])
+        self.assertEqual(formatear_pesos([1500, 0, -3], guion_si_cero=True), ['$ 1.500', '-', '-'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+import pandas as pd
+from src.core.pdf_generator import PDF
+from src.core.report_layout import COLUMNAS_INFORME, crear_diseno
+
+class TestReportLayout(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'FECHA': pd.to_datetime(['2024-01-05', '2024-01-15']),
+            'DIRECCION_PARA_INFORME': ['Calle 1 # 2-3', 'Carrera 45 # 67-89 Apartamento 1201 Torre B'],
+            'SERVICIO_PARA_INFORME': ['Mantenimiento', 'Revisión'],
+            'MATERIALES': ['', 'Válvula'],
+            'VALOR MATERIALES': [0.0, 20000.0],
+            'VALOR_ORIGINAL': [100000.0, 200000.0],
+            'IVA': [0.0, 19000.0],
+        })
+
+    def test_diseno_informe(self):
+        diseno = crear_diseno()
+        self.assertEqual(diseno['anchos'], (22, 50, 45, 30, 25, 25, 25, 20, 28))
+        self.assertEqual(diseno['ajustar'], (1, 2, 3))
+        # TOTALES ocupa hasta "Valor Mat." y los importes van bajo las cuatro últimas columnas
+        self.assertEqual(diseno['ancho_etiqueta_totales'], 172)
+        self.assertEqual([clave for _, clave in diseno['totales']], ['neto', 'subtotal', 'iva', 'total'])
+
+    def test_columnas_no_validas(self):
+        with self.assertRaises(ValueError):
+            crear_diseno([{"campo": "desconocido", "titulo": "X", "ancho": 10}])
+        with self.assertRaises(ValueError):
+            crear_diseno([{"campo": "total", "titulo": "X", "ancho": 10, "total": "otro"}])
+
+    def test_columnas_personalizadas(self):
+        # Sin materiales y con una columna nueva que solo necesita su formato
+        columnas = [c for c in COLUMNAS_INFORME if c['campo'] not in ('materiales', 'valor_materiales')]
+        columnas.insert(1, {"campo": "hoja", "titulo": "Técnico", "ancho": 30, "alineacion": 'L',
+                            "formato": lambda df, valores: ['Juan', 'Pedro']})
+        diseno = crear_diseno(columnas)
+
+        pdf = PDF(orientation='L')
+        pdf.add_page()
+        pdf.tabla_servicios(self.df, diseno=diseno)
+        contenido = pdf.pages[1]
+        self.assertIn('(Técnico) Tj', contenido)
+        self.assertIn('(Pedro) Tj', contenido)
+        self.assertNotIn('(Materiales) Tj', contenido)
+        self.assertIn('(TOTALES) Tj', contenido)
+        self.assertEqual(pdf.resumen_totales['total'], 159000.0)
+
+if __name__ == '__main__':
+    unittest.main()
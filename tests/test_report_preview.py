@@ -0,0 +1,91 @@
+import unittest
+from unittest.mock import patch
+import pandas as pd
+from src.core import report_preview
+from src.core.report_preview import ModeloVistaPrevia
+
+class TestModeloVistaPrevia(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'FECHA': ['15/01/2024', 'no es fecha', '03/01/2024', '20/01/2024', '03/01/2024'],
+            'DIRECCION_PARA_INFORME': ['calle b', 'Calle A', 'calle c', 'Calle a', 'CALLE B'],
+            'SERVICIO_PARA_INFORME': ['Servicio 1', 'Servicio 2', 'Servicio 3', 'Servicio 4', 'Servicio 5'],
+            'MATERIALES': ['', 'Tubo', '', '', ''],
+            'VALOR MATERIALES': [0, 1000, 0, 0, 0],
+            'VALOR_ORIGINAL': [30000, 10000, 50000, 10000, 20000],
+            'IVA': [0, 0, 0, 0, 0],
+        }, index=[10, 11, 12, 13, 14])
+
+    def _servicios(self, modelo):
+        return [fila[2] for fila in modelo.filas(0, len(modelo))]
+
+    def test_filas_con_los_textos_de_la_tabla_del_pdf(self):
+        modelo = ModeloVistaPrevia(self.df)
+        self.assertEqual(len(modelo), 5)
+        filas = modelo.filas(1, 2)
+        self.assertEqual(len(filas), 2)
+        self.assertEqual(filas[0][:4], ('-', 'Calle A', 'Servicio 2', 'Tubo'))
+        self.assertEqual(filas[1][0], '03/01/2024')
+        self.assertEqual(filas[1][-1], '$ 25.000')
+        self.assertEqual(modelo.filas(4, 10)[0][2], 'Servicio 5')
+        self.assertEqual(modelo.filas(5, 10), [])
+
+    def test_ordenar_importes_por_valor(self):
+        modelo = ModeloVistaPrevia(self.df)
+        modelo.ordenar(8)
+        self.assertEqual(self._servicios(modelo), ['Servicio 2', 'Servicio 4', 'Servicio 5', 'Servicio 1', 'Servicio 3'])
+        modelo.ordenar(8, descendente=True)
+        self.assertEqual(self._servicios(modelo), ['Servicio 3', 'Servicio 1', 'Servicio 5', 'Servicio 4', 'Servicio 2'])
+
+    def test_ordenar_fechas_como_fechas(self):
+        modelo = ModeloVistaPrevia(self.df)
+        modelo.ordenar(0)
+        # Las fechas iguales conservan su orden y las no válidas van al final en los dos sentidos
+        self.assertEqual(self._servicios(modelo), ['Servicio 3', 'Servicio 5', 'Servicio 1', 'Servicio 4', 'Servicio 2'])
+        modelo.ordenar(0, descendente=True)
+        self.assertEqual(self._servicios(modelo), ['Servicio 4', 'Servicio 1', 'Servicio 3', 'Servicio 5', 'Servicio 2'])
+
+    def test_ordenar_textos_sin_distinguir_mayusculas(self):
+        modelo = ModeloVistaPrevia(self.df)
+        modelo.ordenar(1)
+        self.assertEqual(self._servicios(modelo), ['Servicio 2', 'Servicio 4', 'Servicio 1', 'Servicio 5', 'Servicio 3'])
+        modelo.ordenar(None)
+        self.assertEqual(self._servicios(modelo), ['Servicio 1', 'Servicio 2', 'Servicio 3', 'Servicio 4', 'Servicio 5'])
+        self.assertIsNone(modelo.columna_orden)
+
+    def test_orden_calculado_una_vez_por_columna(self):
+        modelo = ModeloVistaPrevia(self.df)
+        with patch.object(modelo, '_clave_orden', wraps=modelo._clave_orden) as clave:
+            modelo.ordenar(5)
+            modelo.ordenar(5, descendente=True)
+            modelo.ordenar(5)
+        self.assertEqual(clave.call_count, 1)
+
+    def test_solo_prepara_los_bloques_pedidos(self):
+        df = pd.concat([self.df] * 200, ignore_index=True)
+        with patch.dict(report_preview.settings.PREVIEW_CONFIG, {"BLOCK_ROWS": 50, "CACHED_BLOCKS": 2}), \
+             patch.object(report_preview, 'preparar_filas', wraps=report_preview.preparar_filas) as preparar:
+            modelo = ModeloVistaPrevia(df)
+            filas = modelo.filas(540, 20)
+            self.assertEqual(len(filas), 20)
+            self.assertEqual(filas[0][2], 'Servicio 1')
+            # Las filas 540-559 caen en los bloques 10 y 11
+            self.assertEqual([len(llamada.args[0]) for llamada in preparar.call_args_list], [50, 50])
+
+            modelo.filas(545, 10)
+            self.assertEqual(preparar.call_count, 2)
+
+            # Solo se guardan los CACHED_BLOCKS bloques usados más recientemente
+            modelo.filas(0, 10)
+            modelo.filas(550, 5)
+            self.assertEqual(preparar.call_count, 3)
+            modelo.filas(540, 5)
+            self.assertEqual(preparar.call_count, 4)
+
+            # Al cambiar el orden se vuelven a preparar las filas
+            modelo.ordenar(8)
+            modelo.filas(540, 5)
+            self.assertEqual(preparar.call_count, 5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+import os
+import shutil
+import tempfile
+from datetime import datetime
+import pandas as pd
+from src.core.service_store import importar_servicios, consultar_servicios
+
+class TestServiceStore(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.db = os.path.join(self.test_dir, 'servicios.sqlite3')
+        # Resultado de extraer_servicios con las columnas que usa el informe
+        self.df = pd.DataFrame({
+            'FECHA': pd.to_datetime(['2024-01-05', '2024-01-15', '2024-02-10']),
+            'HOJA': ['Enero', 'Enero', 'Febrero'],
+            'FORMA_PAGO_CLEAN': ['EFECTIVO', 'EFECTIVO', 'EFECTIVO'],
+            'DIRECCION_PARA_INFORME': ['Calle 1', 'Calle 2', 'Calle 3'],
+            'SERVICIO_PARA_INFORME': ['Servicio 1', 'Servicio 2', 'Servicio 3'],
+            'VALOR_ORIGINAL': [100000.0, 200000.0, 300000.0],
+            'VALOR_COMBINADO': [100000.0, 200000.0, 300000.0],
+            'MATERIALES': ['', 'Tubo', ''],
+            'VALOR MATERIALES': [0.0, 20000.0, 0.0],
+            'SUBTOTAL': [50000.0, 100000.0, 150000.0],
+            'IVA': [0.0, 19000.0, 0.0],
+            'TOTAL EMPRESA': [50000.0, 119000.0, 150000.0],
+        })
+        self.inicio, self.fin = datetime(2024, 1, 1), datetime(2024, 2, 29)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_importar_y_consultar(self):
+        guardados = importar_servicios(self.df, 'libro.xlsx', self.inicio, self.fin, ruta_db=self.db)
+        self.assertEqual(guardados, 3)
+
+        enero = consultar_servicios(datetime(2024, 1, 1), datetime(2024, 1, 31), ruta_db=self.db)
+        self.assertEqual(list(enero.columns), list(self.df.columns))
+        pd.testing.assert_frame_equal(enero, self.df.iloc[:2])
+
+        febrero = consultar_servicios(self.inicio, self.fin, hojas=['Febrero'], forma_pago='efectivo', ruta_db=self.db)
+        self.assertEqual(febrero['DIRECCION_PARA_INFORME'].tolist(), ['Calle 3'])
+
+    def test_reimportar_reemplaza_periodo(self):
+        importar_servicios(self.df, 'libro.xlsx', self.inicio, self.fin, ruta_db=self.db)
+        importar_servicios(self.df.iloc[:1], 'libro.xlsx', datetime(2024, 1, 1), datetime(2024, 1, 31), ruta_db=self.db)
+        importar_servicios(self.df.iloc[2:], 'otro.xlsx', self.inicio, self.fin, ruta_db=self.db)
+
+        todos = consultar_servicios(self.inicio, self.fin, ruta_db=self.db)
+        self.assertEqual(todos['DIRECCION_PARA_INFORME'].tolist(), ['Calle 1', 'Calle 3', 'Calle 3'])
+        solo_libro = consultar_servicios(self.inicio, self.fin, archivo='libro.xlsx', ruta_db=self.db)
+        self.assertEqual(len(solo_libro), 2)
+
+if __name__ == '__main__':
+    unittest.main()
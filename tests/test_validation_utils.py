@@ -0,0 +1,29 @@
+import unittest
+import pandas as pd
+from src.utils.validation_utils import limpiar_valor_monetario, limpiar_valores_monetarios
+
+class TestValidationUtils(unittest.TestCase):
+    def setUp(self):
+        self.valores = pd.Series(
+            [150000, 2500.5, None, '', '  ', '$ 50,000', '$1.250.000', '1.250.000,50',
+             '45.000', '1.5', 'abc', '-20.000', float('nan')],
+            dtype=object
+        )
+        self.esperados = [150000.0, 2500.5, 0.0, 0.0, 0.0, 50000.0, 1250000.0, 1250000.5,
+                          45000.0, 1.5, 0.0, -20000.0, 0.0]
+
+    def test_limpiar_valores_monetarios(self):
+        resultado = limpiar_valores_monetarios(self.valores)
+        self.assertEqual(resultado.tolist(), self.esperados)
+        self.assertTrue(resultado.index.equals(self.valores.index))
+
+    def test_coincide_con_version_escalar(self):
+        escalar = [float(limpiar_valor_monetario(v)) for v in self.valores]
+        self.assertEqual(escalar, self.esperados)
+
+    def test_columna_numerica(self):
+        resultado = limpiar_valores_monetarios(pd.Series([1, 2, None]))
+        self.assertEqual(resultado.tolist(), [1.0, 2.0, 0.0])
+
+if __name__ == '__main__':
+    unittest.main()